@@ -0,0 +1 @@
+"""Python helpers backing the FIR Assist Streamlit app"""
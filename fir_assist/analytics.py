@@ -0,0 +1,213 @@
+"""Append-only log of analyses with incrementally maintained rollups
+
+Every analysis is appended to the ``analyses`` table, keyed by its day so old
+days can be pruned cheaply. In the same transaction the daily volume,
+per-section counts and confidence histogram rollups are updated, so the
+Analytics page only ever reads the small rollup tables and never rescans
+the history.
+"""
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+HISTOGRAM_BUCKETS = 10
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    id INTEGER PRIMARY KEY,
+    day TEXT NOT NULL,
+    ts REAL NOT NULL,
+    engine TEXT NOT NULL,
+    cached INTEGER NOT NULL,
+    latency_ms REAL NOT NULL,
+    narrative_length INTEGER NOT NULL,
+    sections TEXT NOT NULL,
+    scores TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS analyses_day ON analyses (day);
+CREATE TABLE IF NOT EXISTS daily_volume (
+    day TEXT PRIMARY KEY,
+    analyses INTEGER NOT NULL,
+    sections_identified INTEGER NOT NULL,
+    confidence_sum REAL NOT NULL,
+    confidence_count INTEGER NOT NULL,
+    latency_sum_ms REAL NOT NULL,
+    latency_max_ms REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS section_counts (
+    code TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS confidence_histogram (
+    bucket INTEGER PRIMARY KEY,
+    count INTEGER NOT NULL
+);
+"""
+
+
+def _day(ts):
+    return datetime.fromtimestamp(ts).strftime('%Y-%m-%d')
+
+
+def _bucket(score):
+    return min(int(score * HISTOGRAM_BUCKETS), HISTOGRAM_BUCKETS - 1)
+
+
+class AnalyticsStore:
+    """SQLite-backed analysis log whose writes happen off the request path"""
+
+    def __init__(self, path, batch_size=200, flush_interval=1.0):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name='analytics-writer', daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def record(self, recommendations, latency_ms, narrative_length, engine='api', cached=False, ts=None):
+        """Queue one completed analysis for logging"""
+        self._queue.put({
+            'ts': ts or time.time(),
+            'engine': engine,
+            'cached': bool(cached),
+            'latency_ms': float(latency_ms),
+            'narrative_length': int(narrative_length),
+            'sections': [(rec['code'], rec.get('title', '')) for rec in recommendations],
+            'scores': [float(rec['score']) for rec in recommendations],
+        })
+
+    def flush(self):
+        """Block until every queued analysis has been written"""
+        self._queue.join()
+
+    def _write_loop(self):
+        conn = self._connect()
+        while True:
+            events = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(events) < self.batch_size:
+                try:
+                    events.append(self._queue.get(timeout=max(deadline - time.monotonic(), 0)))
+                except queue.Empty:
+                    break
+            try:
+                with conn:
+                    for event in events:
+                        self._apply(conn, event)
+            except sqlite3.Error:
+                logger.exception("Analytics write of %d events failed", len(events))
+            finally:
+                for _ in events:
+                    self._queue.task_done()
+
+    def _apply(self, conn, event):
+        day = _day(event['ts'])
+        conn.execute(
+            'INSERT INTO analyses (day, ts, engine, cached, latency_ms, narrative_length, sections, scores) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            (day, event['ts'], event['engine'], int(event['cached']), event['latency_ms'],
+             event['narrative_length'], json.dumps([code for code, _ in event['sections']]),
+             json.dumps(event['scores'])),
+        )
+        self._update_rollups(conn, day, event['latency_ms'], event['sections'], event['scores'])
+
+    def _update_rollups(self, conn, day, latency_ms, sections, scores):
+        conn.execute(
+            """
+            INSERT INTO daily_volume VALUES (?, 1, ?, ?, ?, ?, ?)
+            ON CONFLICT (day) DO UPDATE SET
+                analyses = analyses + 1,
+                sections_identified = sections_identified + excluded.sections_identified,
+                confidence_sum = confidence_sum + excluded.confidence_sum,
+                confidence_count = confidence_count + excluded.confidence_count,
+                latency_sum_ms = latency_sum_ms + excluded.latency_sum_ms,
+                latency_max_ms = MAX(latency_max_ms, excluded.latency_max_ms)
+            """,
+            (day, len(scores), sum(scores), len(scores), latency_ms, latency_ms),
+        )
+        conn.executemany(
+            """
+            INSERT INTO section_counts VALUES (?, ?, 1)
+            ON CONFLICT (code) DO UPDATE SET count = count + 1, title = excluded.title
+            """,
+            sections,
+        )
+        conn.executemany(
+            """
+            INSERT INTO confidence_histogram VALUES (?, 1)
+            ON CONFLICT (bucket) DO UPDATE SET count = count + 1
+            """,
+            [(_bucket(score),) for score in scores],
+        )
+
+    def daily_volume(self, days=30):
+        """Return the last ``days`` days of volume rollups, oldest first"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                'SELECT day, analyses, sections_identified, confidence_sum, confidence_count, '
+                'latency_sum_ms, latency_max_ms FROM daily_volume ORDER BY day DESC LIMIT ?',
+                (days,),
+            ).fetchall()
+        return [{
+            'Date': day,
+            'Analyses': analyses,
+            'Sections_Identified': sections,
+            'Avg_Confidence': confidence_sum / confidence_count if confidence_count else 0.0,
+            'Avg_Latency_ms': latency_sum / analyses if analyses else 0.0,
+            'Max_Latency_ms': latency_max,
+        } for day, analyses, sections, confidence_sum, confidence_count, latency_sum, latency_max
+            in reversed(rows)]
+
+    def confidence_histogram(self):
+        """Return ``(bucket_start, count)`` for every histogram bucket"""
+        with self._connect() as conn:
+            counts = dict(conn.execute('SELECT bucket, count FROM confidence_histogram').fetchall())
+        return [(bucket / HISTOGRAM_BUCKETS, counts.get(bucket, 0)) for bucket in range(HISTOGRAM_BUCKETS)]
+
+    def top_sections(self, limit=10):
+        with self._connect() as conn:
+            rows = conn.execute(
+                'SELECT code, title, count FROM section_counts ORDER BY count DESC, code LIMIT ?',
+                (limit,),
+            ).fetchall()
+        return [{'IPC Section': code, 'Count': count, 'Description': title} for code, title, count in rows]
+
+    def prune(self, before_day):
+        """Delete raw log rows older than ``before_day``
+
+        Rollups are kept, so pruned days still appear on the Analytics page.
+        """
+        with self._connect() as conn:
+            return conn.execute('DELETE FROM analyses WHERE day < ?', (before_day,)).rowcount
+
+    def rebuild_rollups(self):
+        """Recompute every rollup from the raw log, e.g. after editing it by hand
+
+        This is the only operation that scans the history.
+        """
+        with self._connect() as conn:
+            titles = dict(conn.execute('SELECT code, title FROM section_counts').fetchall())
+            conn.execute('DELETE FROM daily_volume')
+            conn.execute('DELETE FROM section_counts')
+            conn.execute('DELETE FROM confidence_histogram')
+            for day, latency_ms, codes, scores in conn.execute(
+                    'SELECT day, latency_ms, sections, scores FROM analyses').fetchall():
+                sections = [(code, titles.get(code, '')) for code in json.loads(codes)]
+                self._update_rollups(conn, day, latency_ms, sections, json.loads(scores))
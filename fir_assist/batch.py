@@ -0,0 +1,202 @@
+"""Batch analysis of FIR narratives with a bounded worker pool
+
+Narratives are read from a CSV (``narrative`` column, optional ``id``) or a
+JSONL file, analyzed concurrently and appended to a JSONL output file as they
+complete. Rerunning against the same output file skips rows that already
+succeeded, so an interrupted run picks up where it stopped.
+"""
+import csv
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+DEFAULT_CONCURRENCY = 8
+
+
+class RateLimiter:
+    """Token bucket limiting how many calls start per second"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst or max(1, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+
+
+class BatchProgress:
+    """Live counters for a batch run"""
+
+    def __init__(self, skipped=0):
+        self.started_at = time.monotonic()
+        self.completed = 0
+        self.failed = 0
+        self.skipped = skipped
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started_at
+
+    @property
+    def throughput(self):
+        """Narratives analyzed per second in this run"""
+        elapsed = self.elapsed
+        return (self.completed + self.failed) / elapsed if elapsed > 0 else 0.0
+
+    def as_dict(self):
+        return {
+            'completed': self.completed,
+            'failed': self.failed,
+            'skipped': self.skipped,
+            'elapsed_s': round(self.elapsed, 2),
+            'throughput': round(self.throughput, 2),
+        }
+
+
+def read_narratives(path):
+    """Yield ``(row_id, narrative)`` pairs from a CSV or JSONL file"""
+    if path.lower().endswith(('.jsonl', '.ndjson')):
+        with open(path, encoding='utf-8') as f:
+            for index, line in enumerate(f):
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                yield str(record.get('id', index)), record.get('narrative') or ''
+    else:
+        with open(path, encoding='utf-8', newline='') as f:
+            for index, record in enumerate(csv.DictReader(f)):
+                # Short rows have None for missing fields
+                yield str(record.get('id') or index), record.get('narrative') or ''
+
+
+def count_narratives(path):
+    """Count the rows ``read_narratives`` will yield, without decoding JSON
+
+    CSV rows are counted with ``csv.reader`` because quoted narratives may
+    span several lines.
+    """
+    if path.lower().endswith(('.jsonl', '.ndjson')):
+        with open(path, encoding='utf-8') as f:
+            return sum(1 for line in f if line.strip())
+    with open(path, encoding='utf-8', newline='') as f:
+        # DictReader skips blank rows, which csv.reader yields as []
+        rows = sum(1 for row in csv.reader(f) if row)
+    return max(rows - 1, 0)
+
+
+def empty_record(row_id):
+    """Result for a row without a narrative; it is final, so resumes skip it"""
+    return {'id': row_id, 'success': False, 'status': 'skipped', 'error': 'empty narrative'}
+
+
+def load_finished_ids(output_path):
+    """Return the ids of rows in ``output_path`` that succeeded or were skipped"""
+    finished = set()
+    if not os.path.exists(output_path):
+        return finished
+    with open(output_path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A half-written last line from an interrupted run
+                continue
+            if record.get('success') or record.get('status') == 'skipped':
+                finished.add(record['id'])
+    return finished
+
+
+def make_api_analyzer(client):
+    """Build an analyze function that calls ``/api/analyze`` through ``client``"""
+    def analyze(narrative):
+        response = client.post("/api/analyze", json={"narrative": narrative})
+        if response.status_code == 200:
+            return True, response.json()
+        return False, f"API Error: {response.status_code} - {response.text}"
+    return analyze
+
+
+def run_batch(input_path, output_path, analyze, concurrency=DEFAULT_CONCURRENCY,
+              rate_limit=None, on_progress=None, judgments=None):
+    """Analyze every narrative in ``input_path`` and append results to ``output_path``
+
+    ``analyze`` takes a narrative and returns ``(success, result)`` like
+    ``analyze_fir_narrative``. ``on_progress`` is called with a
+    ``BatchProgress`` after each completed row. When a prefetched
+    ``JudgmentIndex`` is given as ``judgments``, it supplies the judgments
+    for every recommendation instead of per-row lookups.
+    """
+    finished = load_finished_ids(output_path)
+    progress = BatchProgress(skipped=len(finished))
+    limiter = RateLimiter(rate_limit) if rate_limit else None
+
+    def work(row_id, narrative):
+        if not narrative.strip():
+            return empty_record(row_id)
+        if limiter:
+            limiter.acquire()
+        start = time.perf_counter()
+        try:
+            success, result = analyze(narrative)
+        except Exception as e:
+            success, result = False, str(e)
+        record = {
+            'id': row_id,
+            'success': success,
+            'latency_ms': round((time.perf_counter() - start) * 1000, 2),
+        }
+        if success:
+            record['recommendations'] = result.get('recommendations', [])
+            if judgments is not None:
+                judgments.attach(record['recommendations'])
+        else:
+            record['error'] = result
+        return record
+
+    def collect(done, out):
+        for future in done:
+            record = future.result()
+            out.write(json.dumps(record) + '\n')
+            if record['success']:
+                progress.completed += 1
+            elif record.get('status') == 'skipped':
+                progress.skipped += 1
+            else:
+                progress.failed += 1
+        out.flush()
+        if on_progress:
+            on_progress(progress)
+
+    # Keep only a bounded number of rows in flight so huge inputs are
+    # streamed rather than loaded up front.
+    max_pending = concurrency * 2
+    with open(output_path, 'a', encoding='utf-8') as out, \
+            ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='batch') as pool:
+        pending = set()
+        for row_id, narrative in read_narratives(input_path):
+            if row_id in finished:
+                continue
+            pending.add(pool.submit(work, row_id, narrative))
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done, out)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            collect(done, out)
+
+    return progress
@@ -0,0 +1,218 @@
+"""Dynamic micro-batching for model inference
+
+Callers submit single items and get a ``Future`` back. A dispatcher thread
+holds items for up to ``max_wait_ms``, groups them by length bucket so a
+batch pads to similar lengths, and hands each batch to a worker pool where
+``batch_fn`` runs one forward pass over the whole list. While every worker
+is busy the dispatcher keeps accumulating, so batches grow with load and
+shrink back to single items when the server is idle.
+"""
+import os
+import queue
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+
+DEFAULT_MAX_BATCH_SIZE = 16
+DEFAULT_MAX_WAIT_MS = 5
+DEFAULT_BUCKET_EDGES = (16, 32, 64, 128, 256)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+_STOP = object()
+
+
+def word_count(text):
+    """Cheap length proxy for bucketing narratives before tokenization"""
+    return len(text.split())
+
+
+class BatchMetrics:
+    """Counters for queue depth, batch sizes and queueing delay"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.submitted = 0
+            self.completed = 0
+            self.failed = 0
+            self.batches = 0
+            self.queue_depth = 0
+            self.max_queue_depth = 0
+            self.batch_sizes = Counter()
+            self.wait_ms_total = 0.0
+            self.run_ms_total = 0.0
+
+    def enqueued(self):
+        with self._lock:
+            self.submitted += 1
+            self.queue_depth += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+
+    def dispatched(self, size, wait_ms):
+        with self._lock:
+            self.queue_depth -= size
+            self.batches += 1
+            self.batch_sizes[size] += 1
+            self.wait_ms_total += wait_ms
+
+    def finished(self, size, run_ms, ok):
+        with self._lock:
+            if ok:
+                self.completed += size
+            else:
+                self.failed += size
+            self.run_ms_total += run_ms
+
+    def snapshot(self):
+        with self._lock:
+            items = sum(size * count for size, count in self.batch_sizes.items())
+            return {
+                'submitted': self.submitted,
+                'completed': self.completed,
+                'failed': self.failed,
+                'batches': self.batches,
+                'queue_depth': self.queue_depth,
+                'max_queue_depth': self.max_queue_depth,
+                'mean_batch_size': items / self.batches if self.batches else 0.0,
+                'mean_wait_ms': self.wait_ms_total / items if items else 0.0,
+                'mean_batch_ms': self.run_ms_total / self.batches if self.batches else 0.0,
+                'batch_sizes': dict(sorted(self.batch_sizes.items())),
+            }
+
+    def prometheus(self, prefix='fir_assist_inference'):
+        """Render the metrics in the Prometheus text exposition format"""
+        snap = self.snapshot()
+        lines = [
+            f"# TYPE {prefix}_queue_depth gauge",
+            f"{prefix}_queue_depth {snap['queue_depth']}",
+            f"# TYPE {prefix}_requests_total counter",
+            f"{prefix}_requests_total{{status=\"ok\"}} {snap['completed']}",
+            f"{prefix}_requests_total{{status=\"error\"}} {snap['failed']}",
+            f"# TYPE {prefix}_batch_size histogram",
+        ]
+        for bound in BATCH_SIZE_BUCKETS:
+            count = sum(n for size, n in snap['batch_sizes'].items() if size <= bound)
+            lines.append(f"{prefix}_batch_size_bucket{{le=\"{bound}\"}} {count}")
+        items = sum(size * count for size, count in snap['batch_sizes'].items())
+        lines += [
+            f"{prefix}_batch_size_bucket{{le=\"+Inf\"}} {snap['batches']}",
+            f"{prefix}_batch_size_sum {items}",
+            f"{prefix}_batch_size_count {snap['batches']}",
+            f"# TYPE {prefix}_queue_wait_ms_total counter",
+            f"{prefix}_queue_wait_ms_total {snap['mean_wait_ms'] * items:.3f}",
+        ]
+        return '\n'.join(lines) + '\n'
+
+
+class MicroBatcher:
+    """Queue single requests and run them through ``batch_fn`` in batches
+
+    ``batch_fn`` takes a list of items and returns one result per item, in
+    order. ``length_fn`` maps an item to a length used to pick its bucket
+    (``bucket_edges`` are inclusive upper bounds; longer items share a last
+    bucket). Workers are threads: PyTorch and NumPy release the GIL during
+    the forward pass, and threads share one copy of the model weights.
+    """
+
+    def __init__(self, batch_fn, max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_wait_ms=DEFAULT_MAX_WAIT_MS,
+                 workers=None, length_fn=word_count, bucket_edges=DEFAULT_BUCKET_EDGES):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self.workers = workers or os.cpu_count() or 1
+        self.length_fn = length_fn
+        self.bucket_edges = tuple(bucket_edges)
+        self.metrics = BatchMetrics()
+        self._queue = queue.SimpleQueue()
+        self._slots = threading.Semaphore(self.workers)
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='batch-worker')
+        self._closed = False
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name='batch-dispatcher', daemon=True)
+        self._dispatcher.start()
+
+    def submit(self, item):
+        """Queue ``item`` and return a ``Future`` for its result"""
+        if self._closed:
+            raise RuntimeError("MicroBatcher is closed")
+        future = Future()
+        bucket = bisect_left(self.bucket_edges, self.length_fn(item)) if self.bucket_edges else 0
+        self.metrics.enqueued()
+        self._queue.put((item, future, time.perf_counter(), bucket))
+        return future
+
+    def __call__(self, item, timeout=None):
+        return self.submit(item).result(timeout)
+
+    def close(self):
+        """Run whatever is queued, then stop the dispatcher and workers"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._dispatcher.join()
+        self._pool.shutdown(wait=True)
+
+    def _dispatch_loop(self):
+        pending = {}
+        stopping = False
+        while True:
+            if pending:
+                oldest = min(entries[0][2] for entries in pending.values())
+                timeout = max(oldest + self.max_wait - time.perf_counter(), 0)
+            else:
+                timeout = None
+
+            if not stopping:
+                try:
+                    entry = self._queue.get(timeout=timeout) if timeout != 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    entry = None
+                # Drain whatever else has arrived so a backlog forms full batches
+                while entry is not None:
+                    if entry is _STOP:
+                        stopping = True
+                        break
+                    entries = pending.setdefault(entry[3], [])
+                    entries.append(entry)
+                    if len(entries) >= self.max_batch_size:
+                        self._dispatch(pending.pop(entry[3]))
+                    try:
+                        entry = self._queue.get_nowait()
+                    except queue.Empty:
+                        entry = None
+
+            now = time.perf_counter()
+            for bucket in [b for b, entries in pending.items() if stopping or now - entries[0][2] >= self.max_wait]:
+                self._dispatch(pending.pop(bucket))
+            if stopping and not pending:
+                return
+
+    def _dispatch(self, entries):
+        # Wait for a free worker; requests keep queueing meanwhile and are
+        # picked up as larger batches on the next pass
+        self._slots.acquire()
+        now = time.perf_counter()
+        self.metrics.dispatched(len(entries), sum(now - entry[2] for entry in entries) * 1000)
+        self._pool.submit(self._run_batch, entries)
+
+    def _run_batch(self, entries):
+        start = time.perf_counter()
+        try:
+            results = self.batch_fn([entry[0] for entry in entries])
+            if len(results) != len(entries):
+                raise ValueError(f"batch_fn returned {len(results)} results for {len(entries)} items")
+        except Exception as e:
+            self.metrics.finished(len(entries), (time.perf_counter() - start) * 1000, ok=False)
+            for entry in entries:
+                entry[1].set_exception(e)
+        else:
+            self.metrics.finished(len(entries), (time.perf_counter() - start) * 1000, ok=True)
+            for entry, result in zip(entries, results):
+                entry[1].set_result(result)
+        finally:
+            self._slots.release()
@@ -0,0 +1,4 @@
+"""Benchmarks for the FIR Assist analysis path
+
+Run a benchmark with ``python -m fir_assist.benchmarks.<name> --help``.
+"""
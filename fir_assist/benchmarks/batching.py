@@ -0,0 +1,109 @@
+"""Compare micro-batched and per-request model inference on CPU
+
+    python -m fir_assist.benchmarks.batching --requests 2000 --concurrency 32
+    python -m fir_assist.benchmarks.batching --model-dir models/legal-bert-base-uncased
+
+Without ``--model-dir`` a NumPy stand-in encoder is used: it pads each
+batch to its longest narrative and runs a few dense layers over it, so it
+pays the same per-call overhead and padding cost as a transformer without
+needing PyTorch or a checkpoint.
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+from fir_assist.batching import DEFAULT_MAX_BATCH_SIZE, DEFAULT_MAX_WAIT_MS, MicroBatcher
+from fir_assist.benchmarks.corpus import synthetic_narratives
+from fir_assist.benchmarks.loadtest import run_load, summarize
+from fir_assist.seed import load_seed_data
+from fir_assist.semantic import normalize
+from fir_assist.stemmer import tokenize
+
+
+class StandInEncoder:
+    """Dense layers over padded token embeddings, standing in for a transformer"""
+
+    def __init__(self, dim=768, hidden=3072, layers=4, vocab=8192, max_length=256, seed=0):
+        rng = np.random.default_rng(seed)
+        self.max_length = max_length
+        self.vocab = vocab
+        self.embeddings = rng.standard_normal((vocab, dim), dtype=np.float32)
+        self.layers = [
+            (rng.standard_normal((dim, hidden), dtype=np.float32) / np.sqrt(dim),
+             rng.standard_normal((hidden, dim), dtype=np.float32) / np.sqrt(hidden))
+            for _ in range(layers)
+        ]
+
+    def embed(self, texts):
+        ids = [[hash(token) % self.vocab for token in tokenize(text.lower())][:self.max_length] or [0]
+               for text in texts]
+        length = max(len(row) for row in ids)
+        padded = np.zeros((len(ids), length), dtype=np.int64)
+        mask = np.zeros((len(ids), length, 1), dtype=np.float32)
+        for i, row in enumerate(ids):
+            padded[i, :len(row)] = row
+            mask[i, :len(row)] = 1
+        hidden = self.embeddings[padded]
+        for up, down in self.layers:
+            scores = hidden @ hidden.transpose(0, 2, 1) / np.sqrt(hidden.shape[-1])
+            attention = np.exp(scores - scores.max(axis=-1, keepdims=True))
+            hidden = hidden + attention / attention.sum(axis=-1, keepdims=True) @ hidden
+            # Flatten to one GEMM over every token in the batch, as nn.Linear does
+            flat = hidden.reshape(-1, hidden.shape[-1])
+            hidden = (hidden + (np.tanh(flat @ up) @ down).reshape(hidden.shape)) * mask
+        return normalize((hidden * mask).sum(axis=1) / mask.sum(axis=1))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--model-dir', help="Benchmark a local transformer checkpoint instead of the stand-in")
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--max-batch-size', type=int, default=DEFAULT_MAX_BATCH_SIZE)
+    parser.add_argument('--max-wait-ms', type=float, default=DEFAULT_MAX_WAIT_MS)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.model_dir:
+        from fir_assist.semantic import load_embedder
+        encoder = load_embedder(args.model_dir, num_threads=max(1, (os.cpu_count() or 1) // args.workers))
+    else:
+        encoder = StandInEncoder(seed=args.seed)
+    sections, _ = load_seed_data()
+    narratives = synthetic_narratives(sections, 500, seed=args.seed)
+    encoder.embed(narratives[:2])
+
+    def unbatched_call(narrative):
+        encoder.embed([narrative])
+        return {}
+
+    def batched_call(narrative):
+        batcher(narrative)
+        return {}
+
+    unbatched = summarize(*run_load(unbatched_call, narratives, args.requests, args.concurrency))
+    batcher = MicroBatcher(encoder.embed, args.max_batch_size, args.max_wait_ms, workers=args.workers)
+    try:
+        batched = summarize(*run_load(batched_call, narratives, args.requests, args.concurrency))
+    finally:
+        batcher.close()
+    metrics = batcher.metrics.snapshot()
+
+    print(f"encoder:     {'transformer ' + args.model_dir if args.model_dir else 'numpy stand-in'}")
+    print(f"requests:    {args.requests} at concurrency {args.concurrency}, {args.workers} workers")
+    for name, result in (('unbatched', unbatched), ('batched', batched)):
+        latency = result['latency']
+        print(f"{name:<12} {result['throughput_rps']:8.1f} req/s  "
+              f"p50 {latency['p50_ms']:.1f}ms  p95 {latency['p95_ms']:.1f}ms  errors {result['errors']}")
+    if unbatched['throughput_rps']:
+        print(f"speedup:     {batched['throughput_rps'] / unbatched['throughput_rps']:.2f}x")
+    print(f"batches:     {metrics['batches']} (mean size {metrics['mean_batch_size']:.1f}, "
+          f"mean queue wait {metrics['mean_wait_ms']:.2f}ms, max queue depth {metrics['max_queue_depth']})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
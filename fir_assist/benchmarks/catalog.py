@@ -0,0 +1,94 @@
+"""Compare a catalog snapshot with per-document section and judgment objects
+
+    python -m fir_assist.benchmarks.catalog --sections 2000 --judgments 50000
+
+Reports the Python heap held by each representation, the time to build a
+scoring engine from it (under tracemalloc, which slows both sides alike), and
+the time to answer the same analyses.
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from fir_assist.benchmarks.corpus import synthetic_narratives, synthetic_sections
+from fir_assist.catalog import Catalog, write_snapshot
+from fir_assist.scoring import ScoringEngine
+from fir_assist.stemmer import stem
+
+
+def synthetic_judgments(sections, count, seed=0):
+    rng = random.Random(seed)
+    codes = [section['code'] for section in sections]
+    return [{
+        'caseName': f"State v. Accused {i}",
+        'synopsis': f"Synthetic judgment {i} on {rng.choice(codes)}. " + "The court held that the offence was made out. " * rng.randint(1, 6),
+        'sectionCodes': rng.sample(codes, rng.randint(1, 3)),
+    } for i in range(count)]
+
+
+def measure(load):
+    """Return ``(result, heap bytes, seconds)`` for building ``load()``"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = load()
+    seconds = time.perf_counter() - start
+    heap = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, heap, seconds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sections', type=int, default=2000)
+    parser.add_argument('--judgments', type=int, default=50000)
+    parser.add_argument('--narratives', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    sections = synthetic_sections(args.sections, seed=args.seed)
+    judgments = synthetic_judgments(sections, args.judgments, seed=args.seed)
+    narratives = synthetic_narratives(sections, args.narratives, seed=args.seed)
+    path = os.path.join(tempfile.mkdtemp(), 'catalog.bin')
+    start = time.perf_counter()
+    write_snapshot(path, sections, judgments, data_version='bench')
+    write_seconds = time.perf_counter() - start
+
+    # Documents as the driver returns them: fresh dicts and strings per row
+    encoded = json.dumps([sections, judgments])
+    def documents():
+        return json.loads(encoded)
+    (doc_sections, doc_judgments), doc_heap, _ = measure(documents)
+    # Start each engine with a cold stem cache, as a fresh worker would
+    stem.cache_clear()
+    doc_engine, doc_engine_heap, doc_seconds = measure(lambda: ScoringEngine(doc_sections, doc_judgments))
+    stem.cache_clear()
+    catalog, catalog_heap, load_seconds = measure(lambda: Catalog.load(path))
+    catalog_engine, catalog_engine_heap, catalog_seconds = measure(lambda: ScoringEngine.from_catalog(catalog))
+
+    start = time.perf_counter()
+    expected = [doc_engine.analyze(narrative) for narrative in narratives]
+    doc_analyze = time.perf_counter() - start
+    start = time.perf_counter()
+    actual = [catalog_engine.analyze(narrative) for narrative in narratives]
+    catalog_analyze = time.perf_counter() - start
+
+    print(f"catalog:          {args.sections} sections, {args.judgments} judgments")
+    print(f"snapshot:         {os.path.getsize(path) / 2**20:.1f} MB on disk, written in {write_seconds:.2f}s")
+    print(f"documents:        {doc_heap / 2**20:.1f} MB heap")
+    print(f"snapshot load:    {catalog_heap / 2**20:.2f} MB heap in {load_seconds * 1000:.2f} ms")
+    print(f"engine (docs):    +{doc_engine_heap / 2**20:.1f} MB in {doc_seconds * 1000:.0f} ms")
+    print(f"engine (catalog): +{catalog_engine_heap / 2**20:.1f} MB in {catalog_seconds * 1000:.0f} ms")
+    print(f"analyze x{args.narratives}:    {doc_analyze:.2f}s from docs, {catalog_analyze:.2f}s from catalog")
+    print(f"mismatches:       {sum(1 for a, b in zip(expected, actual) if a != b)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
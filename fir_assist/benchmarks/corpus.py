@@ -0,0 +1,62 @@
+"""Synthetic FIR narratives generated from the seed sections"""
+import random
+
+_OPENINGS = [
+    "On the night of the incident the complainant reported that",
+    "According to the written complaint,",
+    "The informant stated at the police station that",
+    "Witnesses near the market told the officers that",
+    "In the early hours of the morning",
+]
+
+_FILLER = [
+    "the accused fled towards the main road",
+    "neighbours heard loud voices from the house",
+    "the victim was taken to the district hospital",
+    "a motorcycle without number plates was seen nearby",
+    "the shopkeeper identified one of the men",
+    "the family had been away at a wedding",
+    "no CCTV footage was available from the lane",
+    "the matter was reported the next day",
+]
+
+
+def synthetic_narratives(sections, count, seed=0, min_sentences=2, max_sentences=12):
+    """Return ``count`` narratives mixing seed keywords with neutral filler"""
+    rng = random.Random(seed)
+    keywords = [keyword for section in sections for keyword in section.get('keywords', [])]
+    narratives = []
+    for _ in range(count):
+        sentences = [rng.choice(_OPENINGS)]
+        for _ in range(rng.randint(min_sentences, max_sentences)):
+            if keywords and rng.random() < 0.4:
+                sentences.append(f"there was {rng.choice(keywords)}")
+            else:
+                sentences.append(rng.choice(_FILLER))
+        narratives.append(", ".join(sentences) + ".")
+    return narratives
+
+
+def synthetic_sections(count, keywords_per_section=20, seed=0):
+    """Return ``count`` fake sections drawing keywords from a shared vocabulary
+
+    Useful for measuring how scoring scales towards the full IPC/BNS catalog,
+    where many sections share keywords.
+    """
+    rng = random.Random(seed)
+    vocabulary = [f"offence{i}" for i in range(max(count * keywords_per_section // 4, 1))]
+    sections = []
+    for i in range(count):
+        keywords = rng.sample(vocabulary, min(keywords_per_section, len(vocabulary)))
+        # Roughly one keyword in ten is a two-word phrase
+        keywords = [
+            f"{keyword} {rng.choice(vocabulary)}" if rng.random() < 0.1 else keyword
+            for keyword in keywords
+        ]
+        sections.append({
+            'code': f"SYN {i}",
+            'title': f"Synthetic section {i}",
+            'description': "Generated for benchmarking",
+            'keywords': keywords,
+        })
+    return sections
@@ -0,0 +1,103 @@
+"""Latency and recall of fuzzy matching against exact keyword matching
+
+    python -m fir_assist.benchmarks.fuzzy --narratives 200 --sentences 300
+
+Latency is measured on long synthetic narratives, and once with cold caches on
+a narrative of 5,000 random distinct words (the worst case for the per-token
+lookups). Recall is measured on short narratives whose only clue is a
+misspelled keyword or a transliterated alias; false positives on narratives
+made only of neutral filler.
+"""
+import argparse
+import random
+import string
+import sys
+import time
+
+from fir_assist.benchmarks.corpus import _FILLER, synthetic_narratives
+from fir_assist.fuzzy import MIN_LENGTH, TRANSLITERATIONS, FuzzyScorer
+from fir_assist.scoring import ScoringEngine
+from fir_assist.stemmer import stem
+
+THRESHOLDS = (0.95, 0.7, 0.3)
+
+
+def misspellings(keywords, seed=0):
+    """Return ``(narrative, keyword)`` pairs with one or two typos per keyword"""
+    rng = random.Random(seed)
+    cases = []
+    for keyword in keywords:
+        if ' ' in keyword or len(keyword) < MIN_LENGTH[1]:
+            continue
+        i = rng.randrange(1, len(keyword) - 1)
+        cases.append((f"The complainant reported {keyword[:i] + keyword[i + 1:]} near the market.", keyword))
+        if len(keyword) >= MIN_LENGTH[2]:
+            j = rng.randrange(1, len(keyword) - 2)
+            swapped = keyword[:j] + keyword[j + 1] + keyword[j] + keyword[j + 2:]
+            cases.append((f"The complainant reported {swapped} near the market.", keyword))
+    return cases
+
+
+def recall(analyze, cases, sections_by_keyword):
+    found = 0
+    for narrative, keyword in cases:
+        codes = {rec['code'] for rec in analyze(narrative)['recommendations']}
+        found += bool(codes & sections_by_keyword[keyword])
+    return found / len(cases) if cases else 0.0
+
+
+def timed(analyze, narratives):
+    times = []
+    for narrative in narratives:
+        start = time.perf_counter()
+        analyze(narrative)
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return sum(times) / len(times), times[min(int(len(times) * 0.95), len(times) - 1)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--narratives', type=int, default=200)
+    parser.add_argument('--sentences', type=int, default=300, help="Sentences per long narrative")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    engine = ScoringEngine.from_seed()
+    sections_by_keyword = {}
+    for section in engine.sections:
+        for keyword in section['keywords']:
+            sections_by_keyword.setdefault(keyword.lower(), set()).add(section['code'])
+    typo_cases = misspellings(sorted(sections_by_keyword), seed=args.seed)
+    alias_cases = [(f"Complainant ne bataya ki {alias} hui.", target)
+                   for alias, target in TRANSLITERATIONS.items() if target in sections_by_keyword]
+    rng = random.Random(args.seed)
+    clean = [", ".join(rng.sample(_FILLER, 4)) + "." for _ in range(200)]
+    long_narratives = synthetic_narratives(engine.sections, args.narratives, seed=args.seed,
+                                           min_sentences=args.sentences, max_sentences=args.sentences)
+    words = sum(len(narrative.split()) for narrative in long_narratives) / len(long_narratives)
+
+    distinct = " ".join("".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(2, 11)))
+                        for _ in range(5000))
+
+    print(f"long narratives: {args.narratives} of ~{words:,.0f} words")
+    print(f"{'matcher':<18}{'mean ms':>9}{'p95 ms':>9}{'cold ms':>9}"
+          f"{'typo recall':>13}{'alias recall':>14}{'false pos.':>12}")
+    rows = [('exact', engine.analyze)]
+    for threshold in THRESHOLDS:
+        rows.append((f"fuzzy @ {threshold:.2f}", FuzzyScorer.for_threshold(engine, threshold).analyze))
+    for name, analyze in rows:
+        stem.cache_clear()
+        start = time.perf_counter()
+        analyze(distinct)
+        cold_ms = (time.perf_counter() - start) * 1000
+        mean_ms, p95_ms = timed(analyze, long_narratives)
+        false_positives = sum(1 for narrative in clean if analyze(narrative)['recommendations']) / len(clean)
+        print(f"{name:<18}{mean_ms:>9.2f}{p95_ms:>9.2f}{cold_ms:>9.1f}"
+              f"{recall(analyze, typo_cases, sections_by_keyword):>13.1%}"
+              f"{recall(analyze, alias_cases, sections_by_keyword):>14.1%}{false_positives:>12.1%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,357 @@
+"""Load test and latency benchmark for the analyze path
+
+Replays a corpus of narratives against ``/api/analyze`` (or the in-process
+scoring engine) at a fixed concurrency and optional arrival rate, then
+reports p50/p95/p99 latency, throughput and a per-stage breakdown. Runs
+offline by default against a stand-in backend that reproduces the
+controller's work: fetching every section, tokenizing and stemming,
+re-stemming every keyword while scoring, and looking up judgments.
+
+    python -m fir_assist.benchmarks.loadtest --requests 2000 --concurrency 16
+    python -m fir_assist.benchmarks.loadtest --target local --out run.json
+    python -m fir_assist.benchmarks.loadtest --url http://localhost:5000 --compare run.json
+"""
+import argparse
+import copy
+import json
+import platform
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from fir_assist.batch import read_narratives
+from fir_assist.benchmarks.corpus import synthetic_narratives
+from fir_assist.client import ApiClient
+from fir_assist.judgments import JudgmentIndex
+from fir_assist.scoring import ScoringEngine, reference_top_sections
+from fir_assist.seed import load_seed_data
+from fir_assist.stemmer import stem, tokenize
+
+STAGES = ('db_fetch', 'tokenize', 'score', 'judgments')
+DEFAULT_REGRESSION_THRESHOLD = 0.10
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of ``values``"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(int(round(pct / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def parse_server_timing(header):
+    """Parse a ``Server-Timing`` header into ``{name: milliseconds}``"""
+    timings = {}
+    for metric in (header or '').split(','):
+        parts = [part.strip() for part in metric.split(';')]
+        if not parts[0]:
+            continue
+        for param in parts[1:]:
+            if param.startswith('dur='):
+                timings[parts[0]] = float(param[4:])
+    return timings
+
+
+class _Server(ThreadingHTTPServer):
+    # The default backlog of 5 refuses connections when many clients connect at once
+    request_queue_size = 128
+
+
+class StandInBackend:
+    """Local HTTP server that emulates the Node backend's analyze path
+
+    Database round trips are simulated with fixed latencies; CPU work is
+    done for real with the same algorithm as the controller. Each response
+    carries a ``Server-Timing`` header with the per-stage durations.
+    """
+
+    def __init__(self, sections, judgments, db_latency_ms=2.0, bulk_judgments=True, port=0):
+        self.sections = sections
+        self.judgments = JudgmentIndex(judgments)
+        self.db_latency = db_latency_ms / 1000
+        self.bulk_judgments = bulk_judgments
+        backend = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Buffer writes so headers and body leave in one segment; split
+            # writes on a keep-alive socket stall on Nagle/delayed ACK
+            wbufsize = -1
+
+            def do_GET(self):
+                if self.path in ('/health', '/api/version'):
+                    self._send(200, {'success': True, 'mongodb': 'connected', 'version': 'stand-in'})
+                else:
+                    self._send(404, {'success': False})
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                if self.path != '/api/analyze' or not body.get('narrative'):
+                    self._send(400, {'success': False, 'error': 'Please provide a narrative'})
+                    return
+                payload, timings = backend.analyze(body['narrative'])
+                header = ', '.join(f"{name};dur={ms:.3f}" for name, ms in timings.items())
+                self._send(200, payload, {'Server-Timing': header})
+
+            def _send(self, status, payload, headers=None):
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = _Server(('127.0.0.1', port), Handler)
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def analyze(self, narrative):
+        timings = {}
+        start = time.perf_counter()
+        # Section.find({}) hydrates a fresh copy of every document
+        time.sleep(self.db_latency)
+        sections = copy.deepcopy(self.sections)
+        timings['db_fetch'] = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        stemmed = [stem(token) for token in tokenize(narrative.lower())]
+        timings['tokenize'] = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        top = reference_top_sections(sections, narrative, stemmed_tokens=stemmed)
+        timings['score'] = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        if top:
+            queries = 1 if self.bulk_judgments else len(top)
+            for _ in range(queries):
+                time.sleep(self.db_latency)
+        recommendations = []
+        for index, raw_score in top:
+            section = sections[index]
+            recommendations.append({
+                'code': section['code'],
+                'title': section['title'],
+                'description': section['description'],
+                'score': min(raw_score / len(section['keywords']), 1),
+                'judgments': list(self.judgments.get(section['code'])),
+            })
+        timings['judgments'] = (time.perf_counter() - start) * 1000
+        return {'success': True, 'recommendations': recommendations}, timings
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def make_api_target(client):
+    def call(narrative):
+        response = client.post('/api/analyze', json={'narrative': narrative})
+        if response.status_code != 200:
+            raise RuntimeError(f"API Error: {response.status_code}")
+        return parse_server_timing(response.headers.get('Server-Timing'))
+    return call
+
+
+def make_local_target(engine):
+    def call(narrative):
+        timings = {}
+        start = time.perf_counter()
+        stemmed = {stem(token) for token in tokenize(narrative.lower())}
+        timings['tokenize'] = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        scores = engine.raw_scores(narrative, stemmed)
+        ranked = sorted((i for i, score in enumerate(scores) if score > 0), key=lambda i: -scores[i])[:5]
+        timings['score'] = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        for index in ranked:
+            engine.judgments.get(engine.sections[index]['code'])
+        timings['judgments'] = (time.perf_counter() - start) * 1000
+        return timings
+    return call
+
+
+def run_load(call, narratives, requests, concurrency, rate=None, seed=0):
+    """Issue ``requests`` calls and return latency and stage samples
+
+    With ``rate`` set, arrivals follow a Poisson process at that many
+    requests per second (open loop), and latency includes any time spent
+    queued behind busy workers. Without it, workers send back to back.
+    """
+    rng = random.Random(seed)
+    latencies, errors = [], 0
+    stages = {stage: [] for stage in STAGES}
+    lock = threading.Lock()
+
+    def one(narrative, scheduled):
+        nonlocal errors
+        if scheduled is None:
+            scheduled = time.perf_counter()
+        try:
+            timings = call(narrative)
+        except Exception:
+            with lock:
+                errors += 1
+            return
+        elapsed = (time.perf_counter() - scheduled) * 1000
+        with lock:
+            latencies.append(elapsed)
+            for stage, ms in timings.items():
+                if stage in stages:
+                    stages[stage].append(ms)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        next_arrival = started
+        for i in range(requests):
+            narrative = narratives[i % len(narratives)]
+            if rate:
+                next_arrival += rng.expovariate(rate)
+                delay = next_arrival - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(one, narrative, next_arrival)
+            else:
+                pool.submit(one, narrative, None)
+    wall = time.perf_counter() - started
+    return latencies, stages, errors, wall
+
+
+def summarize(latencies, stages, errors, wall):
+    def dist(values):
+        return {
+            'p50_ms': round(percentile(values, 50), 3),
+            'p95_ms': round(percentile(values, 95), 3),
+            'p99_ms': round(percentile(values, 99), 3),
+            'mean_ms': round(sum(values) / len(values), 3) if values else 0.0,
+        }
+    return {
+        'requests': len(latencies) + errors,
+        'errors': errors,
+        'wall_s': round(wall, 3),
+        'throughput_rps': round(len(latencies) / wall, 2) if wall else 0.0,
+        'latency': dist(latencies),
+        'stages': {stage: dist(values) for stage, values in stages.items() if values},
+    }
+
+
+def compare(current, previous, threshold=DEFAULT_REGRESSION_THRESHOLD):
+    """Return human-readable regressions of ``current`` against ``previous``"""
+    regressions = []
+    for key in ('p50_ms', 'p95_ms', 'p99_ms'):
+        before, after = previous['latency'][key], current['latency'][key]
+        if before and after > before * (1 + threshold):
+            regressions.append(f"latency {key}: {before:.2f} -> {after:.2f}")
+    before, after = previous['throughput_rps'], current['throughput_rps']
+    if before and after < before * (1 - threshold):
+        regressions.append(f"throughput: {before:.1f} -> {after:.1f} rps")
+    for stage, dist in current['stages'].items():
+        before = previous.get('stages', {}).get(stage, {}).get('p95_ms')
+        if before and dist['p95_ms'] > before * (1 + threshold):
+            regressions.append(f"{stage} p95_ms: {before:.3f} -> {dist['p95_ms']:.3f}")
+    return regressions
+
+
+def print_report(result):
+    latency = result['latency']
+    print(f"target:      {result['config']['target']}")
+    print(f"requests:    {result['requests']} ({result['errors']} errors) in {result['wall_s']:.2f}s")
+    print(f"throughput:  {result['throughput_rps']:.1f} req/s")
+    print(f"latency:     p50 {latency['p50_ms']:.2f}ms  p95 {latency['p95_ms']:.2f}ms  p99 {latency['p99_ms']:.2f}ms")
+    for stage, dist in result['stages'].items():
+        print(f"  {stage:<10} p50 {dist['p50_ms']:.3f}ms  p95 {dist['p95_ms']:.3f}ms  p99 {dist['p99_ms']:.3f}ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the FIR analyze path")
+    parser.add_argument('--target', choices=['standin', 'api', 'local'], default='standin',
+                        help="standin: local emulated backend; api: --url; local: in-process engine")
+    parser.add_argument('--url', help="Backend URL for --target api")
+    parser.add_argument('--corpus', help="CSV/JSONL narratives file (default: synthetic from seed data)")
+    parser.add_argument('--corpus-size', type=int, default=500)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--rate', type=float, help="Open-loop arrival rate in requests/s")
+    parser.add_argument('--db-latency-ms', type=float, default=2.0,
+                        help="Simulated MongoDB round trip for the stand-in backend")
+    parser.add_argument('--per-section-judgments', action='store_true',
+                        help="Stand-in issues one judgment query per section (pre-bulk behaviour)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', help="Write results as JSON to this path")
+    parser.add_argument('--compare', help="Previous results JSON to check for regressions")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_REGRESSION_THRESHOLD)
+    args = parser.parse_args(argv)
+    if args.target == 'api' and not args.url:
+        parser.error("--target api requires --url")
+
+    sections, judgments = load_seed_data()
+    if args.corpus:
+        narratives = [narrative for _, narrative in read_narratives(args.corpus) if narrative.strip()]
+    else:
+        narratives = synthetic_narratives(sections, args.corpus_size, seed=args.seed)
+
+    backend = None
+    client = None
+    if args.target == 'local':
+        call = make_local_target(ScoringEngine(sections, judgments))
+    else:
+        url = args.url
+        if args.target == 'standin':
+            backend = StandInBackend(sections, judgments, args.db_latency_ms,
+                                     bulk_judgments=not args.per_section_judgments).start()
+            url = backend.url
+        client = ApiClient(url, pool_size=args.concurrency, retries=0)
+        call = make_api_target(client)
+
+    try:
+        result = summarize(*run_load(call, narratives, args.requests, args.concurrency, args.rate, args.seed))
+    finally:
+        if client:
+            client.close()
+        if backend:
+            backend.stop()
+
+    result['config'] = {key: value for key, value in vars(args).items() if key not in ('out', 'compare')}
+    result['environment'] = {'python': platform.python_version(), 'machine': platform.machine()}
+    result['timestamp'] = time.time()
+    print_report(result)
+
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            previous = json.load(f)
+        for key in ('target', 'requests', 'concurrency', 'rate', 'db_latency_ms'):
+            if previous.get('config', {}).get(key) != result['config'][key]:
+                print(f"warning: '{key}' differs from the compared run; results may not be comparable")
+        regressions = compare(result, previous, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%} against {args.compare}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""Throughput of the analyze path as backend replicas are added
+
+    python -m fir_assist.benchmarks.scaling --replicas 1,2,4
+    python -m fir_assist.benchmarks.scaling --target compose --replicas 1,2,4 --url http://localhost:5080
+
+``standin`` runs each replica as a separate stand-in backend process and
+spreads requests over them round-robin, as the proxy would. ``compose``
+rescales the ``backend-replica`` service of the ``scale`` profile with
+docker-compose and drives the nginx proxy in front of it.
+"""
+import argparse
+import itertools
+import multiprocessing
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from fir_assist.benchmarks.corpus import synthetic_narratives
+from fir_assist.benchmarks.loadtest import StandInBackend, make_api_target, run_load, summarize
+from fir_assist.client import ApiClient
+from fir_assist.deploy import compose_command
+from fir_assist.seed import load_seed_data
+
+JOB_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'job')
+
+
+def _serve_standin(db_latency_ms, urls, stop):
+    sections, judgments = load_seed_data()
+    backend = StandInBackend(sections, judgments, db_latency_ms).start()
+    urls.put(backend.url)
+    stop.wait()
+    backend.stop()
+
+
+class StandInReplicas:
+    """``count`` stand-in backends, each in its own process"""
+
+    def __init__(self, count, db_latency_ms=2.0):
+        context = multiprocessing.get_context('spawn')
+        urls = context.Queue()
+        self._stop = context.Event()
+        self._processes = [
+            context.Process(target=_serve_standin, args=(db_latency_ms, urls, self._stop), daemon=True)
+            for _ in range(count)
+        ]
+        for process in self._processes:
+            process.start()
+        self.urls = [urls.get(timeout=60) for _ in self._processes]
+
+    def close(self):
+        self._stop.set()
+        for process in self._processes:
+            process.join(timeout=10)
+
+
+def make_round_robin_target(urls, concurrency):
+    clients = [ApiClient(url, pool_size=concurrency, retries=0) for url in urls]
+    targets = itertools.cycle([make_api_target(client) for client in clients])
+    lock = threading.Lock()
+
+    def call(narrative):
+        with lock:
+            target = next(targets)
+        return target(narrative)
+    return call, clients
+
+
+def scale_compose(replicas, url, timeout=300):
+    """Run ``replicas`` backend replicas behind the proxy and wait until it answers"""
+    subprocess.run(
+        compose_command() + ['--profile', 'scale', 'up', '-d', '--scale', f'backend-replica={replicas}'],
+        cwd=JOB_DIR, check=True,
+    )
+    # nginx resolves the replica addresses at startup
+    subprocess.run(compose_command() + ['--profile', 'scale', 'restart', 'proxy'], cwd=JOB_DIR, check=True)
+    client = ApiClient(url, retries=0)
+    deadline = time.time() + timeout
+    try:
+        while time.time() < deadline:
+            try:
+                if client.get('/health', timeout=2).status_code == 200:
+                    return
+            except Exception:
+                pass
+            time.sleep(1)
+    finally:
+        client.close()
+    raise RuntimeError(f"Proxy at {url} did not become healthy")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--target', choices=['standin', 'compose'], default='standin')
+    parser.add_argument('--url', default='http://localhost:5080', help="Proxy URL for --target compose")
+    parser.add_argument('--replicas', default='1,2,4', help="Comma-separated replica counts")
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--db-latency-ms', type=float, default=2.0)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    sections, _ = load_seed_data()
+    narratives = synthetic_narratives(sections, 500, seed=args.seed)
+    counts = [int(count) for count in args.replicas.split(',')]
+
+    results = []
+    for count in counts:
+        replicas = clients = None
+        try:
+            if args.target == 'compose':
+                scale_compose(count, args.url)
+                clients = [ApiClient(args.url, pool_size=args.concurrency, retries=0)]
+                call = make_api_target(clients[0])
+            else:
+                replicas = StandInReplicas(count, args.db_latency_ms)
+                call, clients = make_round_robin_target(replicas.urls, args.concurrency)
+            result = summarize(*run_load(call, narratives, args.requests, args.concurrency))
+        finally:
+            for client in clients or ():
+                client.close()
+            if replicas:
+                replicas.close()
+        results.append((count, result))
+
+    print(f"target: {args.target}, {args.requests} requests at concurrency {args.concurrency}, "
+          f"{os.cpu_count()} CPUs")
+    base = results[0][1]['throughput_rps'] / results[0][0] if results and results[0][1]['throughput_rps'] else 0
+    for count, result in results:
+        latency = result['latency']
+        efficiency = result['throughput_rps'] / (base * count) if base else 0
+        print(f"{count:>3} replicas  {result['throughput_rps']:8.1f} req/s  p50 {latency['p50_ms']:6.2f}ms  "
+              f"p99 {latency['p99_ms']:7.2f}ms  scaling efficiency {efficiency:.0%}  errors {result['errors']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
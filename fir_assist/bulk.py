@@ -0,0 +1,208 @@
+"""Vectorized bulk scoring of narratives with a sparse document-term matrix
+
+Each chunk of narratives becomes a binary CSR matrix over the engine's
+vocabulary (stemmed single-word keywords followed by phrase keywords). One
+sparse product with the term-to-section weight matrix scores every section
+for every narrative, and ``argpartition`` selects the top sections. Ranking
+and scores match ``ScoringEngine`` and therefore the backend controller.
+"""
+import json
+import re
+import time
+
+import numpy as np
+from scipy import sparse
+
+from fir_assist.batch import empty_record, load_finished_ids, read_narratives
+from fir_assist.scoring import TOP_K
+from fir_assist.stemmer import stem
+
+DEFAULT_CHUNK_SIZE = 10000
+# Distinct raw tokens remembered across chunks before the cache is reset
+TOKEN_CACHE_SIZE = 200000
+
+# Narratives in a chunk are joined with a character that is neither part of
+# a word nor of any phrase keyword, and that is matched as its own token.
+_SEPARATOR = '\x00'
+_SEPARATOR_ID = -2
+_CHUNK_TOKEN = re.compile(r'[A-Za-zА-Яа-я0-9_]+|\x00')
+
+
+class BulkScorer:
+    """Score many narratives at once against a ``ScoringEngine`` index"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.stem_ids = {stemmed: i for i, stemmed in enumerate(engine.stem_postings)}
+        phrase_offset = len(self.stem_ids)
+        n_terms = phrase_offset + len(engine.phrases)
+        n_sections = len(engine.sections)
+
+        rows, cols, weights = [], [], []
+        for stemmed, term_id in self.stem_ids.items():
+            for index, weight in engine.stem_postings[stemmed]:
+                rows.append(term_id)
+                cols.append(index)
+                weights.append(weight)
+        for phrase_id, postings in enumerate(engine.phrase_postings):
+            for index, weight in postings:
+                rows.append(phrase_offset + phrase_id)
+                cols.append(index)
+                weights.append(weight)
+
+        # Raw token -> term id (or -1), so each distinct word is stemmed once
+        self._token_terms = {_SEPARATOR: _SEPARATOR_ID}
+        self.phrase_offset = phrase_offset
+        self.n_terms = n_terms
+        self.weights = sparse.csr_matrix(
+            (np.array(weights, dtype=np.int32), (rows, cols)),
+            shape=(n_terms, n_sections),
+        )
+        # Sections without keywords never score, so a count of 1 is safe
+        self.keyword_counts = np.maximum(np.array(engine.keyword_counts, dtype=np.float64), 1)
+        # Among equal raw scores the earlier section must win, so ties are
+        # broken by folding the reversed section index into the sort key.
+        self.tie_break = np.arange(n_sections - 1, -1, -1, dtype=np.int64)
+
+    def document_term_matrix(self, narratives):
+        """Build the binary CSR document-term matrix for ``narratives``
+
+        The whole chunk is joined into one string so tokenizing and phrase
+        matching run as single regex scans; row numbers are recovered from
+        the separator positions with NumPy.
+        """
+        lowered = [narrative.lower().replace(_SEPARATOR, ' ') for narrative in narratives]
+        joined = _SEPARATOR.join(lowered)
+        n_rows = len(lowered)
+
+        tokens = _CHUNK_TOKEN.findall(joined)
+        # Typos and names make the vocabulary of a large file unbounded, so
+        # the cache is reset between chunks once it grows too big
+        if len(self._token_terms) > TOKEN_CACHE_SIZE:
+            self._token_terms = {_SEPARATOR: _SEPARATOR_ID}
+        token_terms = self._token_terms
+        for token in set(tokens).difference(token_terms):
+            token_terms[token] = self.stem_ids.get(stem(token), -1)
+        term_ids = np.fromiter(map(token_terms.__getitem__, tokens), dtype=np.int64, count=len(tokens))
+        is_separator = term_ids == _SEPARATOR_ID
+        token_rows = np.cumsum(is_separator) - is_separator
+        matched = term_ids >= 0
+        rows = [token_rows[matched]]
+        cols = [term_ids[matched]]
+
+        matcher = self.engine._matcher
+        if matcher._pattern is not None:
+            separator_offsets = np.cumsum([len(text) + 1 for text in lowered]) - 1
+            phrase_rows, phrase_cols = [], []
+            for match in matcher._pattern.finditer(joined):
+                row = int(np.searchsorted(separator_offsets, match.start()))
+                for phrase_id in matcher._implied[match.group(1)]:
+                    phrase_rows.append(row)
+                    phrase_cols.append(self.phrase_offset + phrase_id)
+            rows.append(np.array(phrase_rows, dtype=np.int64))
+            cols.append(np.array(phrase_cols, dtype=np.int64))
+
+        rows = np.concatenate(rows)
+        cols = np.concatenate(cols)
+        matrix = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int32), (rows, cols)),
+            shape=(n_rows, self.n_terms),
+        )
+        # Repeated words and phrases only count once, as in the controller
+        matrix.sum_duplicates()
+        matrix.data[:] = 1
+        return matrix
+
+    def score_chunk(self, narratives, k=TOP_K):
+        """Return ``(indices, raw_scores, scores)`` arrays of shape ``(n, k)``
+
+        Slots without a matching section hold index ``-1`` and score ``0``.
+        """
+        n_sections = self.weights.shape[1]
+        raw = (self.document_term_matrix(narratives) @ self.weights).toarray().astype(np.int64)
+        k = min(k, n_sections)
+        if k == 0:
+            empty = np.zeros((len(narratives), 0))
+            return empty.astype(np.int64), empty.astype(np.int64), empty
+
+        keys = raw * n_sections + self.tie_break
+        if k < n_sections:
+            top = np.argpartition(-keys, k - 1, axis=1)[:, :k]
+        else:
+            top = np.tile(np.arange(n_sections), (len(narratives), 1))
+        order = np.argsort(-np.take_along_axis(keys, top, axis=1), axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+
+        top_raw = np.take_along_axis(raw, top, axis=1)
+        top_scores = np.minimum(top_raw / self.keyword_counts[top], 1.0)
+        top = np.where(top_raw > 0, top, -1)
+        return top, top_raw, np.where(top_raw > 0, top_scores, 0.0)
+
+    def iter_scores(self, narratives, chunk_size=DEFAULT_CHUNK_SIZE, k=TOP_K):
+        """Score an iterable of narratives chunk by chunk with bounded memory"""
+        chunk = []
+        for narrative in narratives:
+            chunk.append(narrative)
+            if len(chunk) >= chunk_size:
+                yield chunk, self.score_chunk(chunk, k)
+                chunk = []
+        if chunk:
+            yield chunk, self.score_chunk(chunk, k)
+
+    def recommendations(self, indices, scores):
+        """Turn one row of ``score_chunk`` output into API-shaped recommendations"""
+        sections = self.engine.sections
+        judgments = self.engine.judgments
+        result = []
+        for index, score in zip(indices, scores):
+            if index < 0:
+                break
+            section = sections[index]
+            result.append({
+                'code': section['code'],
+                'title': section['title'],
+                'description': section['description'],
+                'score': float(score),
+                'judgments': list(judgments.get(section['code'])),
+            })
+        return result
+
+
+def score_file(input_path, output_path, engine, chunk_size=DEFAULT_CHUNK_SIZE, on_progress=None):
+    """Score a CSV/JSONL file in chunks, appending results in the batch format
+
+    Rows already present in ``output_path`` are skipped, and rows without a
+    narrative are recorded as skipped, as in ``run_batch``.
+    ``on_progress`` receives ``(rows_done, rows_per_second)`` after each chunk.
+    """
+    scorer = BulkScorer(engine)
+    finished = load_finished_ids(output_path)
+    done = 0
+    started = time.perf_counter()
+    ids = []
+
+    with open(output_path, 'a', encoding='utf-8') as out:
+        def pending_narratives():
+            for row_id, narrative in read_narratives(input_path):
+                if row_id in finished:
+                    continue
+                if not narrative.strip():
+                    out.write(json.dumps(empty_record(row_id)) + '\n')
+                    continue
+                ids.append(row_id)
+                yield narrative
+
+        for chunk, (indices, _, scores) in scorer.iter_scores(pending_narratives(), chunk_size):
+            chunk_ids = ids[:len(chunk)]
+            del ids[:len(chunk)]
+            for row_id, row_indices, row_scores in zip(chunk_ids, indices, scores):
+                out.write(json.dumps({
+                    'id': row_id,
+                    'success': True,
+                    'recommendations': scorer.recommendations(row_indices, row_scores),
+                }) + '\n')
+            out.flush()
+            done += len(chunk)
+            if on_progress:
+                on_progress(done, done / (time.perf_counter() - started))
+    return done
@@ -0,0 +1,253 @@
+"""Two-tier cache of analysis results keyed on the lowercased narrative
+
+The in-process tier is an LRU bounded by an approximate memory budget. The
+optional SQLite tier is shared by every Streamlit worker process on the host.
+Entries expire after a TTL and are ignored once the section/judgment data
+version they were computed against changes.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_MEMORY_BUDGET = 32 * 1024 * 1024
+DEFAULT_DISK_BUDGET = 256 * 1024 * 1024
+DEFAULT_TTL = 24 * 60 * 60
+SHARED_PREFIX = 'cache:'
+PUBLISH_EVERY = 100
+
+
+def normalize_narrative(narrative):
+    """Lowercase and strip the narrative, as the scorers see it
+
+    Phrase keywords are matched as substrings of the lowercased text, so
+    punctuation and inner whitespace can change the result and must stay in
+    the key. Only case and surrounding whitespace are ignored.
+    """
+    return narrative.lower().strip()
+
+
+def cache_key(narrative, namespace=''):
+    digest = hashlib.sha256(normalize_narrative(narrative).encode('utf-8')).hexdigest()
+    return f"{namespace}:{digest}" if namespace else digest
+
+
+class _DiskTier:
+    """SQLite-backed tier shared across processes"""
+
+    def __init__(self, path, budget):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.budget = budget
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                version TEXT NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL,
+                size INTEGER NOT NULL,
+                value TEXT NOT NULL
+            )
+        """)
+        self._conn.execute('CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)')
+        self._writes = 0
+
+    def get(self, key, version, min_created):
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value FROM results WHERE key = ? AND version = ? AND created >= ?',
+                (key, version, min_created),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute('UPDATE results SET accessed = ? WHERE key = ?', (time.time(), key))
+            return row[0]
+
+    def put(self, key, version, payload):
+        now = time.time()
+        evicted = 0
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)',
+                (key, version, now, now, len(payload), payload),
+            )
+            self._writes += 1
+            # Enforcing the budget scans the table, so only do it now and then
+            if self._writes % 100 == 0:
+                evicted = self._enforce_budget()
+        return evicted
+
+    def _enforce_budget(self):
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+        if total <= self.budget:
+            return 0
+        evicted = 0
+        target = self.budget * 0.9
+        for key, size in self._conn.execute(
+                'SELECT key, size FROM results ORDER BY accessed').fetchall():
+            if total <= target:
+                break
+            self._conn.execute('DELETE FROM results WHERE key = ?', (key,))
+            total -= size
+            evicted += 1
+        return evicted
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute('DELETE FROM results')
+
+    def entries(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+
+class ResultCache:
+    """LRU/TTL cache of ``/api/analyze`` results"""
+
+    def __init__(self, memory_budget=DEFAULT_MEMORY_BUDGET, ttl=DEFAULT_TTL,
+                 disk_path=None, disk_budget=DEFAULT_DISK_BUDGET, data_version='', shared=None):
+        self.memory_budget = memory_budget
+        self.ttl = ttl
+        self.data_version = data_version
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._memory_used = 0
+        self._disk = _DiskTier(disk_path, disk_budget) if disk_path else None
+        self.counters = {
+            'hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'invalidations': 0,
+        }
+        # Counters are added to the host-wide totals in ``shared`` as deltas
+        self.shared = shared
+        self._published = dict(self.counters)
+        self._publish_lock = threading.Lock()
+        self._lookups = 0
+
+    def set_data_version(self, version):
+        """Drop in-memory entries computed against an older data version
+
+        Disk entries are tagged with their version and simply stop matching.
+        """
+        version = version or ''
+        with self._lock:
+            if version == self.data_version:
+                return
+            self.data_version = version
+            self.counters['invalidations'] += len(self._entries)
+            self._entries.clear()
+            self._memory_used = 0
+
+    def get(self, narrative, namespace=''):
+        """Return the cached result for ``narrative`` or ``None``"""
+        if self.shared is not None:
+            self._lookups += 1
+            if self._lookups % PUBLISH_EVERY == 0:
+                self._publish()
+        key = cache_key(narrative, namespace)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                created, size, value = entry
+                if now - created <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self.counters['hits'] += 1
+                    return value
+                del self._entries[key]
+                self._memory_used -= size
+                self.counters['expirations'] += 1
+            version = self.data_version
+
+        if self._disk is not None:
+            payload = self._disk.get(key, version, now - self.ttl)
+            if payload is not None:
+                value = json.loads(payload)
+                with self._lock:
+                    self.counters['disk_hits'] += 1
+                    self._store(key, value, len(payload), now)
+                return value
+
+        with self._lock:
+            self.counters['misses'] += 1
+        return None
+
+    def put(self, narrative, value, namespace=''):
+        """Cache ``value`` as the result for ``narrative``"""
+        key = cache_key(narrative, namespace)
+        payload = json.dumps(value)
+        with self._lock:
+            self._store(key, value, len(payload), time.time())
+            version = self.data_version
+        if self._disk is not None:
+            evicted = self._disk.put(key, version, payload)
+            if evicted:
+                with self._lock:
+                    self.counters['evictions'] += evicted
+
+    def _store(self, key, value, size, created):
+        # The serialized length stands in for the in-memory footprint
+        size += len(key)
+        if size > self.memory_budget:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._memory_used -= previous[1]
+        self._entries[key] = (created, size, value)
+        self._memory_used += size
+        while self._memory_used > self.memory_budget:
+            _, (_, evicted_size, _) = self._entries.popitem(last=False)
+            self._memory_used -= evicted_size
+            self.counters['evictions'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._memory_used = 0
+        if self._disk is not None:
+            self._disk.clear()
+
+    def stats(self):
+        """Return counters plus current sizes for display
+
+        With a shared store, ``host`` holds the counters summed over every
+        worker process.
+        """
+        with self._lock:
+            stats = dict(self.counters)
+            stats['entries'] = len(self._entries)
+            stats['memory_bytes'] = self._memory_used
+        stats['hit_rate'] = _hit_rate(stats)
+        if self._disk is not None:
+            stats['disk_entries'] = self._disk.entries()
+        if self.shared is not None:
+            self._publish()
+            host = {key[len(SHARED_PREFIX):]: value for key, value in self.shared.counters(SHARED_PREFIX).items()}
+            host['hit_rate'] = _hit_rate(host)
+            stats['host'] = host
+        return stats
+
+    def _publish(self):
+        with self._publish_lock:
+            with self._lock:
+                counters = dict(self.counters)
+            for name, value in counters.items():
+                delta = value - self._published[name]
+                if delta:
+                    self.shared.incr(SHARED_PREFIX + name, delta)
+                    self._published[name] = value
+
+
+def _hit_rate(counters):
+    hits = counters.get('hits', 0) + counters.get('disk_hits', 0)
+    lookups = hits + counters.get('misses', 0)
+    return hits / lookups if lookups else 0.0
@@ -0,0 +1,351 @@
+"""Compact, memory-mapped snapshot of the section and judgment catalog
+
+Loading the collections as documents costs a dict per section and judgment
+plus a separate string for every field, in every worker process. A snapshot
+stores the same data as a handful of flat arrays instead:
+
+* every distinct string (codes, titles, keywords, case names, synopses) once,
+  in a single UTF-8 blob addressed by an offsets array;
+* section fields and judgment fields as ``int32`` ids into that string table;
+* section keywords, judgment section codes and the judgments of each code as
+  CSR pairs (an offsets array and one contiguous id array);
+* the Porter stem of every single-word keyword, so building a scoring engine
+  does not stem the vocabulary again.
+
+The file is opened with ``mmap``, so loading only parses a small JSON header,
+and the pages are shared by every process that maps the same snapshot.
+Snapshots are written by ``fir_assist.ingest`` after each import.
+
+    python -m fir_assist.catalog build --seed
+    python -m fir_assist.catalog info
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from collections.abc import Sequence
+
+import numpy as np
+
+from fir_assist.judgments import MAX_JUDGMENTS, JudgmentIndex
+from fir_assist.stemmer import stem
+
+MAGIC = b'FIRCAT\0\0'
+FORMAT_VERSION = 1
+DEFAULT_PATH = os.path.join(os.environ.get('FIR_ASSIST_DATA_DIR', '.fir_assist'), 'catalog.bin')
+_PREAMBLE = struct.Struct('<8sII')  # magic, format version, header length
+_ALIGN = 64
+
+
+def _aligned(size):
+    return -(-size // _ALIGN) * _ALIGN
+
+
+class _StringPool:
+    """Interns strings, assigning ids in first-seen order"""
+
+    def __init__(self):
+        self.ids = {}
+
+    def __call__(self, value):
+        return self.ids.setdefault(value, len(self.ids))
+
+    def arrays(self):
+        encoded = [value.encode('utf-8') for value in self.ids]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        return np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets
+
+
+def _csr(rows):
+    offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+    np.cumsum([len(row) for row in rows], out=offsets[1:])
+    ids = np.fromiter((item for row in rows for item in row), dtype=np.int32, count=int(offsets[-1]))
+    return offsets, ids
+
+
+def build_arrays(sections, judgments):
+    """Return the snapshot arrays for iterables of section and judgment documents"""
+    strings = _StringPool()
+    code_ids = {}
+
+    def code_id(code):
+        return code_ids.setdefault(strings(code), len(code_ids))
+
+    section_fields = {'section_code': [], 'section_title': [], 'section_description': []}
+    section_keywords = []
+    stems = {}
+    for section in sections:
+        code_id(section['code'])
+        section_fields['section_code'].append(strings(section['code']))
+        section_fields['section_title'].append(strings(section.get('title', '')))
+        section_fields['section_description'].append(strings(section.get('description', '')))
+        section_keywords.append([strings(keyword) for keyword in section.get('keywords', [])])
+        for keyword in section.get('keywords', []):
+            lower_keyword = keyword.lower()
+            if ' ' not in lower_keyword and lower_keyword not in stems:
+                stems[lower_keyword] = stem(lower_keyword)
+
+    judgment_fields = {'judgment_case_name': [], 'judgment_synopsis': []}
+    judgment_codes = []
+    for judgment in judgments:
+        judgment_fields['judgment_case_name'].append(strings(judgment['caseName']))
+        judgment_fields['judgment_synopsis'].append(strings(judgment.get('synopsis', '')))
+        judgment_codes.append([code_id(code) for code in judgment.get('sectionCodes', [])])
+
+    # Judgments of each code in collection order, so lookups need no grouping at load time
+    by_code = [[] for _ in code_ids]
+    for judgment_index, codes in enumerate(judgment_codes):
+        for code in codes:
+            by_code[code].append(judgment_index)
+
+    arrays = {}
+    arrays['codes'] = np.fromiter(code_ids, dtype=np.int32, count=len(code_ids))
+    for name, ids in {**section_fields, **judgment_fields}.items():
+        arrays[name] = np.asarray(ids, dtype=np.int32)
+    arrays['section_keyword_offsets'], arrays['section_keywords'] = _csr(section_keywords)
+    arrays['judgment_code_offsets'], arrays['judgment_codes'] = _csr(judgment_codes)
+    arrays['code_judgment_offsets'], arrays['code_judgments'] = _csr(by_code)
+    arrays['stem_keys'] = np.fromiter((strings(keyword) for keyword in stems), dtype=np.int32, count=len(stems))
+    arrays['stem_values'] = np.fromiter((strings(value) for value in stems.values()), dtype=np.int32, count=len(stems))
+    arrays['string_blob'], arrays['string_offsets'] = strings.arrays()
+    return arrays
+
+
+def write_snapshot(path, sections, judgments, data_version=''):
+    """Write a snapshot of ``sections`` and ``judgments`` to ``path`` atomically"""
+    arrays = build_arrays(sections, judgments)
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        layout[name] = [array.dtype.str, offset, int(array.size)]
+        offset += _aligned(array.nbytes)
+    header = json.dumps({
+        'data_version': data_version or '',
+        'created': time.time(),
+        'sections': int(arrays['section_code'].size),
+        'judgments': int(arrays['judgment_case_name'].size),
+        'arrays': layout,
+    }).encode('utf-8')
+    data_start = _aligned(_PREAMBLE.size + len(header))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    # Write to a temporary name first so readers never map a partial snapshot
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header)))
+        f.write(header)
+        for name, array in arrays.items():
+            f.seek(data_start + layout[name][1])
+            f.write(array.tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp_path, path)
+    return path
+
+
+def write_snapshot_from_mongo(db, path, data_version=''):
+    """Snapshot the ``sections`` and ``judgments`` collections of ``db``"""
+    sections = db.sections.find({}, {'_id': 0, 'code': 1, 'title': 1, 'description': 1, 'keywords': 1})
+    judgments = db.judgments.find({}, {'_id': 0, 'caseName': 1, 'synopsis': 1, 'sectionCodes': 1})
+    return write_snapshot(path, sections, judgments, data_version)
+
+
+class SectionList(Sequence):
+    """Sections of a catalog, decoded into API-shaped dicts on access"""
+
+    def __init__(self, catalog):
+        self._catalog = catalog
+
+    def __len__(self):
+        return self._catalog.section_count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        catalog = self._catalog
+        if index < 0:
+            index += len(self)
+        string = catalog.string
+        return {
+            'code': string(catalog.arrays['section_code'][index]),
+            'title': string(catalog.arrays['section_title'][index]),
+            'description': string(catalog.arrays['section_description'][index]),
+            'keywords': catalog.section_keywords(index),
+        }
+
+
+class CatalogJudgmentIndex(JudgmentIndex):
+    """``JudgmentIndex`` answered from a catalog's per-code judgment arrays"""
+
+    def __init__(self, catalog, max_per_section=MAX_JUDGMENTS):
+        self.catalog = catalog
+        self.max_per_section = max_per_section
+
+    def get(self, code):
+        catalog = self.catalog
+        code_index = catalog.code_index.get(code)
+        if code_index is None:
+            return []
+        offsets = catalog.arrays['code_judgment_offsets']
+        start = int(offsets[code_index])
+        end = min(int(offsets[code_index + 1]), start + self.max_per_section)
+        return [catalog.judgment(int(i)) for i in catalog.arrays['code_judgments'][start:end]]
+
+    def __len__(self):
+        offsets = self.catalog.arrays['code_judgment_offsets']
+        return int(np.count_nonzero(np.diff(offsets)))
+
+
+class Catalog:
+    """Read-only view of a snapshot file"""
+
+    def __init__(self, buffer, header, data_start, close=None):
+        self.header = header
+        self.data_version = header['data_version']
+        self.section_count = header['sections']
+        self.judgment_count = header['judgments']
+        self._close = close
+        self.arrays = {}
+        for name, (dtype, offset, count) in header['arrays'].items():
+            self.arrays[name] = np.frombuffer(buffer, dtype=np.dtype(dtype), count=count,
+                                              offset=data_start + offset)
+        self._blob = memoryview(buffer)[data_start + header['arrays']['string_blob'][1]:]
+        self._offsets = self.arrays['string_offsets']
+        self._strings = {}
+        self.sections = SectionList(self)
+        self._code_index = None
+
+    @classmethod
+    def load(cls, path):
+        """Map the snapshot at ``path``; raises ``ValueError`` if it is not a readable snapshot"""
+        with open(path, 'rb') as f:
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise ValueError(f"{path} is empty") from None
+        try:
+            header, data_start = cls._read_header(mapped, path)
+        except ValueError:
+            mapped.close()
+            raise
+        return cls(mapped, header, data_start, close=mapped.close)
+
+    @staticmethod
+    def _read_header(buffer, path):
+        if len(buffer) < _PREAMBLE.size:
+            raise ValueError(f"{path} is not a catalog snapshot")
+        magic, version, header_length = _PREAMBLE.unpack_from(buffer)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a catalog snapshot")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{path} has snapshot format {version}, expected {FORMAT_VERSION}")
+        header = json.loads(bytes(buffer[_PREAMBLE.size:_PREAMBLE.size + header_length]))
+        return header, _aligned(_PREAMBLE.size + header_length)
+
+    def string(self, string_id):
+        """Decode an interned string; each id is decoded at most once"""
+        string_id = int(string_id)
+        value = self._strings.get(string_id)
+        if value is None:
+            start, end = self._offsets[string_id], self._offsets[string_id + 1]
+            value = self._strings[string_id] = str(self._blob[start:end], 'utf-8')
+        return value
+
+    @property
+    def code_index(self):
+        """Map of section code to its position in the ``codes`` array"""
+        if self._code_index is None:
+            self._code_index = {self.string(code): i for i, code in enumerate(self.arrays['codes'])}
+        return self._code_index
+
+    def section_keyword_ids(self, index):
+        offsets = self.arrays['section_keyword_offsets']
+        return self.arrays['section_keywords'][offsets[index]:offsets[index + 1]]
+
+    def section_keywords(self, index):
+        return [self.string(keyword) for keyword in self.section_keyword_ids(index)]
+
+    def judgment(self, index):
+        return {
+            'caseName': self.string(self.arrays['judgment_case_name'][index]),
+            'synopsis': self.string(self.arrays['judgment_synopsis'][index]),
+        }
+
+    def judgment_codes(self, index):
+        offsets = self.arrays['judgment_code_offsets']
+        codes = self.arrays['codes']
+        return [self.string(codes[code]) for code in self.arrays['judgment_codes'][offsets[index]:offsets[index + 1]]]
+
+    def keyword_stems(self):
+        """Map of lowercased single-word keyword to its stem, as computed at snapshot time"""
+        string = self.string
+        return {string(key): string(value)
+                for key, value in zip(self.arrays['stem_keys'], self.arrays['stem_values'])}
+
+    def judgments(self, max_per_section=MAX_JUDGMENTS):
+        return CatalogJudgmentIndex(self, max_per_section)
+
+    def nbytes(self):
+        return sum(array.nbytes for array in self.arrays.values())
+
+    def close(self):
+        self.arrays = {}
+        self._offsets = None
+        self._blob.release()
+        if self._close is not None:
+            try:
+                self._close()
+            except BufferError:
+                # Views handed out by section_keyword_ids are still alive;
+                # the map is released when they are collected
+                pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or inspect a catalog snapshot")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build = subparsers.add_parser('build', help="Write a snapshot from MongoDB or the seed data")
+    build.add_argument('--path', default=DEFAULT_PATH)
+    build.add_argument('--seed', action='store_true', help="Snapshot the bundled seed.js data")
+    build.add_argument('--mongodb-uri', default=os.environ.get('MONGODB_URI', 'mongodb://localhost:27017/fir-assist'))
+    info = subparsers.add_parser('info', help="Print what a snapshot holds and how fast it loads")
+    info.add_argument('--path', default=DEFAULT_PATH)
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        if args.seed:
+            from fir_assist.seed import load_seed_data
+            sections, judgments = load_seed_data()
+            write_snapshot(args.path, sections, judgments, data_version='seed')
+        else:
+            from pymongo import MongoClient
+            from fir_assist.ingest import current_data_version
+            client = MongoClient(args.mongodb_uri)
+            try:
+                db = client.get_default_database()
+                write_snapshot_from_mongo(db, args.path, current_data_version(db))
+            finally:
+                client.close()
+        print(f"Wrote {args.path} ({os.path.getsize(args.path) / 1024:.0f} KB)")
+        return 0
+
+    start = time.perf_counter()
+    catalog = Catalog.load(args.path)
+    load_ms = (time.perf_counter() - start) * 1000
+    print(f"snapshot:     {args.path} (format {FORMAT_VERSION}, data version {catalog.data_version or 'unknown'})")
+    print(f"sections:     {catalog.section_count}")
+    print(f"judgments:    {catalog.judgment_count}")
+    print(f"strings:      {catalog.arrays['string_offsets'].size - 1} interned, "
+          f"{catalog.arrays['string_blob'].nbytes / 1024:.0f} KB")
+    print(f"arrays:       {catalog.nbytes() / 1024:.0f} KB")
+    print(f"load time:    {load_ms:.2f} ms")
+    catalog.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,154 @@
+"""Pooled HTTP client for the FIR Assist backend API"""
+import json
+import threading
+import time
+from collections import defaultdict
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_CONNECT_TIMEOUT = 3.05
+DEFAULT_READ_TIMEOUT = 30
+DEFAULT_POOL_SIZE = 16
+# Hosts with their own connection pool; the backend and the frontend probe
+# must not evict each other's keep-alive connections
+POOL_HOSTS = 4
+
+
+class LatencyStats:
+    """Thread-safe per-endpoint request counters and latency totals"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = defaultdict(lambda: {
+            'requests': 0,
+            'errors': 0,
+            'total_ms': 0.0,
+            'max_ms': 0.0,
+            'last_ms': 0.0,
+        })
+
+    def record(self, endpoint, elapsed_ms, error=False):
+        with self._lock:
+            entry = self._stats[endpoint]
+            entry['requests'] += 1
+            entry['errors'] += int(error)
+            entry['total_ms'] += elapsed_ms
+            entry['last_ms'] = elapsed_ms
+            entry['max_ms'] = max(entry['max_ms'], elapsed_ms)
+
+    def snapshot(self):
+        """Return a list of per-endpoint rows suitable for a dataframe"""
+        with self._lock:
+            rows = []
+            for endpoint, entry in sorted(self._stats.items()):
+                count = entry['requests']
+                rows.append({
+                    'Endpoint': endpoint,
+                    'Requests': count,
+                    'Errors': entry['errors'],
+                    'Avg (ms)': round(entry['total_ms'] / count, 1) if count else 0.0,
+                    'Last (ms)': round(entry['last_ms'], 1),
+                    'Max (ms)': round(entry['max_ms'], 1),
+                })
+            return rows
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+class ApiClient:
+    """Keep-alive session to the backend with bounded pooling and retries
+
+    One instance is meant to be shared by every Streamlit session in the
+    process, so connections to the backend are reused across reruns.
+    """
+
+    def __init__(self, base_url, pool_size=DEFAULT_POOL_SIZE,
+                 connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout=DEFAULT_READ_TIMEOUT, retries=2, backoff=0.3):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = (connect_timeout, read_timeout)
+        self.stats = LatencyStats()
+
+        # Only idempotent requests are retried on read errors; a POST to
+        # /api/analyze is retried only when the connection never opened.
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(['GET', 'HEAD', 'OPTIONS']),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=POOL_HOSTS,
+            pool_maxsize=pool_size,
+            pool_block=True,
+            max_retries=retry,
+        )
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        # Health probes must fail within their own timeout, so they get a
+        # small session that never retries
+        probe_adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=2, max_retries=0)
+        self.probe_session = requests.Session()
+        self.probe_session.mount('http://', probe_adapter)
+        self.probe_session.mount('https://', probe_adapter)
+
+    def request(self, method, path, timeout=None, retry=True, **kwargs):
+        """Send a request to ``path`` on the backend and record its latency
+
+        With ``retry=False`` the request is sent once, without the retries
+        and backoff of the shared session.
+        """
+        url = path if path.startswith('http') else f"{self.base_url}{path}"
+        endpoint = f"{method.upper()} {path}"
+        session = self.session if retry else self.probe_session
+        start = time.perf_counter()
+        try:
+            response = session.request(
+                method, url, timeout=timeout or self.timeout, **kwargs
+            )
+        except requests.exceptions.RequestException:
+            self.stats.record(endpoint, (time.perf_counter() - start) * 1000, error=True)
+            raise
+        self.stats.record(
+            endpoint,
+            (time.perf_counter() - start) * 1000,
+            error=response.status_code >= 500,
+        )
+        return response
+
+    def get(self, path, **kwargs):
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request('POST', path, **kwargs)
+
+    def stream_ndjson(self, path, **kwargs):
+        """POST to a streaming endpoint and yield each NDJSON line as a dict
+
+        The response object is yielded first so callers can check the status
+        before consuming events; latency is recorded once the headers arrive.
+        """
+        response = self.request('POST', path, stream=True, **kwargs)
+        try:
+            yield response
+            if response.status_code != 200:
+                return
+            for line in response.iter_lines():
+                if line:
+                    yield json.loads(line)
+        finally:
+            response.close()
+
+    def close(self):
+        self.session.close()
+        self.probe_session.close()
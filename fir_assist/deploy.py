@@ -0,0 +1,201 @@
+"""Background docker-compose jobs with live logs
+
+Deploy and stop run in a worker thread with ``cwd`` set on the subprocess, so
+the Streamlit script thread is never blocked and the process working
+directory is never changed. Only one job runs at a time: a thread lock
+serializes sessions in this process and an advisory file lock serializes
+separate Streamlit worker processes.
+"""
+import itertools
+import os
+import shutil
+import signal
+import subprocess
+import threading
+import time
+from collections import deque
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+ACTIONS = {
+    'deploy': (['up', '-d', '--build'], 300),
+    'stop': (['down'], 60),
+}
+MAX_LOG_LINES = 5000
+
+
+def compose_command():
+    """Return the docker-compose invocation available on this host"""
+    if shutil.which('docker-compose'):
+        return ['docker-compose']
+    if shutil.which('docker'):
+        return ['docker', 'compose']
+    return ['docker-compose']
+
+
+def _signal_group(process, sig):
+    """Send ``sig`` to ``process`` and everything in its process group"""
+    if process.poll() is not None:
+        return
+    try:
+        if os.name == 'posix':
+            os.killpg(process.pid, sig)
+        else:
+            process.terminate()
+    except ProcessLookupError:
+        pass
+
+
+class DeploymentJob:
+    """One docker-compose invocation and its captured output"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, action, command, timeout):
+        self.id = next(self._ids)
+        self.action = action
+        self.command = command
+        self.timeout = timeout
+        self.status = 'running'
+        self.returncode = None
+        self.started_at = time.time()
+        self.finished_at = None
+        self.logs = deque(maxlen=MAX_LOG_LINES)
+        self.lines_seen = 0
+        self._process = None
+        self._cancelled = False
+        self._timed_out = False
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        return self.status == 'running'
+
+    @property
+    def elapsed(self):
+        return (self.finished_at or time.time()) - self.started_at
+
+    def log(self, line):
+        with self._lock:
+            self.logs.append(line)
+            self.lines_seen += 1
+
+    def tail(self, lines=200):
+        """Return the last ``lines`` lines of output"""
+        with self._lock:
+            return list(self.logs)[-lines:]
+
+    def cancel(self, grace=10):
+        """Stop the running docker-compose process, killing it after ``grace`` seconds"""
+        self._cancelled = True
+        process = self._process
+        if process is not None and process.poll() is None:
+            _signal_group(process, signal.SIGTERM)
+            killer = threading.Timer(grace, _signal_group, args=(process, getattr(signal, 'SIGKILL', signal.SIGTERM)))
+            killer.daemon = True
+            killer.start()
+
+    def summary(self):
+        verb = 'Deployment' if self.action == 'deploy' else 'Stop'
+        if self.status == 'succeeded':
+            return "Services deployed successfully!" if self.action == 'deploy' else "Services stopped successfully!"
+        return {
+            'running': f"{verb} in progress...",
+            'failed': f"{verb} failed" + (f" (exit code {self.returncode})" if self.returncode is not None else ""),
+            'cancelled': f"{verb} cancelled",
+            'timed_out': f"{verb} timed out",
+        }[self.status]
+
+
+class DeploymentManager:
+    """Run at most one docker-compose job at a time in the background"""
+
+    def __init__(self, job_dir, lock_path=None, command=None):
+        self.job_dir = os.path.abspath(job_dir)
+        self.lock_path = lock_path
+        self.command = command or compose_command()
+        self._lock = threading.Lock()
+        self.current = None
+
+    def start(self, action):
+        """Start ``action`` ('deploy' or 'stop') and return ``(job, message)``
+
+        ``job`` is ``None`` when another job is still running here or in
+        another Streamlit process.
+        """
+        args, timeout = ACTIONS[action]
+        with self._lock:
+            if self.current is not None and self.current.running:
+                return None, f"A {self.current.action} is already running"
+            lock_file = self._acquire_file_lock()
+            if lock_file is False:
+                return None, "A deployment operation is running in another Streamlit process"
+            job = DeploymentJob(action, self.command + args, timeout)
+            self.current = job
+        threading.Thread(
+            target=self._run, args=(job, lock_file), name=f'deploy-{job.id}', daemon=True
+        ).start()
+        return job, f"{action.title()} started"
+
+    def _acquire_file_lock(self):
+        if not self.lock_path or fcntl is None:
+            return None
+        os.makedirs(os.path.dirname(os.path.abspath(self.lock_path)), exist_ok=True)
+        lock_file = open(self.lock_path, 'w')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        return lock_file
+
+    def _run(self, job, lock_file):
+        job.log(f"$ {' '.join(job.command)}  (in {self.job_dir})")
+        timer = None
+        try:
+            job._process = subprocess.Popen(
+                job.command,
+                cwd=self.job_dir,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                stdin=subprocess.DEVNULL,
+                text=True,
+                bufsize=1,
+                # Own process group, so cancelling also stops the build
+                # processes docker-compose spawns (which hold our pipe open)
+                start_new_session=os.name == 'posix',
+            )
+            if job._cancelled:
+                _signal_group(job._process, signal.SIGTERM)
+            timer = threading.Timer(job.timeout, self._time_out, args=(job,))
+            timer.daemon = True
+            timer.start()
+            for line in job._process.stdout:
+                job.log(line.rstrip('\n'))
+            job.returncode = job._process.wait()
+            # The status only leaves 'running' once the process has exited,
+            # so a new job cannot start while a killed one is still dying
+            if job._timed_out:
+                job.status = 'timed_out'
+            elif job._cancelled:
+                job.status = 'cancelled'
+            else:
+                job.status = 'succeeded' if job.returncode == 0 else 'failed'
+        except Exception as e:
+            job.log(f"Error: {e}")
+            job.status = 'failed'
+        finally:
+            if timer is not None:
+                timer.cancel()
+            job.finished_at = time.time()
+            job.log(f"[{job.status} after {job.elapsed:.1f}s]")
+            if lock_file:
+                lock_file.close()
+
+    def _time_out(self, job):
+        if job.running:
+            job._timed_out = True
+            _signal_group(job._process, getattr(signal, 'SIGKILL', signal.SIGTERM))
@@ -0,0 +1,259 @@
+"""Typo-tolerant and transliteration-aware keyword matching
+
+The controller only credits a keyword when its stem, or the exact phrase,
+appears in the narrative, so "robbery" misses "robbry", "break-in" misses
+"break in", and Hinglish narratives ("ghar mein chori hui") match nothing.
+``FuzzyMatcher`` compiles every section keyword, and every alias from a
+transliteration table, into token patterns once. The patterns are indexed by
+a deletion neighbourhood (the SymSpell construction): each vocabulary word is
+stored under every string reachable by deleting up to ``max_distance``
+characters. A narrative token then finds all words within that edit distance
+with a handful of dict lookups, and the candidates are confirmed with a
+bounded Levenshtein check. A narrative is scanned once, left to right, and
+each distinct token is looked up only once.
+
+``FuzzyScorer`` adds these matches to the exact engine's scores. A keyword
+the exact engine already credited is never counted twice; aliases count in
+full, and a match needing ``n`` edits counts ``fuzzy_weight ** n`` of the
+keyword's weight. ``settings_for_threshold`` derives both knobs from the
+confidence threshold in the Streamlit settings.
+
+    python -m fir_assist.fuzzy "ghar mein ghus kar zewar ki chori ki"
+"""
+import argparse
+import json
+import re
+import sys
+
+from fir_assist.scoring import TOP_K
+from fir_assist.stemmer import stem, tokenize
+
+MAX_DISTANCE = 2
+# Shortest token allowed 1 and 2 edits; shorter words are too easy to confuse
+MIN_LENGTH = {1: 5, 2: 8}
+TOKEN_CACHE_SIZE = 100000
+
+# Romanized Hindi/Urdu and Devanagari terms common in FIR narratives, mapped
+# to the English keyword they stand for
+TRANSLITERATIONS = {
+    'hatya': 'murder', 'hathya': 'murder', 'qatl': 'murder', 'katl': 'murder', 'khoon': 'murder',
+    'maar diya': 'killed', 'maar dala': 'killed', 'maar daala': 'killed', 'jaan se maar': 'kill',
+    'jaan se maarne ki koshish': 'tried to kill',
+    'chori': 'theft', 'chor': 'theft', 'chura': 'stole', 'churaya': 'stole', 'churakar': 'stole',
+    'chura liya': 'stole', 'loot': 'robbery', 'lootpaat': 'robbery', 'looti': 'robbed',
+    'chheen': 'snatched', 'chheena': 'snatched', 'chhina': 'snatched', 'jhapat': 'snatched',
+    'dhokha': 'cheat', 'dhoka': 'cheat', 'dhokhadhadi': 'fraud', 'thagi': 'fraud', 'thag': 'cheated',
+    'farzi': 'forged', 'jaali': 'forged', 'nakli': 'fake document',
+    'sendh': 'housebreaking', 'ghus': 'forcibly entered', 'ghus kar': 'forcibly entered',
+    'ghusa': 'forcibly entered', 'ghuspaith': 'trespass',
+    'maarpeet': 'assault', 'maar peet': 'assault', 'pitai': 'beating', 'peeta': 'beaten',
+    'peet diya': 'beaten', 'chot': 'injury', 'ghayal': 'injuries', 'hamla': 'attacked',
+    'balatkar': 'rape', 'chhedkhani': 'molestation', 'chhed chhad': 'molestation',
+    'हत्या': 'murder', 'क़त्ल': 'murder', 'कत्ल': 'murder', 'चोरी': 'theft', 'लूट': 'robbery',
+    'धोखा': 'cheat', 'धोखाधड़ी': 'fraud', 'जालसाजी': 'forgery', 'सेंध': 'housebreaking',
+    'मारपीट': 'assault', 'चोट': 'injury', 'हमला': 'attacked', 'बलात्कार': 'rape', 'छेड़छाड़': 'molestation',
+}
+
+# Narratives may mix scripts, so match any run of word characters
+_WORD = re.compile(r'\w+')
+
+
+def settings_for_threshold(threshold):
+    """Return ``(max_distance, fuzzy_weight)`` for a confidence threshold in [0, 1]
+
+    A higher threshold trades recall for precision and speed: from 0.9 only
+    exact tokens and aliases match, from 0.5 one edit is allowed, and below
+    that two. Each edit keeps ``1 - threshold`` of a keyword's weight.
+    """
+    threshold = min(max(threshold, 0.0), 1.0)
+    max_distance = 0 if threshold >= 0.9 else 1 if threshold >= 0.5 else 2
+    return max_distance, 1.0 - threshold
+
+
+def bounded_distance(a, b, limit):
+    """Levenshtein distance between ``a`` and ``b``, or ``limit + 1`` if it exceeds ``limit``"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char in enumerate(a, 1):
+        current = [i]
+        best = i
+        for j, other in enumerate(b, 1):
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char != other))
+            current.append(value)
+            best = min(best, value)
+        if best > limit:
+            return limit + 1
+        previous = current
+    return min(previous[-1], limit + 1)
+
+
+def _deletions(word, depth):
+    """Every string reachable from ``word`` by deleting up to ``depth`` characters"""
+    found = {word}
+    frontier = {word}
+    for _ in range(depth):
+        frontier = {item[:i] + item[i + 1:] for item in frontier for i in range(len(item))}
+        found |= frontier
+    return found
+
+
+def allowed_distance(length, max_distance):
+    """Edits allowed for a word of ``length`` characters"""
+    return max((d for d, minimum in MIN_LENGTH.items() if d <= max_distance and length >= minimum), default=0)
+
+
+class FuzzyMatcher:
+    """Keyword and alias patterns compiled for one linear scan per narrative
+
+    ``keys`` maps each lowercased keyword to the engine posting it scores
+    through: ``('stem', stemmed)`` for single words and ``('phrase', id)``
+    for phrases, as in ``ScoringEngine``.
+    """
+
+    def __init__(self, keys, aliases=TRANSLITERATIONS, max_distance=1):
+        self.max_distance = min(max_distance, MAX_DISTANCE)
+        # Each pattern is a tuple of tokens, indexed by its first token
+        self.patterns = {}
+        for keyword, key in keys.items():
+            self._add(tuple(tokenize(keyword)), key)
+        for alias, target in aliases.items():
+            key = keys.get(target.lower())
+            if key is not None:
+                self._add(tuple(_WORD.findall(alias.lower())), key)
+
+        self.vocabulary = {word for pattern in self._all_patterns() for word in pattern[0]}
+        self._neighbours = {}
+        if self.max_distance:
+            for word in self.vocabulary:
+                for variant in _deletions(word, allowed_distance(len(word), self.max_distance)):
+                    self._neighbours.setdefault(variant, []).append(word)
+        self._token_cache = {}
+
+    @classmethod
+    def from_engine(cls, engine, aliases=TRANSLITERATIONS, max_distance=1):
+        phrase_ids = {phrase: i for i, phrase in enumerate(engine.phrases)}
+        keys = {}
+        for index in range(len(engine.sections)):
+            for keyword in engine.sections[index].get('keywords', []):
+                lower_keyword = keyword.lower()
+                if ' ' in lower_keyword:
+                    keys[lower_keyword] = ('phrase', phrase_ids[lower_keyword])
+                else:
+                    keys[lower_keyword] = ('stem', stem(lower_keyword))
+        return cls(keys, aliases, max_distance)
+
+    def _add(self, tokens, key):
+        if tokens:
+            self.patterns.setdefault(tokens[0], []).append((tokens, key))
+
+    def _all_patterns(self):
+        return (pattern for patterns in self.patterns.values() for pattern in patterns)
+
+    def candidates(self, token):
+        """Return ``{vocabulary word: edits}`` for the words ``token`` may stand for"""
+        cached = self._token_cache.get(token)
+        if cached is not None:
+            return cached
+        found = {}
+        # The vocabulary word's length sets the edit budget, so a deletion
+        # may leave the token one character under the minimum
+        token_limit = allowed_distance(len(token) + 1, self.max_distance)
+        if token in self.vocabulary:
+            # A correctly spelled keyword is not also read as a typo of another
+            found[token] = 0
+        elif token_limit:
+            for variant in _deletions(token, token_limit):
+                for word in self._neighbours.get(variant, ()):
+                    if word not in found:
+                        limit = min(token_limit, allowed_distance(len(word), self.max_distance))
+                        distance = bounded_distance(token, word, limit)
+                        if distance <= limit:
+                            found[word] = distance
+        if len(self._token_cache) >= TOKEN_CACHE_SIZE:
+            self._token_cache.clear()
+        self._token_cache[token] = found
+        return found
+
+    def matches(self, lower_narrative):
+        """Return ``{key: fewest edits}`` for every pattern found in the narrative"""
+        tokens = _WORD.findall(lower_narrative)
+        candidates = [self.candidates(token) for token in tokens]
+        best = {}
+        for start, token_candidates in enumerate(candidates):
+            for word, edits in token_candidates.items():
+                for pattern, key in self.patterns.get(word, ()):
+                    total = edits
+                    end = start + len(pattern)
+                    if end > len(tokens):
+                        continue
+                    for offset in range(1, len(pattern)):
+                        extra = candidates[start + offset].get(pattern[offset])
+                        if extra is None:
+                            break
+                        total += extra
+                    else:
+                        if total <= self.max_distance and total < best.get(key, self.max_distance + 1):
+                            best[key] = total
+        return best
+
+
+class FuzzyScorer:
+    """Exact keyword scores plus fuzzy and transliterated keyword matches"""
+
+    def __init__(self, engine, matcher, fuzzy_weight=0.5):
+        self.engine = engine
+        self.matcher = matcher
+        self.fuzzy_weight = fuzzy_weight
+
+    @classmethod
+    def for_threshold(cls, engine, threshold, aliases=TRANSLITERATIONS):
+        max_distance, fuzzy_weight = settings_for_threshold(threshold)
+        return cls(engine, FuzzyMatcher.from_engine(engine, aliases, max_distance), fuzzy_weight)
+
+    def raw_scores(self, narrative):
+        lower_narrative = narrative.lower()
+        stemmed_tokens = {stem(token) for token in tokenize(lower_narrative)}
+        phrase_ids = self.engine.phrase_ids(lower_narrative)
+        scores = self.engine.raw_scores(narrative, stemmed_tokens, phrase_ids)
+        for (kind, value), edits in self.matcher.matches(lower_narrative).items():
+            # Keywords the exact engine credited are not counted again
+            if kind == 'stem':
+                if value in stemmed_tokens:
+                    continue
+                postings = self.engine.stem_postings.get(value, ())
+            else:
+                if value in phrase_ids:
+                    continue
+                postings = self.engine.phrase_postings[value]
+            factor = self.fuzzy_weight ** edits
+            if factor:
+                for index, weight in postings:
+                    scores[index] += weight * factor
+        return scores
+
+    def analyze(self, narrative, k=TOP_K):
+        """Return a response shaped like ``POST /api/analyze``"""
+        return self.engine.response(self.engine.rank(self.raw_scores(narrative), k))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a narrative with fuzzy and transliterated matching")
+    parser.add_argument('narrative')
+    parser.add_argument('--threshold', type=float, default=0.7, help="Confidence threshold (0-1)")
+    parser.add_argument('--aliases', help="JSON file of extra {alias: keyword} entries")
+    args = parser.parse_args(argv)
+
+    from fir_assist.scoring import ScoringEngine
+    aliases = dict(TRANSLITERATIONS)
+    if args.aliases:
+        with open(args.aliases, encoding='utf-8') as f:
+            aliases.update(json.load(f))
+    scorer = FuzzyScorer.for_threshold(ScoringEngine.from_seed(), args.threshold, aliases)
+    for rec in scorer.analyze(args.narrative)['recommendations']:
+        print(f"{rec['code']:<10} {rec['score']:.3f}  {rec['title']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""Concurrent, cached health probes for the FIR Assist services"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+DEFAULT_TTL = 10
+PROBE_TIMEOUT = 2
+SHARED_KEY = 'health:status'
+SHARED_LEASE = 'health:probe'
+
+
+class HealthMonitor:
+    """Probe backend, frontend and MongoDB in parallel and cache the result
+
+    The cached status is shared by every caller, and a single lock makes
+    concurrent refreshes collapse into one probe per TTL interval. With a
+    ``SharedStore`` the status is also shared between processes, and a
+    lease lets one worker probe on behalf of all of them.
+    """
+
+    def __init__(self, api_client, frontend_url, mongodb_uri=None,
+                 ttl=DEFAULT_TTL, timeout=PROBE_TIMEOUT, shared=None):
+        self.api_client = api_client
+        self.frontend_url = frontend_url
+        self.mongodb_uri = mongodb_uri
+        self.ttl = ttl
+        self.timeout = timeout
+        self.shared = shared
+        self._lock = threading.Lock()
+        self._status = {}
+        self._checked_at = 0.0
+        self._executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix='health')
+        self._mongo_client = None
+
+    @property
+    def checked_at(self):
+        return self._checked_at
+
+    def status(self, force=False):
+        """Return the cached status, probing again once the TTL has expired"""
+        if not force and self._fresh():
+            return dict(self._status)
+        with self._lock:
+            # Another session may have refreshed while we waited for the lock
+            if not force and self._fresh():
+                return dict(self._status)
+            if self.shared is None:
+                self._status = self._probe_all()
+                self._checked_at = time.time()
+            else:
+                self._refresh_shared(force)
+            return dict(self._status)
+
+    def _refresh_shared(self, force):
+        if not force and self._adopt_shared():
+            return
+        lease_ttl = self.timeout * 2 + 1
+        if not self.shared.acquire(SHARED_LEASE, lease_ttl):
+            # Another process is probing; wait for its result
+            deadline = time.time() + lease_ttl
+            while time.time() < deadline:
+                time.sleep(0.05)
+                if self._adopt_shared(newer_than=self._checked_at):
+                    return
+        try:
+            self._status = self._probe_all()
+            self._checked_at = time.time()
+            self.shared.set(SHARED_KEY, {'status': self._status, 'checked_at': self._checked_at})
+        finally:
+            self.shared.release(SHARED_LEASE)
+
+    def _adopt_shared(self, newer_than=0.0):
+        """Use the status another process published, if it is fresh"""
+        entry = self.shared.get(SHARED_KEY)
+        if not entry or entry['checked_at'] <= newer_than or time.time() - entry['checked_at'] >= self.ttl:
+            return False
+        self._status = entry['status']
+        self._checked_at = entry['checked_at']
+        return True
+
+    def _fresh(self):
+        return self._status and time.time() - self._checked_at < self.ttl
+
+    def _probe_all(self):
+        backend = self._executor.submit(self._probe_backend)
+        frontend = self._executor.submit(self._probe_frontend)
+        mongodb = self._executor.submit(self._probe_mongodb)
+
+        backend_status, backend_health = backend.result()
+        status = {
+            'backend': backend_status,
+            'frontend': frontend.result(),
+            'mongodb': mongodb.result(),
+        }
+        # Without a driver connection fall back to what the backend reports
+        if status['mongodb'] == 'Unknown' and backend_health:
+            status['mongodb'] = "Running" if backend_health.get('mongodb') == 'connected' else "Error"
+        return status
+
+    def _probe_backend(self):
+        try:
+            response = self.api_client.get("/health", timeout=self.timeout, retry=False)
+        except requests.exceptions.RequestException:
+            return "Stopped", None
+        if response.status_code == 200:
+            try:
+                return "Running", response.json()
+            except ValueError:
+                return "Running", None
+        # Older backends have no /health route; any answer means it is up
+        if response.status_code == 404:
+            return "Running", None
+        return "Error", None
+
+    def _probe_frontend(self):
+        try:
+            response = self.api_client.get(self.frontend_url, timeout=self.timeout, retry=False)
+        except requests.exceptions.RequestException:
+            return "Stopped"
+        return "Running" if response.status_code == 200 else "Error"
+
+    def _probe_mongodb(self):
+        if not self.mongodb_uri:
+            return "Unknown"
+        try:
+            # Imported here so the driver stays off the app's startup path
+            from pymongo import MongoClient
+        except ImportError:
+            return "Unknown"
+        try:
+            if self._mongo_client is None:
+                self._mongo_client = MongoClient(
+                    self.mongodb_uri,
+                    maxPoolSize=2,
+                    serverSelectionTimeoutMS=int(self.timeout * 1000),
+                    connectTimeoutMS=int(self.timeout * 1000),
+                )
+            self._mongo_client.admin.command('ping')
+            return "Running"
+        except Exception:
+            return "Stopped"
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        if self._mongo_client is not None:
+            self._mongo_client.close()
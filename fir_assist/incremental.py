@@ -0,0 +1,163 @@
+"""Incremental re-scoring of a narrative while it is being typed
+
+``IncrementalScorer`` keeps the token spans, stem counts, phrase
+occurrences and per-section raw scores of one narrative. ``update`` diffs
+the new text against the previous one (common prefix and suffix), so only
+the tokens touching the edited span are re-tokenized and re-stemmed, and
+only phrase matches that could overlap it are re-scanned; a phrase keyword
+spanning the edit boundary is dropped or found as the edit dictates. The
+scores always equal ``ScoringEngine.raw_scores`` on the full text.
+"""
+from bisect import bisect_left, bisect_right
+from collections import Counter
+
+from fir_assist.scoring import TOP_K
+from fir_assist.stemmer import stem, token_spans
+
+
+def _common_prefix(a, b, limit):
+    """Length of the common prefix of ``a`` and ``b``, by bisecting slice compares"""
+    lo, hi = 0, limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[lo:mid] == b[lo:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _common_suffix(a, b, limit):
+    """Length of the common suffix of ``a`` and ``b``, at most ``limit``"""
+    lo, hi = 0, limit
+    len_a, len_b = len(a), len(b)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[len_a - mid:len_a - lo] == b[len_b - mid:len_b - lo]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+class IncrementalScorer:
+    """Per-session scoring state for one evolving narrative"""
+
+    def __init__(self, engine, text=''):
+        self.engine = engine
+        self.scores = [0] * len(engine.sections)
+        self.text = ''
+        # Token spans and phrase occurrences, sorted by start offset
+        self._token_starts = []
+        self._token_ends = []
+        self._token_stems = []
+        self._stem_counts = Counter()
+        self._phrase_starts = []
+        self._phrase_ids = []
+        self._phrase_counts = Counter()
+        self._phrase_lengths = [len(phrase) for phrase in engine.phrases]
+        self._max_phrase = max(self._phrase_lengths, default=0)
+        self.update(text)
+
+    def update(self, narrative):
+        """Bring the state up to date with ``narrative``; return the raw scores"""
+        new = narrative.lower()
+        old = self.text
+        if new == old:
+            return self.scores
+
+        # Edited span: old[start:old_end] was replaced by new[start:new_end]
+        limit = min(len(old), len(new))
+        start = _common_prefix(old, new, limit)
+        suffix = _common_suffix(old, new, limit - start)
+        old_end, new_end = len(old) - suffix, len(new) - suffix
+        delta = new_end - old_end
+
+        self.text = new
+        self._update_tokens(new, start, old_end, new_end, delta)
+        if self._max_phrase:
+            self._update_phrases(new, start, old_end, new_end, delta)
+        return self.scores
+
+    def _update_tokens(self, text, start, old_end, new_end, delta):
+        starts, ends, stems = self._token_starts, self._token_ends, self._token_stems
+        # Tokens touching the edit, including ones that merely abut it, since
+        # an edit at a word boundary can merge or split words
+        first = bisect_left(ends, start)
+        last = bisect_right(starts, old_end)
+        window_start = min(start, starts[first]) if first < last else start
+        window_end = max(old_end, ends[last - 1]) if first < last else old_end
+
+        for stemmed in stems[first:last]:
+            self._remove_stem(stemmed)
+        spans = list(token_spans(text, window_start, window_end + delta))
+        for _, _, token in spans:
+            self._add_stem(stem(token))
+
+        if delta:
+            starts[last:] = [offset + delta for offset in starts[last:]]
+            ends[last:] = [offset + delta for offset in ends[last:]]
+        starts[first:last] = [span[0] for span in spans]
+        ends[first:last] = [span[1] for span in spans]
+        stems[first:last] = [stem(span[2]) for span in spans]
+
+    def _update_phrases(self, text, start, old_end, new_end, delta):
+        starts, ids, lengths = self._phrase_starts, self._phrase_ids, self._phrase_lengths
+        # Occurrences that overlap the edited span (or straddle an insertion
+        # point) can only start within one phrase length before it
+        lo = bisect_left(starts, start - self._max_phrase + 1)
+        hi = bisect_left(starts, old_end)
+        kept_starts, kept_ids = [], []
+        for offset, phrase_id in zip(starts[lo:hi], ids[lo:hi]):
+            if offset + lengths[phrase_id] > start:
+                self._remove_phrase(phrase_id)
+            else:
+                kept_starts.append(offset)
+                kept_ids.append(phrase_id)
+
+        found_starts, found_ids = [], []
+        scan_from = max(start - self._max_phrase + 1, 0)
+        scan_to = min(new_end + self._max_phrase - 1, len(text))
+        for offset, phrase_id in self.engine._matcher.occurrences(text, scan_from, scan_to):
+            if offset < new_end and offset + lengths[phrase_id] > start:
+                self._add_phrase(phrase_id)
+                found_starts.append(offset)
+                found_ids.append(phrase_id)
+
+        if delta:
+            starts[hi:] = [offset + delta for offset in starts[hi:]]
+        merged = sorted(zip(kept_starts + found_starts, kept_ids + found_ids))
+        starts[lo:hi] = [offset for offset, _ in merged]
+        ids[lo:hi] = [phrase_id for _, phrase_id in merged]
+
+    def _add_stem(self, stemmed):
+        self._stem_counts[stemmed] += 1
+        if self._stem_counts[stemmed] == 1:
+            for index, weight in self.engine.stem_postings.get(stemmed, ()):
+                self.scores[index] += weight
+
+    def _remove_stem(self, stemmed):
+        self._stem_counts[stemmed] -= 1
+        if not self._stem_counts[stemmed]:
+            del self._stem_counts[stemmed]
+            for index, weight in self.engine.stem_postings.get(stemmed, ()):
+                self.scores[index] -= weight
+
+    def _add_phrase(self, phrase_id):
+        self._phrase_counts[phrase_id] += 1
+        if self._phrase_counts[phrase_id] == 1:
+            for index, weight in self.engine.phrase_postings[phrase_id]:
+                self.scores[index] += weight
+
+    def _remove_phrase(self, phrase_id):
+        self._phrase_counts[phrase_id] -= 1
+        if not self._phrase_counts[phrase_id]:
+            del self._phrase_counts[phrase_id]
+            for index, weight in self.engine.phrase_postings[phrase_id]:
+                self.scores[index] -= weight
+
+    def top_sections(self, k=TOP_K):
+        """Return ``(section_index, raw_score)`` like ``ScoringEngine.top_sections``"""
+        scores = self.scores
+        ranked = sorted((index for index, score in enumerate(scores) if score > 0), key=lambda index: -scores[index])
+        return [(index, scores[index]) for index in ranked[:k]]
@@ -0,0 +1,136 @@
+"""Micro-batching inference server for model-based analysis
+
+Serves ``POST /api/analyze`` like the Node backend, but runs narratives
+through the Legal-BERT semantic scorer in dynamic batches: requests wait
+up to ``--max-wait-ms`` to be grouped (by length bucket, up to
+``--max-batch-size``) and each batch is one forward pass on a worker pool
+sized to the cores. ``GET /metrics`` exports queue depth and batch sizes in
+the Prometheus text format.
+
+    python -m fir_assist.inference_server --model-dir models/legal-bert-base-uncased --port 5001
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from fir_assist.batching import DEFAULT_MAX_BATCH_SIZE, DEFAULT_MAX_WAIT_MS, MicroBatcher
+
+REQUEST_TIMEOUT = 30
+
+
+class _Server(ThreadingHTTPServer):
+    # The default listen backlog of 5 refuses connections under the bursts
+    # micro-batching is meant to absorb
+    request_queue_size = 128
+    daemon_threads = True
+
+
+class InferenceServer:
+    """HTTP front end that feeds a ``MicroBatcher``"""
+
+    def __init__(self, batcher, host='127.0.0.1', port=0, timeout=REQUEST_TIMEOUT):
+        self.batcher = batcher
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            wbufsize = -1
+
+            def do_GET(self):
+                if self.path == '/health':
+                    self._send(200, {'success': True, **server.batcher.metrics.snapshot()})
+                elif self.path == '/metrics':
+                    self._send_text(200, server.batcher.metrics.prometheus())
+                else:
+                    self._send(404, {'success': False})
+
+            def do_POST(self):
+                try:
+                    body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                except ValueError:
+                    body = {}
+                narrative = body.get('narrative') if isinstance(body, dict) else None
+                if self.path != '/api/analyze' or not narrative or not isinstance(narrative, str):
+                    self._send(400, {'success': False, 'error': 'Please provide a narrative'})
+                    return
+                try:
+                    result = server.batcher(narrative, timeout)
+                except Exception as e:
+                    self._send(500, {'success': False, 'error': str(e)})
+                    return
+                self._send(200, result)
+
+            def _send(self, status, payload):
+                self._write(status, json.dumps(payload).encode('utf-8'), 'application/json')
+
+            def _send_text(self, status, text):
+                self._write(status, text.encode('utf-8'), 'text/plain; version=0.0.4')
+
+            def _write(self, status, data, content_type):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = _Server((host, port), Handler)
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.batcher.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve /api/analyze with micro-batched model inference")
+    parser.add_argument('--model-dir', required=True, help="Local Legal-BERT checkpoint or int8 ONNX export directory")
+    parser.add_argument('--index-dir', default=os.path.join('.fir_assist', 'semantic'))
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5001)
+    parser.add_argument('--max-batch-size', type=int, default=DEFAULT_MAX_BATCH_SIZE)
+    parser.add_argument('--max-wait-ms', type=float, default=DEFAULT_MAX_WAIT_MS)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Concurrent batches (default: one per core)")
+    parser.add_argument('--threads-per-worker', type=int,
+                        help="Intra-op threads per forward pass (default: cores / workers)")
+    args = parser.parse_args(argv)
+
+    from fir_assist.scoring import ScoringEngine
+    from fir_assist.semantic import SectionIndex, SemanticScorer, load_embedder
+
+    threads = args.threads_per_worker or max(1, (os.cpu_count() or 1) // args.workers)
+    engine = ScoringEngine.from_seed()
+    embedder = load_embedder(args.model_dir, num_threads=threads)
+    scorer = SemanticScorer(engine, SectionIndex.load_or_build(engine.sections, embedder, args.index_dir), embedder)
+    batcher = MicroBatcher(scorer.analyze_batch, args.max_batch_size, args.max_wait_ms, workers=args.workers)
+    server = InferenceServer(batcher, args.host, args.port)
+    print(f"Serving on {server.url} ({args.workers} workers x {threads} threads, "
+          f"batch <= {args.max_batch_size}, wait <= {args.max_wait_ms}ms)")
+    try:
+        server.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server.server_close()
+        batcher.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
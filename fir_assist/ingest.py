@@ -0,0 +1,356 @@
+"""Stream sections and judgments into MongoDB with idempotent bulk upserts
+
+Records are read lazily from JSONL or CSV dumps (or the bundled seed data),
+validated against the ``Section`` and ``Judgment`` Mongoose schemas, and
+written in unordered ``UpdateOne(..., upsert=True)`` batches keyed on
+``code`` and ``caseName``, so re-running an import updates documents in
+place instead of duplicating them. Afterwards the data-version stamp in the
+``meta`` collection is bumped so ``/api/version`` and every result cache
+built on it invalidate, and a ``fir_assist.catalog`` snapshot of both
+collections is written for the Python services to map.
+
+    python -m fir_assist.ingest --sections ipc_sections.jsonl --judgments judgments.csv
+    python -m fir_assist.ingest --seed
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+from fir_assist.catalog import DEFAULT_PATH as DEFAULT_CATALOG_PATH, write_snapshot_from_mongo
+
+DEFAULT_BATCH_SIZE = 1000
+META_COLLECTION = 'meta'
+DATA_VERSION_ID = 'dataVersion'
+LIST_SEPARATOR = ';'
+
+
+class ValidationError(ValueError):
+    pass
+
+
+class IndexConflict(ValueError):
+    """A unique index cannot be built because existing documents share a key"""
+
+
+def _required_string(record, field):
+    value = record.get(field)
+    if not isinstance(value, str) or not value.strip():
+        raise ValidationError(f"'{field}' is required")
+    return value.strip()
+
+
+def _string_list(record, field):
+    value = record.get(field) or []
+    if isinstance(value, str):
+        # CSV cells hold lists as JSON arrays or ';'-separated values
+        value = json.loads(value) if value.lstrip().startswith('[') else value.split(LIST_SEPARATOR)
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        raise ValidationError(f"'{field}' must be a list of strings")
+    return [item.strip() for item in value if item.strip()]
+
+
+def _date(record, field):
+    value = record.get(field)
+    if isinstance(value, datetime):
+        return value
+    if not isinstance(value, str) or not value.strip():
+        raise ValidationError(f"'{field}' is required")
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    except ValueError:
+        raise ValidationError(f"'{field}' is not an ISO date: {value!r}")
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _require_object(record):
+    if not isinstance(record, dict):
+        raise ValidationError(f"expected an object, got {type(record).__name__}")
+
+
+def validate_section(record):
+    """Return the ``Section`` fields of ``record`` or raise ``ValidationError``"""
+    _require_object(record)
+    return {
+        'code': _required_string(record, 'code'),
+        'title': _required_string(record, 'title'),
+        'description': _required_string(record, 'description'),
+        'keywords': _string_list(record, 'keywords'),
+    }
+
+
+def validate_judgment(record):
+    """Return the ``Judgment`` fields of ``record`` or raise ``ValidationError``"""
+    _require_object(record)
+    codes = _string_list(record, 'sectionCodes')
+    if not codes:
+        raise ValidationError("'sectionCodes' needs at least one code")
+    return {
+        'caseName': _required_string(record, 'caseName'),
+        'sectionCodes': codes,
+        'synopsis': _required_string(record, 'synopsis'),
+        'date': _date(record, 'date'),
+        'court': _required_string(record, 'court'),
+    }
+
+
+KINDS = {
+    'sections': ('code', validate_section),
+    'judgments': ('caseName', validate_judgment),
+}
+
+
+def read_records(path):
+    """Yield ``(line_number, record)`` from a JSONL or CSV file, one at a time"""
+    if path.lower().endswith(('.jsonl', '.ndjson')):
+        with open(path, encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield line_number, json.loads(line)
+                except ValueError as e:
+                    yield line_number, ValidationError(f"invalid JSON: {e}")
+    else:
+        with open(path, encoding='utf-8', newline='') as f:
+            for line_number, record in enumerate(csv.DictReader(f), 2):
+                yield line_number, record
+
+
+class IngestReport:
+    """Counts for one collection's import"""
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.read = 0
+        self.invalid = 0
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.write_errors = 0
+        self.errors = []
+        self.started = time.perf_counter()
+        self.seconds = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.read / self.seconds if self.seconds else 0.0
+
+    def error(self, message, limit=20):
+        if len(self.errors) < limit:
+            self.errors.append(message)
+
+    def summary(self):
+        return (f"{self.collection}: {self.read} rows in {self.seconds:.2f}s ({self.rows_per_second:,.0f} rows/s) — "
+                f"{self.inserted} inserted, {self.updated} updated, {self.unchanged} unchanged, "
+                f"{self.invalid} invalid, {self.write_errors} write errors")
+
+
+def _upsert_pipeline(document, now):
+    """Update pipeline that writes ``document`` and touches ``updatedAt`` only if a field differs
+
+    Re-importing identical data leaves the stored document byte-for-byte
+    the same, so the server reports it as matched but not modified.
+    """
+    fields = {field: {'$literal': value} for field, value in document.items()}
+    changed = {'$or': [{'$ne': [f'${field}', value]} for field, value in fields.items()]}
+    return [
+        {'$set': {
+            'updatedAt': {'$cond': [changed, now, '$updatedAt']},
+            'createdAt': {'$ifNull': ['$createdAt', now]},
+            '__v': {'$ifNull': ['$__v', 0]},
+        }},
+        {'$set': fields},
+    ]
+
+
+def ingest(collection, records, kind, batch_size=DEFAULT_BATCH_SIZE, source='', on_batch=None):
+    """Validate ``records`` and upsert them into ``collection``
+
+    ``records`` yields ``(line_number, record)``. Duplicates of a key within
+    one batch collapse to the last occurrence, since unordered writes to the
+    same key could otherwise race.
+    """
+    from pymongo import UpdateOne
+    from pymongo.errors import BulkWriteError
+
+    key, validate = KINDS[kind]
+    report = IngestReport(collection.name)
+    batch = {}
+
+    def flush():
+        if not batch:
+            return
+        now = datetime.now(timezone.utc)
+        operations = [
+            UpdateOne({key: document[key]}, _upsert_pipeline(document, now), upsert=True)
+            for document in batch.values()
+        ]
+        try:
+            result = collection.bulk_write(operations, ordered=False)
+            details = result.bulk_api_result
+        except BulkWriteError as e:
+            details = e.details
+            report.write_errors += len(details.get('writeErrors', []))
+            for error in details.get('writeErrors', [])[:5]:
+                report.error(f"{source}: write error: {error.get('errmsg')}")
+        report.inserted += details.get('nUpserted', 0)
+        report.updated += details.get('nModified', 0)
+        report.unchanged += details.get('nMatched', 0) - details.get('nModified', 0)
+        batch.clear()
+        if on_batch:
+            on_batch(report)
+
+    for line_number, record in records:
+        report.read += 1
+        try:
+            if isinstance(record, Exception):
+                raise record
+            document = validate(record)
+        except ValueError as e:
+            report.invalid += 1
+            report.error(f"{source}:{line_number}: {e}")
+            continue
+        batch[document[key]] = document
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+    report.seconds = time.perf_counter() - report.started
+    return report
+
+
+def ensure_indexes(db):
+    """Create the indexes the backend and the upsert keys rely on
+
+    Raises ``IndexConflict`` naming some of the duplicated keys if existing
+    documents prevent a unique index from being built.
+    """
+    from pymongo.errors import DuplicateKeyError
+
+    for collection, key in ((db.sections, 'code'), (db.judgments, 'caseName')):
+        try:
+            collection.create_index(key, unique=True)
+        except DuplicateKeyError as e:
+            duplicates = [group['_id'] for group in collection.aggregate([
+                {'$group': {'_id': f'${key}', 'count': {'$sum': 1}}},
+                {'$match': {'count': {'$gt': 1}}},
+                {'$limit': 5},
+            ])]
+            raise IndexConflict(
+                f"{collection.name} has several documents with the same {key} "
+                f"(for example {', '.join(map(repr, duplicates))}); remove the duplicates "
+                f"so the unique {key} index can be built"
+            ) from e
+    db.judgments.create_index('sectionCodes')
+
+
+def bump_data_version(db):
+    """Advance the data-version stamp read by ``/api/version``; return it"""
+    from pymongo import ReturnDocument
+
+    now = datetime.now(timezone.utc)
+    # One pipeline update, so concurrent imports never share or reorder stamps
+    stamp = db[META_COLLECTION].find_one_and_update(
+        {'_id': DATA_VERSION_ID},
+        [
+            {'$set': {'revision': {'$add': [{'$ifNull': ['$revision', 0]}, 1]}, 'updatedAt': now}},
+            {'$set': {'version': {'$concat': ['r', {'$toString': '$revision'}, '-',
+                                              str(int(now.timestamp() * 1000))]}}},
+        ],
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    return stamp['version']
+
+
+def current_data_version(db):
+    """Return the data-version stamp, or an empty string if none was ever written"""
+    stamp = db[META_COLLECTION].find_one({'_id': DATA_VERSION_ID}, {'version': 1})
+    return stamp.get('version', '') if stamp else ''
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import sections and judgments into MongoDB")
+    parser.add_argument('--sections', help="JSONL or CSV file of sections")
+    parser.add_argument('--judgments', help="JSONL or CSV file of judgments")
+    parser.add_argument('--seed', action='store_true', help="Import the bundled seed.js data")
+    parser.add_argument('--mongodb-uri', default=os.environ.get('MONGODB_URI', 'mongodb://localhost:27017/fir-assist'))
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--dry-run', action='store_true', help="Validate only; write nothing")
+    parser.add_argument('--catalog', default=DEFAULT_CATALOG_PATH, help="Where to write the catalog snapshot")
+    parser.add_argument('--no-catalog', action='store_true', help="Do not write a catalog snapshot")
+    args = parser.parse_args(argv)
+    if not (args.sections or args.judgments or args.seed):
+        parser.error("give --sections, --judgments or --seed")
+
+    sources = []
+    if args.seed:
+        from fir_assist.seed import SEED_SCRIPT, load_seed_data
+        sections, judgments = load_seed_data()
+        sources.append(('sections', SEED_SCRIPT, enumerate(sections, 1)))
+        sources.append(('judgments', SEED_SCRIPT, enumerate(judgments, 1)))
+    if args.sections:
+        sources.append(('sections', args.sections, read_records(args.sections)))
+    if args.judgments:
+        sources.append(('judgments', args.judgments, read_records(args.judgments)))
+
+    if args.dry_run:
+        failed = False
+        for kind, path, records in sources:
+            invalid = 0
+            for line_number, record in records:
+                try:
+                    if isinstance(record, Exception):
+                        raise record
+                    KINDS[kind][1](record)
+                except ValueError as e:
+                    invalid += 1
+                    if invalid <= 20:
+                        print(f"{path}:{line_number}: {e}")
+            print(f"{kind} from {path}: {invalid} invalid records")
+            failed = failed or bool(invalid)
+        return 1 if failed else 0
+
+    from pymongo import MongoClient
+    client = MongoClient(args.mongodb_uri)
+    try:
+        db = client.get_default_database()
+        try:
+            ensure_indexes(db)
+        except IndexConflict as e:
+            print(f"Cannot import: {e}", file=sys.stderr)
+            return 2
+        reports = []
+        for kind, path, records in sources:
+            def progress(report):
+                elapsed = time.perf_counter() - report.started
+                print(f"\r{report.collection}: {report.read} rows ({report.read / elapsed:,.0f} rows/s)",
+                      end='', file=sys.stderr, flush=True)
+            report = ingest(db[kind], records, kind, args.batch_size, source=path, on_batch=progress)
+            print(file=sys.stderr)
+            reports.append(report)
+            print(report.summary())
+            for message in report.errors:
+                print(f"  {message}")
+
+        changed = any(report.inserted or report.updated for report in reports)
+        if changed:
+            version = bump_data_version(db)
+            print(f"Data version is now {version}")
+        else:
+            version = current_data_version(db)
+            print("No changes; data version left as is")
+        if not args.no_catalog and (changed or not os.path.exists(args.catalog)):
+            write_snapshot_from_mongo(db, args.catalog, version)
+            print(f"Wrote catalog snapshot {args.catalog} ({os.path.getsize(args.catalog) / 1024:.0f} KB)")
+        return 1 if any(report.write_errors for report in reports) else 0
+    finally:
+        client.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,52 @@
+"""Bulk prefetch of landmark judgments keyed by section code
+
+Mirrors ``services/judgmentIndex.js`` on the backend: judgments are loaded
+with one query and grouped so any number of analyses can attach them
+without a database round trip per row.
+"""
+from collections import defaultdict
+
+MAX_JUDGMENTS = 2
+
+
+class JudgmentIndex:
+    """Map of section code to its first few judgments in collection order"""
+
+    def __init__(self, judgments=(), max_per_section=MAX_JUDGMENTS, codes=None):
+        wanted = set(codes) if codes is not None else None
+        self.max_per_section = max_per_section
+        self._by_code = defaultdict(list)
+        for judgment in judgments:
+            for code in judgment.get('sectionCodes', []):
+                if wanted is not None and code not in wanted:
+                    continue
+                if len(self._by_code[code]) < max_per_section:
+                    self._by_code[code].append({
+                        'caseName': judgment['caseName'],
+                        'synopsis': judgment['synopsis'],
+                    })
+
+    @classmethod
+    def from_mongo(cls, mongodb_uri, codes=None):
+        """Load judgments for ``codes`` (or all codes) with a single query"""
+        from pymongo import MongoClient
+        client = MongoClient(mongodb_uri, serverSelectionTimeoutMS=3000)
+        try:
+            collection = client.get_default_database().judgments
+            query = {'sectionCodes': {'$in': list(codes)}} if codes is not None else {}
+            projection = {'_id': 0, 'caseName': 1, 'synopsis': 1, 'sectionCodes': 1}
+            return cls(collection.find(query, projection), codes=codes)
+        finally:
+            client.close()
+
+    def get(self, code):
+        return self._by_code.get(code, [])
+
+    def __len__(self):
+        return len(self._by_code)
+
+    def attach(self, recommendations):
+        """Fill in ``judgments`` on API-shaped recommendations in place"""
+        for rec in recommendations:
+            rec['judgments'] = list(self.get(rec['code']))
+        return recommendations
@@ -0,0 +1,244 @@
+"""ONNX export and int8 CPU inference for the Legal-BERT encoder
+
+The full-precision checkpoint is exported once to ONNX with dynamic batch
+and sequence axes, then dynamically quantized to int8 (weights stored as
+int8, activations quantized on the fly), which suits CPU-only station
+servers. ``OnnxEmbedder`` is a drop-in for ``semantic.Embedder``: it loads
+the quantized graph once, runs a warm-up pass at construction so the first
+request does not pay for allocation and kernel selection, and takes a
+tunable thread count.
+
+    python -m fir_assist.onnx_model export --model-dir models/legal-bert-base-uncased --out-dir models/legal-bert-onnx
+    python -m fir_assist.onnx_model report --model-dir models/legal-bert-base-uncased --onnx-dir models/legal-bert-onnx
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from fir_assist.semantic import (
+    DEFAULT_MAX_LENGTH, INT8_FILE, WARMUP_TEXTS, Embedder, normalize, section_text, warm_up,
+)
+
+FP32_FILE = 'model.onnx'
+
+
+def export(model_dir, out_dir, opset=14, quantize=True):
+    """Export ``model_dir`` to ONNX in ``out_dir`` and optionally quantize it
+
+    Returns the path of the model that should be served.
+    """
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    os.makedirs(out_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_dir, local_files_only=True)
+    model = AutoModel.from_pretrained(model_dir, local_files_only=True)
+    model.eval()
+
+    sample = tokenizer(list(WARMUP_TEXTS), padding=True, return_tensors='pt')
+    input_names = [name for name in ('input_ids', 'attention_mask', 'token_type_ids') if name in sample]
+    fp32_path = os.path.join(out_dir, FP32_FILE)
+    with torch.inference_mode():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in input_names),
+            fp32_path,
+            input_names=input_names,
+            output_names=['last_hidden_state'],
+            dynamic_axes={name: {0: 'batch', 1: 'sequence'} for name in input_names + ['last_hidden_state']},
+            opset_version=opset,
+        )
+    tokenizer.save_pretrained(out_dir)
+    with open(os.path.join(out_dir, 'export.json'), 'w', encoding='utf-8') as f:
+        json.dump({'source': os.path.abspath(model_dir), 'opset': opset, 'inputs': input_names,
+                   'quantized': quantize}, f, indent=2)
+
+    if not quantize:
+        return fp32_path
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    int8_path = os.path.join(out_dir, INT8_FILE)
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+    return int8_path
+
+
+class OnnxEmbedder:
+    """Mean-pooled sentence embeddings from an exported ONNX encoder
+
+    Same output as ``semantic.Embedder``: L2-normalized float32 rows.
+    """
+
+    def __init__(self, onnx_dir, model_file=INT8_FILE, max_length=DEFAULT_MAX_LENGTH, num_threads=None,
+                 warmup=True):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.inter_op_num_threads = 1
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.onnx_dir = onnx_dir
+        self.model_file = model_file
+        self.max_length = max_length
+        self.tokenizer = AutoTokenizer.from_pretrained(onnx_dir, local_files_only=True)
+        self.session = ort.InferenceSession(
+            os.path.join(onnx_dir, model_file), options, providers=['CPUExecutionProvider'],
+        )
+        self._inputs = [node.name for node in self.session.get_inputs()]
+        self.warmup_ms = warm_up(self) if warmup else 0.0
+
+    @property
+    def name(self):
+        stem = os.path.splitext(self.model_file)[0]
+        return f"{os.path.basename(os.path.normpath(self.onnx_dir))}-{stem}"
+
+    def embed(self, texts):
+        encoded = self.tokenizer(
+            list(texts), padding=True, truncation=True,
+            max_length=self.max_length, return_tensors='np',
+        )
+        feeds = {name: encoded[name].astype(np.int64) for name in self._inputs}
+        hidden = self.session.run(['last_hidden_state'], feeds)[0]
+        mask = encoded['attention_mask'][..., None].astype(hidden.dtype)
+        pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        return normalize(pooled.astype(np.float32))
+
+
+def rss_mb():
+    """Resident set size of this process in MiB"""
+    try:
+        with open('/proc/self/status', encoding='ascii') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    # ru_maxrss is the peak, in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def parity(reference, candidate, sections, narratives, k=5):
+    """Compare two embedders on the seed sections and a narrative corpus
+
+    Reports the cosine similarity between their section embeddings and how
+    often the top-k sections retrieved for each narrative agree.
+    """
+    texts = [section_text(section) for section in sections]
+    ref_sections, cand_sections = reference.embed(texts), candidate.embed(texts)
+    cosines = (ref_sections * cand_sections).sum(axis=1)
+
+    narratives = [narrative for narrative in narratives if narrative.strip()]
+    top1 = overlap = 0
+    k = min(k, len(sections))
+    for start in range(0, len(narratives), 32):
+        batch = narratives[start:start + 32]
+        ref_scores = reference.embed(batch) @ ref_sections.T
+        cand_scores = candidate.embed(batch) @ cand_sections.T
+        for ref_row, cand_row in zip(ref_scores, cand_scores):
+            ref_top = np.argsort(-ref_row, kind='stable')[:k]
+            cand_top = np.argsort(-cand_row, kind='stable')[:k]
+            top1 += int(ref_top[0] == cand_top[0])
+            overlap += len(set(ref_top) & set(cand_top)) / k
+    count = max(len(narratives), 1)
+    return {
+        'sections': len(sections),
+        'narratives': len(narratives),
+        'section_cosine_mean': float(cosines.mean()),
+        'section_cosine_min': float(cosines.min()),
+        'top1_agreement': top1 / count,
+        f'top{k}_overlap': overlap / count,
+    }
+
+
+def measure(factory, narratives, repeats=3):
+    """Load an embedder and time single-narrative latency; return (embedder, stats)"""
+    before = rss_mb()
+    start = time.perf_counter()
+    embedder = factory()
+    load_ms = (time.perf_counter() - start) * 1000
+    loaded = rss_mb()
+
+    latencies = []
+    for _ in range(repeats):
+        for narrative in narratives:
+            start = time.perf_counter()
+            embedder.embed([narrative])
+            latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return embedder, {
+        'load_ms': round(load_ms, 1),
+        'rss_delta_mb': round(loaded - before, 1),
+        'p50_ms': round(latencies[len(latencies) // 2], 2),
+        'p95_ms': round(latencies[int(len(latencies) * 0.95)], 2),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export Legal-BERT to quantized ONNX and compare it")
+    parser.add_argument('command', choices=['export', 'report'])
+    parser.add_argument('--model-dir', required=True, help="Full-precision local checkpoint")
+    parser.add_argument('--out-dir', help="Export destination (export)")
+    parser.add_argument('--onnx-dir', help="Exported model directory (report)")
+    parser.add_argument('--opset', type=int, default=14)
+    parser.add_argument('--no-quantize', action='store_true')
+    parser.add_argument('--threads', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--min-top1', type=float, default=0.95,
+                        help="Fail the report if top-1 agreement falls below this")
+    args = parser.parse_args(argv)
+
+    if args.command == 'export':
+        if not args.out_dir:
+            parser.error("export requires --out-dir")
+        path = export(args.model_dir, args.out_dir, args.opset, quantize=not args.no_quantize)
+        print(f"Wrote {path} ({os.path.getsize(path) / 2**20:.1f} MiB)")
+        return 0
+
+    if not args.onnx_dir:
+        parser.error("report requires --onnx-dir")
+    from fir_assist.scoring import parity_corpus
+    from fir_assist.seed import load_seed_data
+
+    sections, _ = load_seed_data()
+    narratives = [narrative for narrative in parity_corpus(sections) if narrative.strip()]
+    sample = narratives[:20]
+
+    def load_reference():
+        embedder = Embedder(args.model_dir, num_threads=args.threads)
+        warm_up(embedder)
+        return embedder
+
+    reference, ref_stats = measure(load_reference, sample)
+    candidates = [(name, file) for name, file in (('onnx fp32', FP32_FILE), ('onnx int8', INT8_FILE))
+                  if os.path.exists(os.path.join(args.onnx_dir, file))]
+    rows = [('pytorch fp32', ref_stats, None)]
+    for name, file in candidates:
+        candidate, stats = measure(lambda: OnnxEmbedder(args.onnx_dir, file, num_threads=args.threads), sample)
+        stats['file_mb'] = round(os.path.getsize(os.path.join(args.onnx_dir, file)) / 2**20, 1)
+        rows.append((name, stats, parity(reference, candidate, sections, narratives)))
+
+    print(f"threads: {args.threads}")
+    print(f"{'model':<14} {'load ms':>9} {'rss MiB':>9} {'file MiB':>9} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'cos min':>8} {'top-1':>7}")
+    failed = False
+    for name, stats, agreement in rows:
+        cos = f"{agreement['section_cosine_min']:.4f}" if agreement else '-'
+        top1 = f"{agreement['top1_agreement']:.1%}" if agreement else '-'
+        print(f"{name:<14} {stats['load_ms']:>9.0f} {stats['rss_delta_mb']:>9.1f} {stats.get('file_mb', '-'):>9} "
+              f"{stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f} {cos:>8} {top1:>7}")
+        if agreement and agreement['top1_agreement'] < args.min_top1:
+            failed = True
+    if failed:
+        print(f"Top-1 agreement below {args.min_top1:.0%}; check the quantized model before serving it")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
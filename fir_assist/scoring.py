@@ -0,0 +1,327 @@
+"""In-process section scoring matching ``analyzeController.getSectionScores``
+
+The backend re-reads every section and re-stems every keyword for each
+narrative. ``ScoringEngine`` does that work once: single-word keywords are
+stemmed into an inverted index of section postings, and multi-word keywords
+are compiled into a single phrase matcher so all phrases are found in one
+pass over the narrative. Scores and ordering are identical to the controller.
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from collections.abc import Sequence
+
+from fir_assist.judgments import JudgmentIndex
+from fir_assist.stemmer import stem, tokenize
+
+TOP_K = 5
+PHRASE_WEIGHT = 2
+STEM_WEIGHT = 1
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'job', 'backend')
+PARITY_SCRIPT = os.path.join(BACKEND_DIR, 'src', 'scripts', 'parityFixture.js')
+
+
+class PhraseMatcher:
+    """Find which of a fixed set of phrases occur anywhere in a text
+
+    A single lookahead alternation (longest phrases first) reports the
+    longest phrase starting at every position in one C-level scan. Shorter
+    phrases that are prefixes of a reported phrase are added from a
+    precomputed table, so the result equals testing every phrase with ``in``.
+    """
+
+    def __init__(self, phrases):
+        self.phrases = list(phrases)
+        ids = {phrase: i for i, phrase in enumerate(self.phrases)}
+        self._implied = {}
+        for phrase, phrase_id in ids.items():
+            # Look up each proper prefix rather than testing every other phrase
+            self._implied[phrase] = [phrase_id] + sorted(
+                ids[phrase[:end]] for end in range(1, len(phrase)) if phrase[:end] in ids
+            )
+        ordered = sorted(self.phrases, key=len, reverse=True)
+        self._pattern = re.compile(
+            '(?=(%s))' % '|'.join(re.escape(phrase) for phrase in ordered)
+        ) if ordered else None
+
+    def find(self, text):
+        """Return the ids of every phrase that occurs in ``text``"""
+        if self._pattern is None:
+            return set()
+        found = set()
+        implied = self._implied
+        for phrase in set(self._pattern.findall(text)):
+            found.update(implied[phrase])
+        return found
+
+    def occurrences(self, text, pos=0, endpos=None):
+        """Yield ``(start, phrase_id)`` for every phrase occurrence in ``text[pos:endpos]``"""
+        if self._pattern is None:
+            return
+        implied = self._implied
+        for match in self._pattern.finditer(text, pos, len(text) if endpos is None else endpos):
+            for phrase_id in implied[match.group(1)]:
+                yield match.start(), phrase_id
+
+
+class ScoringEngine:
+    """Precomputed keyword index over a fixed list of sections"""
+
+    def __init__(self, sections, judgments=None, keywords=None, stemmer=stem):
+        # Sequences such as a catalog's SectionList are kept as they are, so
+        # sections are only decoded when a recommendation needs them
+        self.sections = sections if isinstance(sections, Sequence) else list(sections)
+        if keywords is None:
+            keywords = [section.get('keywords', []) for section in self.sections]
+        self.keyword_counts = [len(section_keywords) for section_keywords in keywords]
+
+        stem_weights = defaultdict(lambda: defaultdict(int))
+        phrase_weights = defaultdict(lambda: defaultdict(int))
+        for index, section_keywords in enumerate(keywords):
+            for keyword in section_keywords:
+                lower_keyword = keyword.lower()
+                if ' ' in lower_keyword:
+                    phrase_weights[lower_keyword][index] += PHRASE_WEIGHT
+                else:
+                    stem_weights[stemmer(lower_keyword)][index] += STEM_WEIGHT
+
+        self.stem_postings = {
+            stemmed: sorted(postings.items()) for stemmed, postings in stem_weights.items()
+        }
+        self.phrases = sorted(phrase_weights)
+        self.phrase_postings = [sorted(phrase_weights[phrase].items()) for phrase in self.phrases]
+        self._matcher = PhraseMatcher(self.phrases)
+
+        self.judgments = judgments if isinstance(judgments, JudgmentIndex) else JudgmentIndex(judgments or ())
+
+    @classmethod
+    def from_seed(cls):
+        """Build an engine from the bundled ``seed.js`` data"""
+        from fir_assist.seed import load_seed_data
+        sections, judgments = load_seed_data()
+        return cls(sections, judgments)
+
+    @classmethod
+    def from_catalog(cls, catalog):
+        """Build an engine from a ``fir_assist.catalog`` snapshot without materializing documents"""
+        keywords = [catalog.section_keywords(index) for index in range(catalog.section_count)]
+        stems = catalog.keyword_stems()
+        return cls(catalog.sections, catalog.judgments(), keywords=keywords,
+                   stemmer=lambda keyword: stems.get(keyword) or stem(keyword))
+
+    @classmethod
+    def from_mongo(cls, mongodb_uri):
+        """Build an engine from the ``sections`` and ``judgments`` collections"""
+        from pymongo import MongoClient
+        client = MongoClient(mongodb_uri, serverSelectionTimeoutMS=3000)
+        try:
+            db = client.get_default_database()
+            sections = list(db.sections.find({}, {'_id': 0, 'code': 1, 'title': 1,
+                                                  'description': 1, 'keywords': 1}))
+        finally:
+            client.close()
+        return cls(sections, JudgmentIndex.from_mongo(mongodb_uri))
+
+    def phrase_ids(self, lower_narrative):
+        """Return the ids of the multi-word keywords found in a lowercased narrative"""
+        return self._matcher.find(lower_narrative)
+
+    def raw_scores(self, narrative, stemmed_tokens=None, phrase_ids=None):
+        """Return the un-normalized score of every section for ``narrative``"""
+        if stemmed_tokens is None:
+            stemmed_tokens = {stem(token) for token in tokenize(narrative.lower())}
+        if phrase_ids is None:
+            phrase_ids = self.phrase_ids(narrative.lower())
+        scores = [0] * len(self.sections)
+        for stemmed in stemmed_tokens:
+            for index, weight in self.stem_postings.get(stemmed, ()):
+                scores[index] += weight
+        for phrase_id in phrase_ids:
+            for index, weight in self.phrase_postings[phrase_id]:
+                scores[index] += weight
+        return scores
+
+    def top_sections(self, narrative, k=TOP_K):
+        """Return ``(section_index, raw_score)`` for the best ``k`` sections"""
+        return self.rank(self.raw_scores(narrative), k)
+
+    @staticmethod
+    def rank(scores, k=TOP_K):
+        """Return ``(section_index, raw_score)`` for the best ``k`` of ``scores``
+
+        Ties keep the collection order, as the controller's stable sort does.
+        """
+        ranked = sorted(
+            (index for index, score in enumerate(scores) if score > 0),
+            key=lambda index: -scores[index],
+        )
+        return [(index, scores[index]) for index in ranked[:k]]
+
+    def normalized_score(self, index, raw_score):
+        return min(raw_score / self.keyword_counts[index], 1) if self.keyword_counts[index] else 0
+
+    def analyze(self, narrative, k=TOP_K):
+        """Return a response shaped like ``POST /api/analyze``"""
+        return self.response(self.top_sections(narrative, k))
+
+    def response(self, top_sections):
+        """Build the API response for ``(section_index, raw_score)`` pairs"""
+        recommendations = []
+        for index, raw_score in top_sections:
+            section = self.sections[index]
+            recommendations.append({
+                'code': section['code'],
+                'title': section['title'],
+                'description': section['description'],
+                'score': self.normalized_score(index, raw_score),
+                'judgments': list(self.judgments.get(section['code'])),
+            })
+        return {'success': True, 'recommendations': recommendations}
+
+
+def reference_top_sections(sections, narrative, k=TOP_K, stemmed_tokens=None):
+    """Line-by-line port of the controller's scoring loop, used for parity checks"""
+    lower_narrative = narrative.lower()
+    if stemmed_tokens is None:
+        stemmed_tokens = [stem(token) for token in tokenize(lower_narrative)]
+    scores = []
+    for index, section in enumerate(sections):
+        score = 0
+        for keyword in section.get('keywords', []):
+            lower_keyword = keyword.lower()
+            if ' ' in lower_keyword:
+                if lower_keyword in lower_narrative:
+                    score += PHRASE_WEIGHT
+            elif stem(lower_keyword) in stemmed_tokens:
+                score += STEM_WEIGHT
+        scores.append((index, score))
+    ranked = sorted((s for s in scores if s[1] > 0), key=lambda s: -s[1])
+    return ranked[:k]
+
+
+def parity_corpus(sections):
+    """Narratives exercising every seed keyword alone, in pairs and as phrases"""
+    keywords = [keyword for section in sections for keyword in section.get('keywords', [])]
+    narratives = [
+        "A person entered a house through an open window and stole jewelry worth ₹50,000 while the residents were sleeping.",
+        "Two individuals got into a heated argument at a restaurant, which escalated into a physical fight causing injuries to both parties.",
+        "A person was driving under the influence of alcohol and caused an accident that resulted in serious injuries to a pedestrian.",
+        "Someone used a fake identity document to open a bank account and later used it for fraudulent transactions.",
+        "A group of people gathered in a public place and started shouting slogans without proper permission, causing disturbance to the public.",
+        "The accused BROKE INTO the shop, Tried To Kill the guard and robbed the cash box.",
+        "",
+    ]
+    narratives.extend(f"The complainant reported {keyword} near the market." for keyword in keywords)
+    narratives.extend(
+        f"Witnesses said {first} and then {second} happened."
+        for first, second in zip(keywords, keywords[1:] + keywords[:1])
+    )
+    return narratives
+
+
+def check_parity(sections, narratives):
+    """Return the narratives whose engine ranking differs from the reference"""
+    engine = ScoringEngine(sections)
+    mismatches = []
+    for narrative in narratives:
+        expected = reference_top_sections(sections, narrative)
+        actual = engine.top_sections(narrative)
+        if expected != actual:
+            mismatches.append((narrative, expected, actual))
+    return mismatches
+
+
+def natural_reference(sections, narratives, node='node'):
+    """Tokens, stems and top sections computed by ``natural`` and the controller itself
+
+    Runs ``parityFixture.js`` from the backend, which needs ``npm install``
+    to have been run there.
+    """
+    result = subprocess.run(
+        [node, PARITY_SCRIPT], cwd=BACKEND_DIR, check=True, capture_output=True,
+        input=json.dumps({'sections': list(sections), 'narratives': list(narratives)}).encode('utf-8'),
+    )
+    return json.loads(result.stdout)
+
+
+def check_natural(sections, reference):
+    """Return descriptions of every difference between ``natural_reference`` output and the engine"""
+    engine = ScoringEngine(sections)
+    mismatches = []
+    for keyword, expected in reference['keywordStems'].items():
+        if stem(keyword) != expected:
+            mismatches.append(f"stem({keyword!r}): natural {expected!r}, port {stem(keyword)!r}")
+    for case in reference['cases']:
+        narrative = case['narrative']
+        tokens = tokenize(narrative.lower())
+        if tokens != case['tokens']:
+            mismatches.append(f"tokens of {narrative!r}: natural {case['tokens']}, port {tokens}")
+        stems = [stem(token) for token in tokens]
+        if stems != case['stems']:
+            mismatches.append(f"stems of {narrative!r}: natural {case['stems']}, port {stems}")
+        expected = [tuple(entry) for entry in case['top']]
+        actual = engine.top_sections(narrative)
+        if actual != expected:
+            mismatches.append(f"top sections of {narrative!r}: controller {expected}, engine {actual}")
+    return mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score narratives with the in-process engine")
+    parser.add_argument('narrative', nargs='?', help="Narrative to score")
+    parser.add_argument('--check-parity', action='store_true',
+                        help="Compare the engine with the controller's algorithm on the seed data")
+    parser.add_argument('--check-natural', metavar='FIXTURE', nargs='?', const='-',
+                        help="Compare the engine with the natural package, using a fixture file "
+                             "or, without one, by running the backend under node")
+    parser.add_argument('--write-natural-fixture', metavar='PATH',
+                        help="Record natural's stems and the controller's rankings on the parity corpus")
+    args = parser.parse_args(argv)
+
+    engine = ScoringEngine.from_seed()
+    if args.write_natural_fixture or args.check_natural == '-':
+        try:
+            reference = natural_reference(engine.sections, parity_corpus(engine.sections))
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"Cannot run the backend scorer (run npm install in {BACKEND_DIR}): {e}", file=sys.stderr)
+            return 2
+
+    if args.write_natural_fixture:
+        os.makedirs(os.path.dirname(os.path.abspath(args.write_natural_fixture)), exist_ok=True)
+        with open(args.write_natural_fixture, 'w', encoding='utf-8') as f:
+            json.dump(reference, f, ensure_ascii=False, indent=1)
+        print(f"Wrote {len(reference['cases'])} cases from natural {reference['natural']}")
+        return 0
+
+    if args.check_natural:
+        if args.check_natural != '-':
+            with open(args.check_natural, encoding='utf-8') as f:
+                reference = json.load(f)
+        mismatches = check_natural(engine.sections, reference)
+        for mismatch in mismatches:
+            print(f"MISMATCH {mismatch}")
+        print(f"{len(mismatches)} differences from natural {reference['natural']} "
+              f"over {len(reference['cases'])} narratives")
+        return 1 if mismatches else 0
+
+    if args.check_parity:
+        narratives = parity_corpus(engine.sections)
+        mismatches = check_parity(engine.sections, narratives)
+        for narrative, expected, actual in mismatches:
+            print(f"MISMATCH {narrative!r}: expected {expected}, got {actual}")
+        print(f"{len(narratives) - len(mismatches)}/{len(narratives)} narratives match")
+        return 1 if mismatches else 0
+
+    if args.narrative:
+        for rec in engine.analyze(args.narrative)['recommendations']:
+            print(f"{rec['code']:<10} {rec['score']:.3f}  {rec['title']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""Read the seed sections and judgments from ``seed.js``
+
+The JavaScript seed script is the single source of truth for the bundled
+IPC data. Rather than duplicating it, the array literals are extracted and
+converted to JSON here.
+"""
+import json
+import os
+import re
+
+SEED_SCRIPT = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'job', 'backend', 'src', 'scripts', 'seed.js',
+)
+
+_IDENTIFIER_KEY = re.compile(r'([{,]\s*)([A-Za-z_$][\w$]*)\s*:')
+_NEW_DATE = re.compile(r"new Date\(\s*('(?:[^'\\]|\\.)*')\s*\)")
+_TRAILING_COMMA = re.compile(r',(\s*[\]}])')
+
+
+def _extract_array(source, name):
+    match = re.search(r'const\s+%s\s*=\s*\[' % re.escape(name), source)
+    if not match:
+        raise ValueError(f"No '{name}' array found in seed script")
+    start = match.end() - 1
+    depth = 0
+    quote = None
+    i = start
+    while i < len(source):
+        char = source[i]
+        if quote:
+            if char == '\\':
+                i += 1
+            elif char == quote:
+                quote = None
+        elif char in '\'"':
+            quote = char
+        elif char == '[':
+            depth += 1
+        elif char == ']':
+            depth -= 1
+            if depth == 0:
+                return source[start:i + 1]
+        i += 1
+    raise ValueError(f"Unterminated '{name}' array in seed script")
+
+
+def _js_literal_to_python(literal):
+    literal = _NEW_DATE.sub(r'\1', literal)
+    # Re-quote single-quoted strings, leaving everything else untouched
+    parts = re.split(r"('(?:[^'\\]|\\.)*')", literal)
+    converted = []
+    for part in parts:
+        if part.startswith("'") and part.endswith("'") and len(part) >= 2:
+            converted.append(json.dumps(part[1:-1].replace("\\'", "'")))
+        else:
+            part = _IDENTIFIER_KEY.sub(r'\1"\2":', part)
+            converted.append(part)
+    return json.loads(_TRAILING_COMMA.sub(r'\1', ''.join(converted)))
+
+
+def load_seed_data(path=SEED_SCRIPT):
+    """Return ``(sections, judgments)`` as lists of dicts from ``seed.js``"""
+    with open(path, encoding='utf-8') as f:
+        source = f.read()
+    sections = _js_literal_to_python(_extract_array(source, 'sections'))
+    judgments = _js_literal_to_python(_extract_array(source, 'judgments'))
+    return sections, judgments
@@ -0,0 +1,261 @@
+"""Semantic section retrieval with a precomputed embedding index
+
+Section titles, descriptions and keywords are embedded once with a local
+Legal-BERT checkpoint and saved as a float32 ``.npy`` matrix that is
+memory-mapped at load time, so every Streamlit worker shares the same
+pages. A narrative is embedded at query time (concurrent queries are
+micro-batched into one forward pass) and ranked by cosine similarity with a
+single matrix-vector product; the score can be blended with the keyword
+score from ``ScoringEngine``.
+
+    python -m fir_assist.semantic build --model-dir models/legal-bert-base-uncased
+    python -m fir_assist.semantic query --model-dir models/legal-bert-base-uncased "..."
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from fir_assist.batching import MicroBatcher
+from fir_assist.scoring import TOP_K, ScoringEngine
+
+DEFAULT_MODEL_NAME = 'nlpaueb/legal-bert-base-uncased'
+DEFAULT_MAX_LENGTH = 256
+DEFAULT_BLEND = 0.5
+INDEX_FILE = 'sections.npy'
+META_FILE = 'sections.json'
+INT8_FILE = 'model.int8.onnx'
+WARMUP_TEXTS = (
+    "warm up",
+    "A person entered a house through an open window and stole jewelry worth 50,000 while the residents "
+    "were sleeping, then fled on a motorcycle parked outside the gate.",
+)
+
+
+class Embedder:
+    """CPU-only sentence embeddings from a local transformer checkpoint
+
+    Tokens are mean-pooled over the attention mask and L2-normalized, so a
+    dot product between embeddings is their cosine similarity.
+    """
+
+    def __init__(self, model_dir, max_length=DEFAULT_MAX_LENGTH, num_threads=None):
+        import torch
+        from transformers import AutoModel, AutoTokenizer
+
+        if num_threads:
+            torch.set_num_threads(num_threads)
+        self._torch = torch
+        self.model_dir = model_dir
+        self.max_length = max_length
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir, local_files_only=True)
+        self.model = AutoModel.from_pretrained(model_dir, local_files_only=True)
+        self.model.eval()
+
+    @property
+    def name(self):
+        return os.path.basename(os.path.normpath(self.model_dir))
+
+    def embed(self, texts):
+        """Return a ``(len(texts), dim)`` float32 array of unit vectors"""
+        torch = self._torch
+        encoded = self.tokenizer(
+            list(texts), padding=True, truncation=True,
+            max_length=self.max_length, return_tensors='pt',
+        )
+        with torch.inference_mode():
+            hidden = self.model(**encoded).last_hidden_state
+        mask = encoded['attention_mask'].unsqueeze(-1).to(hidden.dtype)
+        pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+        return normalize(pooled.numpy().astype(np.float32))
+
+
+def load_embedder(model_dir, num_threads=None):
+    """Load the encoder in ``model_dir`` and warm it up
+
+    Uses the int8 ONNX graph when ``model_dir`` holds one exported by
+    ``fir_assist.onnx_model``, otherwise the PyTorch checkpoint.
+    """
+    if os.path.exists(os.path.join(model_dir, INT8_FILE)):
+        from fir_assist.onnx_model import OnnxEmbedder
+        return OnnxEmbedder(model_dir, num_threads=num_threads)
+    embedder = Embedder(model_dir, num_threads=num_threads)
+    warm_up(embedder)
+    return embedder
+
+
+def warm_up(embedder):
+    """Run a short and a long input through ``embedder``; return the time taken in ms"""
+    start = time.perf_counter()
+    embedder.embed(WARMUP_TEXTS[:1])
+    embedder.embed(WARMUP_TEXTS)
+    return (time.perf_counter() - start) * 1000
+
+
+def normalize(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+def section_text(section):
+    """Text embedded for a section: title, description and keywords"""
+    keywords = ', '.join(section.get('keywords', []))
+    return f"{section['title']}. {section['description']}. Keywords: {keywords}"
+
+
+def sections_fingerprint(sections, model_name):
+    digest = hashlib.sha256(model_name.encode('utf-8'))
+    for section in sections:
+        digest.update(section_text(section).encode('utf-8'))
+        digest.update(section['code'].encode('utf-8'))
+    return digest.hexdigest()
+
+
+class SectionIndex:
+    """Memory-mapped matrix of section embeddings"""
+
+    def __init__(self, codes, matrix, fingerprint):
+        self.codes = codes
+        self.matrix = matrix
+        self.fingerprint = fingerprint
+
+    @classmethod
+    def build(cls, sections, embedder, index_dir, batch_size=32):
+        """Embed ``sections`` and persist the matrix and metadata to ``index_dir``"""
+        os.makedirs(index_dir, exist_ok=True)
+        texts = [section_text(section) for section in sections]
+        chunks = [embedder.embed(texts[i:i + batch_size]) for i in range(0, len(texts), batch_size)]
+        matrix = np.vstack(chunks) if chunks else np.zeros((0, 0), dtype=np.float32)
+        fingerprint = sections_fingerprint(sections, embedder.name)
+
+        # Write to temporary names first so readers never see a partial index
+        matrix_path = os.path.join(index_dir, INDEX_FILE)
+        meta_path = os.path.join(index_dir, META_FILE)
+        np.save(matrix_path + '.tmp.npy', matrix)
+        with open(meta_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump({'codes': [s['code'] for s in sections], 'fingerprint': fingerprint,
+                       'model': embedder.name, 'dim': int(matrix.shape[1]) if matrix.size else 0}, f)
+        os.replace(matrix_path + '.tmp.npy', matrix_path)
+        os.replace(meta_path + '.tmp', meta_path)
+        return cls.load(index_dir)
+
+    @classmethod
+    def load(cls, index_dir):
+        with open(os.path.join(index_dir, META_FILE), encoding='utf-8') as f:
+            meta = json.load(f)
+        matrix = np.load(os.path.join(index_dir, INDEX_FILE), mmap_mode='r')
+        return cls(meta['codes'], matrix, meta['fingerprint'])
+
+    @classmethod
+    def load_or_build(cls, sections, embedder, index_dir):
+        """Load the persisted index, rebuilding it if the sections or model changed"""
+        try:
+            index = cls.load(index_dir)
+            if index.fingerprint == sections_fingerprint(sections, embedder.name):
+                return index
+        except (OSError, ValueError, KeyError):
+            pass
+        return cls.build(sections, embedder, index_dir)
+
+    def similarities(self, query_vectors):
+        """Cosine similarity of each query row against every section"""
+        return np.asarray(query_vectors, dtype=np.float32) @ self.matrix.T
+
+
+class SemanticScorer:
+    """Rank sections by embedding similarity, optionally blended with keywords"""
+
+    def __init__(self, engine, index, embedder, blend=DEFAULT_BLEND, max_batch=16, max_wait_ms=5):
+        if index.codes != [section['code'] for section in engine.sections]:
+            raise ValueError("Embedding index does not match the engine's sections")
+        self.engine = engine
+        self.index = index
+        self.embedder = embedder
+        self.blend = blend
+        # One worker: concurrent sessions share a forward pass instead of
+        # competing for the same cores
+        self._batcher = MicroBatcher(embedder.embed, max_batch, max_wait_ms, workers=1)
+
+    @classmethod
+    def from_model_dir(cls, engine, model_dir, index_dir, num_threads=None, **kwargs):
+        embedder = load_embedder(model_dir, num_threads)
+        index = SectionIndex.load_or_build(engine.sections, embedder, index_dir)
+        return cls(engine, index, embedder, **kwargs)
+
+    def scores(self, narrative, blend=None):
+        """Return the blended score of every section
+
+        ``blend`` weights the semantic score; ``1 - blend`` weights the
+        controller's normalized keyword score.
+        """
+        return self._blend([narrative], self._batcher(narrative)[None, :], blend)[0]
+
+    def _blend(self, narratives, vectors, blend):
+        blend = self.blend if blend is None else blend
+        # Cosine similarity of mean-pooled embeddings sits in [-1, 1]
+        semantic = np.clip(self.index.similarities(vectors), 0.0, 1.0)
+        if blend >= 1:
+            return semantic
+        raw = np.array([self.engine.raw_scores(narrative) for narrative in narratives], dtype=np.float32)
+        counts = np.maximum(np.array(self.engine.keyword_counts, dtype=np.float32), 1)
+        keyword = np.minimum(raw / counts, 1.0)
+        return blend * semantic + (1 - blend) * keyword
+
+    def analyze(self, narrative, k=TOP_K, blend=None):
+        """Return a response shaped like ``POST /api/analyze``"""
+        return self._response(self.scores(narrative, blend), k)
+
+    def analyze_batch(self, narratives, k=TOP_K, blend=None):
+        """Analyze several narratives with a single forward pass"""
+        scores = self._blend(narratives, self.embedder.embed(narratives), blend)
+        return [self._response(row, k) for row in scores]
+
+    def _response(self, scores, k):
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k] if k else []
+        top = sorted(top, key=lambda index: (-scores[index], index))
+        recommendations = []
+        for index in top:
+            section = self.engine.sections[index]
+            recommendations.append({
+                'code': section['code'],
+                'title': section['title'],
+                'description': section['description'],
+                'score': float(scores[index]),
+                'judgments': list(self.engine.judgments.get(section['code'])),
+            })
+        return {'success': True, 'recommendations': recommendations}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or query the semantic section index")
+    parser.add_argument('command', choices=['build', 'query'])
+    parser.add_argument('narrative', nargs='?')
+    parser.add_argument('--model-dir', required=True,
+                        help="Local checkpoint or int8 ONNX export directory (no downloads)")
+    parser.add_argument('--index-dir', default=os.path.join('.fir_assist', 'semantic'))
+    parser.add_argument('--blend', type=float, default=DEFAULT_BLEND)
+    args = parser.parse_args(argv)
+
+    engine = ScoringEngine.from_seed()
+    embedder = load_embedder(args.model_dir)
+    if args.command == 'build':
+        index = SectionIndex.build(engine.sections, embedder, args.index_dir)
+        print(f"Embedded {len(index.codes)} sections into {args.index_dir} ({index.matrix.shape[1]} dims)")
+        return 0
+
+    if not args.narrative:
+        parser.error("query needs a narrative")
+    scorer = SemanticScorer(engine, SectionIndex.load_or_build(engine.sections, embedder, args.index_dir),
+                            embedder, blend=args.blend)
+    for rec in scorer.analyze(args.narrative)['recommendations']:
+        print(f"{rec['code']:<10} {rec['score']:.3f}  {rec['title']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
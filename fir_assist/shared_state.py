@@ -0,0 +1,106 @@
+"""State shared by every Streamlit worker process on a host
+
+A small key-value store on SQLite in WAL mode: readers never block the
+writer, and every process on the host sees the same values. Values are
+JSON with an optional expiry; ``incr`` gives atomic counters and
+``acquire``/``release`` give expiring leases, which let one process do a
+piece of work (such as a health probe) on behalf of all of them.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+
+class SharedStore:
+    """Cross-process key-value store with TTLs, counters and leases"""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS kv (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                updated REAL NOT NULL,
+                expires REAL
+            )
+        """)
+
+    def get(self, key, default=None):
+        """Return the value stored under ``key`` unless it is missing or expired"""
+        entry = self.get_entry(key)
+        return default if entry is None else entry[0]
+
+    def get_entry(self, key):
+        """Return ``(value, updated)`` for ``key``, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value, updated FROM kv WHERE key = ? AND (expires IS NULL OR expires > ?)',
+                (key, time.time()),
+            ).fetchone()
+        return None if row is None else (json.loads(row[0]), row[1])
+
+    def set(self, key, value, ttl=None):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO kv VALUES (?, ?, ?, ?)',
+                (key, json.dumps(value), now, now + ttl if ttl else None),
+            )
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute('DELETE FROM kv WHERE key = ?', (key,))
+
+    def incr(self, key, amount=1):
+        """Atomically add ``amount`` to the counter ``key``; return the new value"""
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                self._conn.execute("""
+                    INSERT INTO kv VALUES (?, ?, ?, NULL)
+                    ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + ?, updated = excluded.updated
+                """, (key, str(amount), time.time(), amount))
+                value = self._conn.execute('SELECT value FROM kv WHERE key = ?', (key,)).fetchone()[0]
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+        return int(value)
+
+    def counters(self, prefix):
+        """Return ``{key: value}`` for every counter whose key starts with ``prefix``"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, value FROM kv WHERE substr(key, 1, ?) = ? AND expires IS NULL",
+                (len(prefix), prefix),
+            ).fetchall()
+        return {key: int(value) for key, value in rows}
+
+    def acquire(self, name, ttl):
+        """Take the lease ``name`` for ``ttl`` seconds; False if another owner holds it"""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute("""
+                INSERT INTO kv VALUES (?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated = excluded.updated,
+                                               expires = excluded.expires
+                WHERE kv.expires <= excluded.updated OR kv.value = excluded.value
+            """, ('lease:' + name, json.dumps(self.owner), now, now + ttl))
+            return cursor.rowcount == 1
+
+    def release(self, name):
+        with self._lock:
+            self._conn.execute('DELETE FROM kv WHERE key = ? AND value = ?', ('lease:' + name, json.dumps(self.owner)))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,132 @@
+"""Cold-start and rerun budget check for the Streamlit app
+
+Imports ``streamlit_app`` in a fresh interpreter under ``-X importtime``,
+reports the slowest imports, and fails if startup exceeds the budget or if
+a module that should only be loaded lazily by a page was imported. When
+``streamlit.testing`` is available it also times full script reruns of the
+default page with ``AppTest``.
+
+    python -m fir_assist.startup_check --budget-ms 1500 --rerun-budget-ms 250
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_SCRIPT = os.path.join(APP_DIR, 'streamlit_app.py')
+
+# Page-only dependencies that must not be imported when the app starts
+LAZY_MODULES = ('docker', 'pandas', 'plotly', 'numpy', 'scipy', 'pymongo', 'torch', 'transformers')
+
+_IMPORT_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def profile_imports(module='streamlit_app'):
+    """Return ``(wall_ms, rows)`` for importing ``module`` in a fresh process
+
+    ``rows`` are ``(self_us, cumulative_us, depth, name)`` tuples parsed
+    from ``-X importtime`` output.
+    """
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=APP_DIR, capture_output=True, text=True,
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{completed.stderr[-2000:]}")
+    rows = []
+    for line in completed.stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((int(self_us), int(cumulative_us), len(indent) // 2, name))
+    return wall_ms, rows
+
+
+def modules_added_by_app(module='streamlit_app'):
+    """Return top-level packages the app imports beyond ``streamlit`` itself"""
+    code = (
+        "import sys, streamlit; before = set(sys.modules); "
+        f"import {module}; "
+        "print('\\n'.join(sorted({m.split('.')[0] for m in set(sys.modules) - before})))"
+    )
+    completed = subprocess.run(
+        [sys.executable, '-c', code], cwd=APP_DIR, capture_output=True, text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{completed.stderr[-2000:]}")
+    return set(completed.stdout.split())
+
+
+def time_reruns(runs):
+    """Return per-run milliseconds for full reruns of the app script, or None"""
+    try:
+        from streamlit.testing.v1 import AppTest
+    except ImportError:
+        return None
+    app = AppTest.from_file(APP_SCRIPT, default_timeout=30)
+    app.run()
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        app.run()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check Streamlit cold-start and rerun time")
+    parser.add_argument('--budget-ms', type=float, default=1500,
+                        help="Maximum cumulative import time of streamlit_app")
+    parser.add_argument('--rerun-budget-ms', type=float, default=250,
+                        help="Maximum median time of a full script rerun")
+    parser.add_argument('--reruns', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15, help="Number of slowest imports to list")
+    args = parser.parse_args(argv)
+
+    failures = []
+    wall_ms, rows = profile_imports()
+    app_index = next(i for i, row in enumerate(rows) if row[3] == 'streamlit_app')
+    app_ms = rows[app_index][1] / 1000
+    # importtime lists children before their parent, so the app's direct
+    # imports are the depth-1 rows just above it
+    direct = []
+    for row in reversed(rows[:app_index]):
+        if row[2] == 0:
+            break
+        if row[2] == 1:
+            direct.append(row)
+
+    print(f"interpreter + import wall time: {wall_ms:.0f} ms")
+    print(f"streamlit_app cumulative import: {app_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    print("slowest imports made by streamlit_app:")
+    for self_us, cumulative_us, _, name in sorted(direct, key=lambda row: -row[1])[:args.top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+    if app_ms > args.budget_ms:
+        failures.append(f"import time {app_ms:.0f} ms exceeds {args.budget_ms:.0f} ms")
+
+    eager = sorted(modules_added_by_app().intersection(LAZY_MODULES))
+    if eager:
+        failures.append(f"page-only modules imported at startup: {', '.join(eager)}")
+
+    timings = time_reruns(args.reruns)
+    if timings is None:
+        print("streamlit.testing unavailable; skipping rerun timing")
+    else:
+        median = sorted(timings)[len(timings) // 2]
+        print(f"script rerun: median {median:.1f} ms, max {max(timings):.1f} ms "
+              f"(budget {args.rerun_budget_ms:.0f} ms)")
+        if median > args.rerun_budget_ms:
+            failures.append(f"rerun time {median:.0f} ms exceeds {args.rerun_budget_ms:.0f} ms")
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
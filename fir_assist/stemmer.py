@@ -0,0 +1,176 @@
+"""Python port of the ``natural`` WordTokenizer and PorterStemmer
+
+The backend tokenizes and stems narratives with the ``natural`` npm package.
+These functions reproduce its behaviour so Python-side scoring gives the same
+results as ``analyzeController.js``.
+"""
+import re
+from functools import lru_cache
+
+# natural splits on runs of other characters and drops empty strings,
+# which is the same as finding the runs of word characters.
+_WORD = re.compile(r'[A-Za-zА-Яа-я0-9_]+')
+
+
+def tokenize(text):
+    """Split text into words like ``natural.WordTokenizer``"""
+    return _WORD.findall(text)
+
+
+def token_spans(text, pos=0, endpos=None):
+    """Yield ``(start, end, token)`` for the words of ``text[pos:endpos]``"""
+    for match in _WORD.finditer(text, pos, len(text) if endpos is None else endpos):
+        yield match.start(), match.end(), match.group()
+
+
+def _categorize_groups(token):
+    token = re.sub(r'[^aeiouy]+y', 'CV', token)
+    token = re.sub(r'[aeiou]+', 'V', token)
+    return re.sub(r'[^V]+', 'C', token)
+
+
+def _categorize_chars(token):
+    token = re.sub(r'[^aeiouy]y', 'CV', token)
+    token = re.sub(r'[aeiou]', 'V', token)
+    return re.sub(r'[^V]', 'C', token)
+
+
+def _measure(token):
+    if not token:
+        return -1
+    groups = re.sub(r'^C', '', _categorize_groups(token), count=1)
+    groups = re.sub(r'V$', '', groups, count=1)
+    return len(groups) / 2
+
+
+def _ends_with_double_cons(token):
+    return re.search(r'([^aeiou])\1$', token) is not None
+
+
+def _attempt_replace(token, pattern, replacement, callback=None):
+    result = None
+    if isinstance(pattern, str):
+        if token.endswith(pattern):
+            result = token[:len(token) - len(pattern)] + replacement
+    elif pattern.search(token):
+        result = pattern.sub(replacement, token, count=1)
+    if result and callback:
+        return callback(result)
+    return result
+
+
+def _attempt_replace_patterns(token, replacements, measure_threshold=None):
+    replacement = token
+    for suffix, stem_replacement, final_replacement in replacements:
+        if (measure_threshold is None or
+                _measure(_attempt_replace(token, suffix, stem_replacement)) > measure_threshold):
+            replacement = _attempt_replace(replacement, suffix, final_replacement) or replacement
+    return replacement
+
+
+def _replace_regex(token, regex, include_parts, minimum_measure):
+    result = ''
+    match = regex.search(token)
+    if match:
+        result = ''.join(match.group(i) for i in include_parts)
+    if _measure(result) > minimum_measure:
+        return result
+    return None
+
+
+_ED_ING = re.compile(r'(ed|ing)$')
+
+
+def _step1a(token):
+    if re.search(r'(ss|i)es$', token):
+        return re.sub(r'(ss|i)es$', r'\1', token, count=1)
+    if token[-1:] == 's' and token[-2:-1] != 's' and len(token) > 2:
+        return token[:-1]
+    return token
+
+
+def _step1b(token):
+    if token[-3:] == 'eed':
+        if _measure(token[:-3]) > 0:
+            return token[:-3] + 'ee'
+        return token
+
+    def after_suffix(stem):
+        if 'V' not in _categorize_groups(stem):
+            return None
+        result = _attempt_replace_patterns(stem, [('at', '', 'ate'), ('bl', '', 'ble'), ('iz', '', 'ize')])
+        if result != stem:
+            return result
+        if _ends_with_double_cons(result) and re.search(r'[^lsz]$', result):
+            return re.sub(r'([^aeiou])\1$', r'\1', result, count=1)
+        if (_measure(result) == 1 and _categorize_chars(result)[-3:] == 'CVC' and
+                re.search(r'[^wxy]$', result)):
+            return result + 'e'
+        return result
+
+    return _attempt_replace(token, _ED_ING, '', after_suffix) or token
+
+
+def _step1c(token):
+    groups = _categorize_groups(token)
+    if token.endswith('y') and 'V' in groups[:-1]:
+        return token[:-1] + 'i'
+    return token
+
+
+_STEP2 = [
+    ('ational', '', 'ate'), ('tional', '', 'tion'), ('enci', '', 'ence'), ('anci', '', 'ance'),
+    ('izer', '', 'ize'), ('abli', '', 'able'), ('bli', '', 'ble'), ('alli', '', 'al'),
+    ('entli', '', 'ent'), ('eli', '', 'e'), ('ousli', '', 'ous'), ('ization', '', 'ize'),
+    ('ation', '', 'ate'), ('ator', '', 'ate'), ('alism', '', 'al'), ('iveness', '', 'ive'),
+    ('fulness', '', 'ful'), ('ousness', '', 'ous'), ('aliti', '', 'al'), ('iviti', '', 'ive'),
+    ('biliti', '', 'ble'), ('logi', '', 'log'),
+]
+
+_STEP3 = [
+    ('icate', '', 'ic'), ('ative', '', ''), ('alize', '', 'al'), ('iciti', '', 'ic'),
+    ('ical', '', 'ic'), ('ful', '', ''), ('ness', '', ''),
+]
+
+_STEP4_SUFFIX = re.compile(
+    r'^(.+?)(al|ance|ence|er|ic|able|ible|ant|ement|ment|ent|ou|ism|ate|iti|ous|ive|ize)$')
+_STEP4_ION = re.compile(r'^(.+?)(s|t)(ion)$')
+
+
+def _step2(token):
+    return _attempt_replace_patterns(token, _STEP2, 0) or token
+
+
+def _step3(token):
+    return _attempt_replace_patterns(token, _STEP3, 0) or token
+
+
+def _step4(token):
+    return (_replace_regex(token, _STEP4_SUFFIX, [1], 1) or
+            _replace_regex(token, _STEP4_ION, [1, 2], 1) or
+            token)
+
+
+def _step5a(token):
+    m = _measure(re.sub(r'e$', '', token, count=1))
+    if m > 1 or (m == 1 and not (_categorize_chars(token)[-4:-1] == 'CVC' and
+                                 re.search(r'[^wxy].$', token))):
+        token = re.sub(r'e$', '', token, count=1)
+    return token
+
+
+def _step5b(token):
+    if _measure(token) > 1:
+        return re.sub(r'll$', 'l', token, count=1)
+    return token
+
+
+@lru_cache(maxsize=65536)
+def stem(token):
+    """Stem a single word like ``natural.PorterStemmer.stem``"""
+    if len(token) < 3:
+        return token
+    token = token.lower()
+    for step in (_step1a, _step1b, _step1c, _step2, _step3, _step4, _step5a, _step5b):
+        token = step(token)
+    return token
@@ -0,0 +1,196 @@
+"""Container resource telemetry from the Docker stats stream
+
+A background thread per compose container consumes ``container.stats``
+and writes samples into a fixed-size, column-oriented ring buffer of NumPy
+arrays, so memory stays constant however long the collector runs. Samples
+arriving faster than ``min_interval`` are dropped to bound the host cost,
+and charts read a downsampled view of the buffer.
+"""
+import threading
+import time
+
+import numpy as np
+
+FIELDS = ('cpu_percent', 'memory_bytes', 'memory_limit', 'net_rx_bytes', 'net_tx_bytes',
+          'block_read_bytes', 'block_write_bytes')
+# Cumulative counters that are charted as per-second rates
+RATE_FIELDS = ('net_rx_bytes', 'net_tx_bytes', 'block_read_bytes', 'block_write_bytes')
+COMPOSE_PROJECT_LABEL = 'com.docker.compose.project'
+
+
+class RingBuffer:
+    """Fixed-capacity time series stored as one NumPy array per field"""
+
+    def __init__(self, capacity, fields=FIELDS):
+        self.capacity = capacity
+        self.fields = fields
+        self._timestamps = np.zeros(capacity, dtype=np.float64)
+        self._values = np.zeros((len(fields), capacity), dtype=np.float64)
+        self._next = 0
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._size
+
+    def append(self, timestamp, values):
+        with self._lock:
+            self._timestamps[self._next] = timestamp
+            self._values[:, self._next] = values
+            self._next = (self._next + 1) % self.capacity
+            self._size = min(self._size + 1, self.capacity)
+
+    def snapshot(self, since=None):
+        """Return ``(timestamps, values)`` in time order, copied out of the buffer"""
+        with self._lock:
+            if self._size < self.capacity:
+                timestamps = self._timestamps[:self._size].copy()
+                values = self._values[:, :self._size].copy()
+            else:
+                order = np.r_[self._next:self.capacity, 0:self._next]
+                timestamps = self._timestamps[order]
+                values = self._values[:, order]
+        if since is not None:
+            keep = timestamps >= since
+            timestamps, values = timestamps[keep], values[:, keep]
+        return timestamps, values
+
+
+def downsample(timestamps, values, max_points):
+    """Average consecutive samples into at most ``max_points`` buckets"""
+    count = len(timestamps)
+    if count <= max_points or max_points <= 0:
+        return timestamps, values
+    edges = np.linspace(0, count, max_points + 1).astype(np.int64)
+    starts = edges[:-1]
+    lengths = np.diff(edges)
+    return (np.add.reduceat(timestamps, starts) / lengths,
+            np.add.reduceat(values, starts, axis=1) / lengths)
+
+
+def parse_stats(stats):
+    """Extract one sample from a Docker stats API document"""
+    cpu = stats.get('cpu_stats', {})
+    precpu = stats.get('precpu_stats', {})
+    cpu_delta = cpu.get('cpu_usage', {}).get('total_usage', 0) - precpu.get('cpu_usage', {}).get('total_usage', 0)
+    system_delta = cpu.get('system_cpu_usage', 0) - precpu.get('system_cpu_usage', 0)
+    online = cpu.get('online_cpus') or len(cpu.get('cpu_usage', {}).get('percpu_usage') or []) or 1
+    cpu_percent = cpu_delta / system_delta * online * 100 if system_delta > 0 and cpu_delta > 0 else 0.0
+
+    memory = stats.get('memory_stats', {})
+    memory_detail = memory.get('stats', {})
+    # Page cache is reclaimable; docker stats reports usage without it
+    cache = memory_detail.get('inactive_file', memory_detail.get('cache', 0))
+    memory_bytes = max(memory.get('usage', 0) - cache, 0)
+
+    rx = tx = 0
+    for interface in (stats.get('networks') or {}).values():
+        rx += interface.get('rx_bytes', 0)
+        tx += interface.get('tx_bytes', 0)
+
+    read = write = 0
+    for entry in (stats.get('blkio_stats', {}).get('io_service_bytes_recursive') or []):
+        op = entry.get('op', '').lower()
+        if op == 'read':
+            read += entry.get('value', 0)
+        elif op == 'write':
+            write += entry.get('value', 0)
+
+    return (cpu_percent, memory_bytes, memory.get('limit', 0), rx, tx, read, write)
+
+
+class ContainerStatsCollector:
+    """Collect stats for the containers of one docker-compose project"""
+
+    def __init__(self, docker_client, project='job', capacity=3600, min_interval=1.0,
+                 discovery_interval=15.0):
+        self.client = docker_client
+        self.project = project
+        self.capacity = capacity
+        self.min_interval = min_interval
+        self.discovery_interval = discovery_interval
+        self.buffers = {}
+        self._streams = {}
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._discovery = None
+
+    @property
+    def running(self):
+        return self._discovery is not None and self._discovery.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._discovery = threading.Thread(target=self._discover_loop, name='stats-discovery', daemon=True)
+        self._discovery.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _discover_loop(self):
+        while not self._stop.is_set():
+            try:
+                containers = self.client.containers.list(
+                    filters={'label': f"{COMPOSE_PROJECT_LABEL}={self.project}"}
+                )
+            except Exception:
+                containers = []
+            with self._lock:
+                for container in containers:
+                    thread = self._streams.get(container.name)
+                    if thread is None or not thread.is_alive():
+                        self.buffers.setdefault(container.name, RingBuffer(self.capacity))
+                        thread = threading.Thread(
+                            target=self._stream_loop, args=(container,),
+                            name=f'stats-{container.name}', daemon=True,
+                        )
+                        self._streams[container.name] = thread
+                        thread.start()
+            self._stop.wait(self.discovery_interval)
+
+    def _stream_loop(self, container):
+        buffer = self.buffers[container.name]
+        last = 0.0
+        try:
+            for stats in container.stats(stream=True, decode=True):
+                if self._stop.is_set():
+                    break
+                now = time.time()
+                if now - last < self.min_interval:
+                    continue
+                last = now
+                buffer.append(now, parse_stats(stats))
+        except Exception:
+            # Container stopped or the daemon went away; discovery restarts us
+            pass
+
+    def series(self, window=600, max_points=300):
+        """Return per-container chart data for the last ``window`` seconds
+
+        Each value is ``(timestamps, {metric: array})``; cumulative network
+        and block-I/O counters are converted to bytes per second.
+        """
+        since = time.time() - window
+        result = {}
+        with self._lock:
+            buffers = dict(self.buffers)
+        for name, buffer in buffers.items():
+            timestamps, values = buffer.snapshot(since)
+            if len(timestamps) < 2:
+                continue
+            metrics = {}
+            elapsed = np.diff(timestamps)
+            elapsed[elapsed <= 0] = np.nan
+            for index, field in enumerate(FIELDS):
+                if field in RATE_FIELDS:
+                    # Counters reset when a container restarts; clamp those gaps
+                    metrics[field.replace('_bytes', '_per_s')] = np.maximum(np.diff(values[index]), 0) / elapsed
+                else:
+                    metrics[field] = values[index, 1:]
+            names = list(metrics)
+            stacked = np.vstack([metrics[key] for key in names])
+            ts, stacked = downsample(timestamps[1:], stacked, max_points)
+            result[name] = (ts, dict(zip(names, stacked)))
+        return result
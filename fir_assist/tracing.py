@@ -0,0 +1,208 @@
+"""Request tracing for the analyze path, exported as OTLP/JSON lines
+
+Every analysis gets a request ID that is sent to the backend as
+``X-Request-ID`` together with a W3C ``traceparent`` header, so the
+controller's spans join the same trace. Sampled traces are appended to a
+local collector file, one OTLP ``ExportTraceServiceRequest`` per line (the
+layout of the OpenTelemetry collector's file exporter); unsampled ones cost
+an ID and a few no-op context managers.
+"""
+import glob
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager, nullcontext
+
+DEFAULT_SERVICE_NAME = 'fir-assist-streamlit'
+MAX_READ_BYTES = 8 * 1024 * 1024
+_NOOP = nullcontext()
+
+
+def _attributes(values):
+    attributes = []
+    for key, value in values.items():
+        if isinstance(value, bool):
+            attributes.append({'key': key, 'value': {'boolValue': value}})
+        elif isinstance(value, int):
+            attributes.append({'key': key, 'value': {'intValue': str(value)}})
+        elif isinstance(value, float):
+            attributes.append({'key': key, 'value': {'doubleValue': value}})
+        else:
+            attributes.append({'key': key, 'value': {'stringValue': str(value)}})
+    return attributes
+
+
+class Trace:
+    """Spans of one analysis; a no-op unless ``sampled``"""
+
+    def __init__(self, tracer, name, sampled, request_id=None):
+        self.tracer = tracer
+        self.name = name
+        self.sampled = sampled
+        self.request_id = request_id or uuid.uuid4().hex
+        self.trace_id = self.request_id if len(self.request_id) == 32 else uuid.uuid4().hex
+        self.span_id = os.urandom(8).hex()
+        self.start_ns = time.time_ns()
+        self.spans = []
+
+    def headers(self):
+        """Headers that carry the request ID and trace context to the backend"""
+        flags = '01' if self.sampled else '00'
+        return {'X-Request-ID': self.request_id, 'traceparent': f"00-{self.trace_id}-{self.span_id}-{flags}"}
+
+    def span(self, name, **attributes):
+        """Context manager timing a child span"""
+        return self._span(name, attributes) if self.sampled else _NOOP
+
+    @contextmanager
+    def _span(self, name, attributes):
+        start = time.time_ns()
+        try:
+            yield
+        finally:
+            self.add_span(name, start, time.time_ns(), **attributes)
+
+    def add_span(self, name, start_ns, end_ns, **attributes):
+        if self.sampled:
+            self.spans.append({
+                'traceId': self.trace_id,
+                'spanId': os.urandom(8).hex(),
+                'parentSpanId': self.span_id,
+                'name': name,
+                'kind': 1,
+                'startTimeUnixNano': str(start_ns),
+                'endTimeUnixNano': str(end_ns),
+                'attributes': _attributes(attributes),
+            })
+
+    def end(self, **attributes):
+        if not self.sampled:
+            return
+        root = {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'name': self.name,
+            'kind': 1,
+            'startTimeUnixNano': str(self.start_ns),
+            'endTimeUnixNano': str(time.time_ns()),
+            'attributes': _attributes({'request.id': self.request_id, **attributes}),
+        }
+        self.tracer.export([root] + self.spans)
+
+
+class Tracer:
+    """Starts traces and appends sampled ones to ``<trace_dir>/<service>-<pid>.jsonl``"""
+
+    def __init__(self, trace_dir, sample_rate=0.0, service_name=DEFAULT_SERVICE_NAME):
+        self.trace_dir = trace_dir
+        self.sample_rate = min(max(sample_rate, 0.0), 1.0)
+        self.service_name = service_name
+        self.path = os.path.join(trace_dir, f"{service_name}-{os.getpid()}.jsonl")
+        self._lock = threading.Lock()
+
+    def start(self, name, request_id=None):
+        sampled = self.sample_rate > 0 and random.random() < self.sample_rate
+        return Trace(self, name, sampled, request_id)
+
+    def export(self, spans):
+        line = json.dumps({'resourceSpans': [{
+            'resource': {'attributes': _attributes({'service.name': self.service_name})},
+            'scopeSpans': [{'scope': {'name': 'fir-assist'}, 'spans': spans}],
+        }]})
+        with self._lock:
+            os.makedirs(self.trace_dir, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+
+
+def _attribute_value(value):
+    for kind in ('stringValue', 'intValue', 'doubleValue', 'boolValue'):
+        if kind in value:
+            return int(value[kind]) if kind == 'intValue' else value[kind]
+    return None
+
+
+def load_spans(trace_dir, max_bytes=MAX_READ_BYTES):
+    """Return flat span dicts from the most recent part of every trace file"""
+    spans = []
+    for path in glob.glob(os.path.join(trace_dir, '*.jsonl')):
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            f.seek(max(size - max_bytes, 0))
+            if size > max_bytes:
+                f.readline()  # skip the partial first line
+            lines = f.read().splitlines()
+        for line in lines:
+            try:
+                request = json.loads(line)
+            except ValueError:
+                continue
+            for resource_spans in request.get('resourceSpans', []):
+                service = next((_attribute_value(a['value']) for a in resource_spans.get('resource', {})
+                                .get('attributes', []) if a['key'] == 'service.name'), '')
+                for scope_spans in resource_spans.get('scopeSpans', []):
+                    for span in scope_spans.get('spans', []):
+                        start, end = int(span['startTimeUnixNano']), int(span['endTimeUnixNano'])
+                        spans.append({
+                            'trace_id': span['traceId'],
+                            'span_id': span['spanId'],
+                            'parent_id': span.get('parentSpanId'),
+                            'name': span['name'],
+                            'service': service,
+                            'start_ns': start,
+                            'duration_ms': (end - start) / 1e6,
+                            'attributes': {a['key']: _attribute_value(a['value'])
+                                           for a in span.get('attributes', [])},
+                        })
+    return spans
+
+
+def summarize_traces(spans):
+    """Group spans into traces: request ID, start, total and per-stage milliseconds
+
+    The total is the outermost span; each other span name becomes a stage.
+    """
+    by_trace = {}
+    for span in spans:
+        by_trace.setdefault(span['trace_id'], []).append(span)
+    traces = []
+    for trace_id, members in by_trace.items():
+        ids = {span['span_id'] for span in members}
+        roots = [span for span in members if span['parent_id'] not in ids]
+        root = max(roots, key=lambda span: span['duration_ms'])
+        stages = {}
+        for span in members:
+            if span is not root:
+                stages[span['name']] = stages.get(span['name'], 0.0) + span['duration_ms']
+        traces.append({
+            'trace_id': trace_id,
+            'request_id': root['attributes'].get('request.id', trace_id),
+            'name': root['name'],
+            'start_ns': root['start_ns'],
+            'total_ms': root['duration_ms'],
+            'stages': stages,
+        })
+    traces.sort(key=lambda trace: trace['start_ns'])
+    return traces
+
+
+def stage_stats(traces):
+    """Return ``{stage: {count, mean_ms, p50_ms, p95_ms}}`` across traces"""
+    samples = {}
+    for trace in traces:
+        for stage, ms in trace['stages'].items():
+            samples.setdefault(stage, []).append(ms)
+    stats = {}
+    for stage, values in samples.items():
+        values.sort()
+        stats[stage] = {
+            'count': len(values),
+            'mean_ms': sum(values) / len(values),
+            'p50_ms': values[len(values) // 2],
+            'p95_ms': values[min(int(len(values) * 0.95), len(values) - 1)],
+        }
+    return stats
@@ -0,0 +1,299 @@
+"""Offline streaming speech-to-text with Vosk
+
+A ``SpeechModel`` is loaded once per process and shared; each recording
+gets its own ``TranscriptionSession`` (a Kaldi recognizer) that is fed
+16-bit mono PCM as it arrives. Audio is copied into a fixed-size buffer and
+handed to the recognizer a buffer at a time, so decoding cost grows with
+the new audio only, and partial text is available after every buffer.
+
+``TranscriptionServer`` exposes sessions over HTTP for the React frontend:
+
+    POST /transcribe/sessions?sample_rate=16000      -> {"id": ...}
+    POST /transcribe/sessions/<id>/audio  (raw PCM)  -> {"partial": ..., "text": ...}
+    POST /transcribe/sessions/<id>/finish            -> {"text": ..., "rtf": ...}
+
+    python -m fir_assist.transcribe --model-dir models/vosk-model-small-en-in-0.4 clip.wav
+    python -m fir_assist.transcribe --model-dir models/vosk-model-small-en-in-0.4 --serve --port 5002
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+import uuid
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+SAMPLE_RATE = 16000
+# Browsers record at 8-192 kHz; a zero rate would give an empty buffer
+MAX_SAMPLE_RATE = 192000
+SAMPLE_WIDTH = 2
+BUFFER_MS = 250
+SESSION_IDLE_TIMEOUT = 120
+MAX_SESSIONS = 32
+
+
+class SpeechModel:
+    """A Vosk acoustic model shared by every transcription session"""
+
+    def __init__(self, model_dir):
+        import vosk
+
+        vosk.SetLogLevel(-1)
+        self._vosk = vosk
+        self.model_dir = model_dir
+        start = time.perf_counter()
+        self.model = vosk.Model(model_dir)
+        self.load_ms = (time.perf_counter() - start) * 1000
+
+    def session(self, sample_rate=SAMPLE_RATE, buffer_ms=BUFFER_MS):
+        recognizer = self._vosk.KaldiRecognizer(self.model, sample_rate)
+        return TranscriptionSession(recognizer, sample_rate, buffer_ms)
+
+
+class TranscriptionSession:
+    """Incremental transcription of one recording
+
+    ``feed`` accepts PCM chunks of any size and returns the current text;
+    ``finish`` flushes the recognizer and returns the full transcript.
+    """
+
+    def __init__(self, recognizer, sample_rate=SAMPLE_RATE, buffer_ms=BUFFER_MS):
+        self.recognizer = recognizer
+        self.sample_rate = sample_rate
+        self._buffer = bytearray(sample_rate * SAMPLE_WIDTH * buffer_ms // 1000)
+        self._view = memoryview(self._buffer)
+        self._fill = 0
+        self._segments = []
+        self.partial = ''
+        self.audio_bytes = 0
+        self.processing_seconds = 0.0
+        self.finished = False
+        self.last_used = time.monotonic()
+        # One recognizer must not decode two chunks at once
+        self._lock = threading.Lock()
+
+    @property
+    def audio_seconds(self):
+        return self.audio_bytes / (self.sample_rate * SAMPLE_WIDTH)
+
+    @property
+    def rtf(self):
+        """Real-time factor: processing time divided by audio duration"""
+        return self.processing_seconds / self.audio_seconds if self.audio_bytes else 0.0
+
+    @property
+    def text(self):
+        return ' '.join(segment for segment in self._segments + [self.partial] if segment)
+
+    def feed(self, chunk):
+        with self._lock:
+            if self.finished:
+                raise ValueError("Session is already finished")
+            self.last_used = time.monotonic()
+            chunk = memoryview(chunk).cast('B')
+            self.audio_bytes += len(chunk)
+            while chunk:
+                take = min(len(chunk), len(self._buffer) - self._fill)
+                self._view[self._fill:self._fill + take] = chunk[:take]
+                self._fill += take
+                chunk = chunk[take:]
+                if self._fill == len(self._buffer):
+                    self._decode(self._view)
+                    self._fill = 0
+            return self.text
+
+    def finish(self):
+        with self._lock:
+            if not self.finished:
+                if self._fill:
+                    self._decode(self._view[:self._fill])
+                    self._fill = 0
+                start = time.perf_counter()
+                final = json.loads(self.recognizer.FinalResult()).get('text', '')
+                self.processing_seconds += time.perf_counter() - start
+                if final:
+                    self._segments.append(final)
+                self.partial = ''
+                self.finished = True
+            return self.text
+
+    def _decode(self, data):
+        start = time.perf_counter()
+        if self.recognizer.AcceptWaveform(bytes(data)):
+            segment = json.loads(self.recognizer.Result()).get('text', '')
+            if segment:
+                self._segments.append(segment)
+            self.partial = ''
+        else:
+            self.partial = json.loads(self.recognizer.PartialResult()).get('partial', '')
+        self.processing_seconds += time.perf_counter() - start
+
+
+def iter_wav_chunks(source, chunk_ms=BUFFER_MS):
+    """Yield ``(sample_rate, mono 16-bit PCM chunk)`` from a WAV path or file object
+
+    Frames are read a chunk at a time; multi-channel audio is downmixed.
+    """
+    with wave.open(source, 'rb') as wav:
+        if wav.getsampwidth() != SAMPLE_WIDTH or wav.getcomptype() != 'NONE':
+            raise ValueError("Expected uncompressed 16-bit PCM audio")
+        channels, rate = wav.getnchannels(), wav.getframerate()
+        frames = max(rate * chunk_ms // 1000, 1)
+        while True:
+            data = wav.readframes(frames)
+            if not data:
+                return
+            if channels > 1:
+                import numpy as np
+                samples = np.frombuffer(data, dtype='<i2').reshape(-1, channels)
+                data = samples.mean(axis=1).astype('<i2').tobytes()
+            yield rate, data
+
+
+def transcribe_clip(model, source, on_partial=None, chunk_ms=BUFFER_MS):
+    """Transcribe a WAV clip chunk by chunk; return the finished session"""
+    session = None
+    for rate, chunk in iter_wav_chunks(source, chunk_ms):
+        if session is None:
+            session = model.session(rate)
+        text = session.feed(chunk)
+        if on_partial:
+            on_partial(text)
+    if session is None:
+        session = model.session()
+    session.finish()
+    return session
+
+
+class TranscriptionServer:
+    """HTTP endpoints that stream audio into per-recording sessions"""
+
+    def __init__(self, model, host='127.0.0.1', port=0, idle_timeout=SESSION_IDLE_TIMEOUT,
+                 max_sessions=MAX_SESSIONS):
+        self.model = model
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self.sessions = {}
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            wbufsize = -1
+
+            def do_OPTIONS(self):
+                self._send(204, None)
+
+            def do_POST(self):
+                url = urlparse(self.path)
+                parts = [part for part in url.path.split('/') if part]
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                if parts == ['transcribe', 'sessions']:
+                    try:
+                        rate = int(parse_qs(url.query).get('sample_rate', [SAMPLE_RATE])[0])
+                    except ValueError:
+                        rate = 0
+                    if not 0 < rate <= MAX_SAMPLE_RATE:
+                        self._send(400, {'success': False, 'error': f'sample_rate must be an integer from 1 to {MAX_SAMPLE_RATE} Hz'})
+                        return
+                    session_id = server.open_session(rate)
+                    if session_id is None:
+                        self._send(503, {'success': False, 'error': 'Too many active recordings'})
+                    else:
+                        self._send(200, {'success': True, 'id': session_id})
+                    return
+                if len(parts) != 4 or parts[:2] != ['transcribe', 'sessions']:
+                    self._send(404, {'success': False})
+                    return
+                with server._lock:
+                    session = server.sessions.get(parts[2])
+                if session is None:
+                    self._send(404, {'success': False, 'error': 'Unknown or expired session'})
+                elif parts[3] == 'audio':
+                    try:
+                        text = session.feed(body)
+                    except ValueError as e:
+                        # Audio that raced a finish request
+                        self._send(409, {'success': False, 'error': str(e)})
+                        return
+                    self._send(200, {'success': True, 'partial': session.partial, 'text': text})
+                elif parts[3] == 'finish':
+                    with server._lock:
+                        server.sessions.pop(parts[2], None)
+                    text = session.finish()
+                    self._send(200, {'success': True, 'text': text, 'audio_seconds': session.audio_seconds,
+                                     'rtf': session.rtf})
+                else:
+                    self._send(404, {'success': False})
+
+            def _send(self, status, payload):
+                data = json.dumps(payload).encode('utf-8') if payload is not None else b''
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.send_header('Access-Control-Allow-Origin', '*')
+                self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
+                self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def open_session(self, sample_rate):
+        with self._lock:
+            now = time.monotonic()
+            for session_id in [sid for sid, s in self.sessions.items() if now - s.last_used > self.idle_timeout]:
+                del self.sessions[session_id]
+            if len(self.sessions) >= self.max_sessions:
+                return None
+            session_id = uuid.uuid4().hex
+            self.sessions[session_id] = self.model.session(sample_rate)
+            return session_id
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Transcribe WAV clips or serve streaming transcription")
+    parser.add_argument('clips', nargs='*', help="16-bit PCM WAV files")
+    parser.add_argument('--model-dir', required=True, help="Local Vosk model directory")
+    parser.add_argument('--chunk-ms', type=int, default=BUFFER_MS)
+    parser.add_argument('--serve', action='store_true', help="Run the HTTP transcription service")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5002)
+    args = parser.parse_args(argv)
+    if not args.clips and not args.serve:
+        parser.error("give WAV clips to transcribe or --serve")
+
+    model = SpeechModel(args.model_dir)
+    print(f"Loaded {args.model_dir} in {model.load_ms:.0f}ms", file=sys.stderr)
+
+    for clip in args.clips:
+        session = transcribe_clip(model, clip, chunk_ms=args.chunk_ms)
+        print(f"{clip}: {session.audio_seconds:.1f}s audio, {session.processing_seconds:.2f}s processing, "
+              f"RTF {session.rtf:.3f}")
+        print(f"  {session.text}")
+
+    if args.serve:
+        server = TranscriptionServer(model, args.host, args.port)
+        print(f"Serving on {server.url}", file=sys.stderr)
+        try:
+            server.server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,13 +1,13 @@
 const Section = require('../models/Section');
-const Judgment = require('../models/Judgment');
 const natural = require('natural');
+const { getJudgmentsForCodes } = require('../services/judgmentIndex');
+const { noopTrace } = require('../services/tracing');
 
 const tokenizer = new natural.WordTokenizer();
 const stemmer = natural.PorterStemmer;
 
 // Enhanced keyword-based matching with stemming and phrase matching
-const getSectionScores = async (narrative, tokens, stemmedTokens) => {
-  const sections = await Section.find({});
+const getSectionScores = (sections, narrative, tokens, stemmedTokens) => {
   const lowerNarrative = narrative.toLowerCase();
   const scores = sections.map(section => {
     let score = 0;
@@ -31,7 +31,25 @@ const getSectionScores = async (narrative, tokens, stemmedTokens) => {
   return scores.filter(s => s.score > 0).sort((a, b) => b.score - a.score).slice(0, 5);
 };
 
+// Tokenize, stem and score a narrative, returning the top sections; each
+// stage is a span when the request is sampled for tracing
+const scoreNarrative = async (narrative, trace = noopTrace) => {
+  const sections = await trace.span('db.sections.find', () => Section.find({}));
+  const tokens = trace.spanSync('tokenize', () => tokenizer.tokenize(narrative.toLowerCase()));
+  const stemmedTokens = trace.spanSync('stem', () => tokens.map(token => stemmer.stem(token)));
+  return trace.spanSync('score', () => getSectionScores(sections, narrative, tokens, stemmedTokens),
+    { 'sections.count': sections.length });
+};
+
+const toRecommendation = ({ section, score }) => ({
+  code: section.code,
+  title: section.title,
+  description: section.description,
+  score: Math.min(score / section.keywords.length, 1)
+});
+
 const analyzeNarrative = async (req, res) => {
+  const trace = req.trace || noopTrace;
   try {
     const { narrative } = req.body;
 
@@ -42,32 +60,18 @@ const analyzeNarrative = async (req, res) => {
       });
     }
 
-    // Preprocess the narrative
-    const tokens = tokenizer.tokenize(narrative.toLowerCase());
-    const stemmedTokens = tokens.map(token => stemmer.stem(token));
-
     // Get section scores based on enhanced matching
-    const topSections = await getSectionScores(narrative, tokens, stemmedTokens);
-
-    // Fetch section details and related judgments
-    const recommendations = await Promise.all(
-      topSections.map(async ({ section, score }) => {
-        const judgments = await Judgment.find({
-          sectionCodes: section.code
-        }).limit(2);
-
-        return {
-          code: section.code,
-          title: section.title,
-          description: section.description,
-          score: Math.min(score / section.keywords.length, 1),
-          judgments: judgments.map(j => ({
-            caseName: j.caseName,
-            synopsis: j.synopsis
-          }))
-        };
-      })
-    );
+    const topSections = await scoreNarrative(narrative, trace);
+
+    // Fetch related judgments for all top sections at once
+    const judgmentsByCode = await trace.span('db.judgments', () => getJudgmentsForCodes(
+      topSections.map(({ section }) => section.code)
+    ));
+
+    const recommendations = topSections.map(scored => ({
+      ...toRecommendation(scored),
+      judgments: judgmentsByCode.get(scored.section.code) || []
+    }));
 
     res.json({
       success: true,
@@ -83,6 +87,49 @@ const analyzeNarrative = async (req, res) => {
   }
 };
 
+// Stream the analysis as newline-delimited JSON: each recommendation is sent
+// as soon as it is scored, then the judgments for each section, then "done"
+const analyzeNarrativeStream = async (req, res) => {
+  const trace = req.trace || noopTrace;
+  const { narrative } = req.body;
+
+  if (!narrative) {
+    return res.status(400).json({
+      success: false,
+      error: 'Please provide a narrative'
+    });
+  }
+
+  res.status(200);
+  res.setHeader('Content-Type', 'application/x-ndjson');
+  res.setHeader('Cache-Control', 'no-cache');
+  res.flushHeaders();
+
+  const send = (event) => res.write(`${JSON.stringify(event)}\n`);
+
+  try {
+    const topSections = await scoreNarrative(narrative, trace);
+    topSections.forEach(scored => {
+      send({ type: 'recommendation', recommendation: toRecommendation(scored) });
+    });
+
+    const judgmentsByCode = await trace.span('db.judgments', () => getJudgmentsForCodes(
+      topSections.map(({ section }) => section.code)
+    ));
+    topSections.forEach(({ section }) => {
+      send({ type: 'judgments', code: section.code, judgments: judgmentsByCode.get(section.code) || [] });
+    });
+
+    send({ type: 'done', count: topSections.length });
+  } catch (error) {
+    console.error('Analysis error:', error);
+    send({ type: 'error', error: 'Error analyzing narrative' });
+  }
+  res.end();
+};
+
 module.exports = {
-  analyzeNarrative
-}; 
\ No newline at end of file
+  analyzeNarrative,
+  analyzeNarrativeStream,
+  getSectionScores
+};
\ No newline at end of file
@@ -0,0 +1,22 @@
+const { getDataVersion: readDataVersion } = require('../services/dataVersion');
+
+// Report the section/judgment data version so clients can tell when cached
+// analysis results are stale
+const getDataVersion = async (req, res) => {
+  try {
+    res.json({
+      success: true,
+      version: await readDataVersion()
+    });
+  } catch (error) {
+    console.error('Version error:', error);
+    res.status(500).json({
+      success: false,
+      error: 'Error reading data version'
+    });
+  }
+};
+
+module.exports = {
+  getDataVersion
+};
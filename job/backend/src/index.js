@@ -1,18 +1,33 @@
 require('dotenv').config();
 const express = require('express');
+const mongoose = require('mongoose');
 const cors = require('cors');
 const connectDB = require('./config/database');
 const analyzeRoutes = require('./routes/analyze');
+const judgmentIndex = require('./services/judgmentIndex');
 
 const app = express();
 
-// Connect to MongoDB
-connectDB();
+// Connect to MongoDB, then optionally warm the in-memory judgment index
+connectDB().then(() => {
+  if (process.env.JUDGMENT_CACHE === 'true') {
+    judgmentIndex.warm();
+  }
+});
 
 // Middleware
 app.use(cors());
 app.use(express.json());
 
+// Health check
+app.get('/health', (req, res) => {
+  const connected = mongoose.connection.readyState === 1;
+  res.json({
+    success: true,
+    mongodb: connected ? 'connected' : 'disconnected'
+  });
+});
+
 // Routes
 app.use('/api', analyzeRoutes);
 
@@ -29,4 +29,9 @@ const judgmentSchema = new mongoose.Schema({
   timestamps: true
 });
 
+// Multikey index so judgments can be looked up by any of their section codes
+judgmentSchema.index({ sectionCodes: 1 });
+// Ingestion upserts judgments by case name
+judgmentSchema.index({ caseName: 1 }, { unique: true });
+
 module.exports = mongoose.model('Judgment', judgmentSchema); 
\ No newline at end of file
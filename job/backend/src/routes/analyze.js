@@ -1,7 +1,11 @@
 const express = require('express');
 const router = express.Router();
-const { analyzeNarrative } = require('../controllers/analyzeController');
+const { analyzeNarrative, analyzeNarrativeStream } = require('../controllers/analyzeController');
+const { getDataVersion } = require('../controllers/versionController');
+const tracing = require('../services/tracing');
 
-router.post('/analyze', analyzeNarrative);
+router.post('/analyze', tracing.middleware, analyzeNarrative);
+router.post('/analyze/stream', tracing.middleware, analyzeNarrativeStream);
+router.get('/version', getDataVersion);
 
 module.exports = router; 
\ No newline at end of file
@@ -0,0 +1,47 @@
+// Print what the controller's tokenizer, stemmer and scorer produce for a
+// set of narratives, so the Python port in fir_assist can be checked
+// against the real `natural` package.
+//
+// Reads {"sections": [...], "narratives": [...]} as JSON on stdin and writes
+// {"natural": version, "keywordStems": {...}, "cases": [...]} to stdout.
+// Usage: python -m fir_assist.scoring --write-natural-fixture tests/fixtures/natural_parity.json
+const natural = require('natural');
+const { version } = require('natural/package.json');
+const { getSectionScores } = require('../controllers/analyzeController');
+
+const tokenizer = new natural.WordTokenizer();
+const stemmer = natural.PorterStemmer;
+
+const readStdin = () => new Promise((resolve, reject) => {
+  const chunks = [];
+  process.stdin.on('data', chunk => chunks.push(chunk));
+  process.stdin.on('end', () => resolve(Buffer.concat(chunks).toString('utf8')));
+  process.stdin.on('error', reject);
+});
+
+const main = async () => {
+  const { sections, narratives } = JSON.parse(await readStdin());
+
+  const keywordStems = {};
+  sections.forEach(section => section.keywords.forEach(keyword => {
+    const lowerKeyword = keyword.toLowerCase();
+    if (!lowerKeyword.includes(' ')) {
+      keywordStems[lowerKeyword] = stemmer.stem(lowerKeyword);
+    }
+  }));
+
+  const cases = narratives.map(narrative => {
+    const tokens = tokenizer.tokenize(narrative.toLowerCase());
+    const stems = tokens.map(token => stemmer.stem(token));
+    const top = getSectionScores(sections, narrative, tokens, stems)
+      .map(({ section, score }) => [sections.indexOf(section), score]);
+    return { narrative, tokens, stems, top };
+  });
+
+  process.stdout.write(JSON.stringify({ natural: version, keywordStems, cases }));
+};
+
+main().catch(error => {
+  console.error(error);
+  process.exit(1);
+});
@@ -3,6 +3,7 @@ const mongoose = require('mongoose');
 const Section = require('../models/Section');
 const Judgment = require('../models/Judgment');
 const connectDB = require('../config/database');
+const { bumpDataVersion } = require('../services/dataVersion');
 
 const sections = [
   {
@@ -91,6 +92,7 @@ const seedDatabase = async () => {
     // Insert new data
     await Section.insertMany(sections);
     await Judgment.insertMany(judgments);
+    await bumpDataVersion();
 
     console.log('Database seeded successfully');
     process.exit(0);
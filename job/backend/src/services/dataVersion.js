@@ -0,0 +1,51 @@
+const mongoose = require('mongoose');
+const Section = require('../models/Section');
+const Judgment = require('../models/Judgment');
+
+const META_COLLECTION = 'meta';
+const DATA_VERSION_ID = 'dataVersion';
+
+const metaCollection = () => mongoose.connection.db.collection(META_COLLECTION);
+
+// Version stamp derived from the section/judgment collections; it changes
+// whenever documents are added, removed or updated
+const deriveDataVersion = async () => {
+  const [sectionCount, judgmentCount, latestSection, latestJudgment] = await Promise.all([
+    Section.estimatedDocumentCount(),
+    Judgment.estimatedDocumentCount(),
+    Section.findOne({}, { updatedAt: 1 }).sort({ updatedAt: -1 }).lean(),
+    Judgment.findOne({}, { updatedAt: 1 }).sort({ updatedAt: -1 }).lean()
+  ]);
+
+  const timestamps = [latestSection, latestJudgment]
+    .filter(doc => doc && doc.updatedAt)
+    .map(doc => new Date(doc.updatedAt).getTime());
+
+  return `${sectionCount}-${judgmentCount}-${timestamps.length ? Math.max(...timestamps) : 0}`;
+};
+
+// Prefer the stamp written by the ingestion tool and the seed script (one
+// indexed lookup); fall back to deriving it for databases loaded otherwise
+const getDataVersion = async () => {
+  const stamp = await metaCollection().findOne({ _id: DATA_VERSION_ID }, { projection: { version: 1 } });
+  return stamp && stamp.version ? stamp.version : deriveDataVersion();
+};
+
+// Advance the stamp after changing sections or judgments
+const bumpDataVersion = async () => {
+  const now = new Date();
+  const result = await metaCollection().findOneAndUpdate(
+    { _id: DATA_VERSION_ID },
+    [
+      { $set: { revision: { $add: [{ $ifNull: ['$revision', 0] }, 1] }, updatedAt: now } },
+      { $set: { version: { $concat: ['r', { $toString: '$revision' }, '-', String(now.getTime())] } } }
+    ],
+    { upsert: true, returnDocument: 'after', includeResultMetadata: false }
+  );
+  return result.version;
+};
+
+module.exports = {
+  getDataVersion,
+  bumpDataVersion
+};
@@ -0,0 +1,71 @@
+const Judgment = require('../models/Judgment');
+const { getDataVersion } = require('./dataVersion');
+
+const MAX_JUDGMENTS_PER_SECTION = 2;
+const REFRESH_INTERVAL_MS = parseInt(process.env.JUDGMENT_CACHE_REFRESH_MS, 10) || 60000;
+
+let judgmentsByCode = null;
+let loadedVersion = null;
+let refreshTimer = null;
+
+// Group judgments by section code, keeping the first few per code in
+// collection order like the old per-section find().limit(2)
+const groupByCode = (judgments, codes) => {
+  const wanted = codes ? new Set(codes) : null;
+  const grouped = new Map();
+  judgments.forEach(judgment => {
+    judgment.sectionCodes.forEach(code => {
+      if (wanted && !wanted.has(code)) return;
+      const list = grouped.get(code) || [];
+      if (list.length < MAX_JUDGMENTS_PER_SECTION) {
+        list.push({ caseName: judgment.caseName, synopsis: judgment.synopsis });
+        grouped.set(code, list);
+      }
+    });
+  });
+  return grouped;
+};
+
+const fetchJudgments = (codes) => {
+  const filter = codes ? { sectionCodes: { $in: codes } } : {};
+  return Judgment.find(filter, { caseName: 1, synopsis: 1, sectionCodes: 1 }).lean();
+};
+
+// Rebuild the in-memory index if the seed data changed since the last load
+const refresh = async () => {
+  const version = await getDataVersion();
+  if (version === loadedVersion) return;
+  judgmentsByCode = groupByCode(await fetchJudgments(null));
+  loadedVersion = version;
+  console.log(`Judgment index loaded (${judgmentsByCode.size} sections, version ${version})`);
+};
+
+// Load the index now and keep it fresh in the background
+const warm = async () => {
+  try {
+    await refresh();
+  } catch (error) {
+    console.error('Judgment index warm-up failed:', error.message);
+  }
+  if (!refreshTimer) {
+    refreshTimer = setInterval(() => {
+      refresh().catch(error => console.error('Judgment index refresh failed:', error.message));
+    }, REFRESH_INTERVAL_MS);
+    refreshTimer.unref();
+  }
+};
+
+// Resolve judgments for all codes at once: from the warm index when it is
+// loaded, otherwise with a single $in query on the sectionCodes index
+const getJudgmentsForCodes = async (codes) => {
+  if (judgmentsByCode) {
+    return new Map(codes.map(code => [code, judgmentsByCode.get(code) || []]));
+  }
+  if (codes.length === 0) return new Map();
+  return groupByCode(await fetchJudgments(codes), codes);
+};
+
+module.exports = {
+  warm,
+  getJudgmentsForCodes
+};
@@ -0,0 +1,149 @@
+const crypto = require('crypto');
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+
+// Sampled requests are recorded as OTLP/JSON spans, one export request per
+// line, in the same format as the OpenTelemetry collector's file exporter.
+// Unsampled requests get a no-op trace, so the cost is one branch per stage.
+const SAMPLE_RATE = Math.min(Math.max(parseFloat(process.env.TRACE_SAMPLE_RATE || '0') || 0, 0), 1);
+// One file per process, so replicas sharing a traces volume never interleave lines
+const TRACE_FILE = process.env.TRACE_FILE
+  || path.join(__dirname, '..', '..', 'traces', `backend-${os.hostname()}-${process.pid}.jsonl`);
+const SERVICE_NAME = process.env.OTEL_SERVICE_NAME || 'fir-assist-backend';
+const FLUSH_INTERVAL_MS = 1000;
+const MAX_PENDING = 10000;
+const TRACEPARENT = /^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$/;
+
+let pending = [];
+let flushing = false;
+
+// Monotonic clock anchored to the wall clock once, in Unix nanoseconds
+const startHr = process.hrtime.bigint();
+const startEpochNanos = BigInt(Date.now()) * 1000000n;
+const nowNanos = () => process.hrtime.bigint() - startHr + startEpochNanos;
+
+const randomId = (bytes) => crypto.randomBytes(bytes).toString('hex');
+
+const toAttributes = (attributes) => Object.entries(attributes).map(([key, value]) => ({
+  key,
+  value: typeof value === 'number'
+    ? (Number.isInteger(value) ? { intValue: String(value) } : { doubleValue: value })
+    : { stringValue: String(value) }
+}));
+
+const noopTrace = {
+  sampled: false,
+  span: (name, fn) => fn(),
+  spanSync: (name, fn) => fn(),
+  end: () => {}
+};
+
+class Trace {
+  constructor(traceId, parentSpanId, requestId, name) {
+    this.sampled = true;
+    this.traceId = traceId;
+    this.requestId = requestId;
+    this.rootId = randomId(8);
+    this.parentSpanId = parentSpanId;
+    this.name = name;
+    this.start = nowNanos();
+    this.spans = [];
+  }
+
+  record(name, start, attributes = {}) {
+    this.spans.push({
+      traceId: this.traceId,
+      spanId: randomId(8),
+      parentSpanId: this.rootId,
+      name,
+      kind: 1,
+      startTimeUnixNano: String(start),
+      endTimeUnixNano: String(nowNanos()),
+      attributes: toAttributes(attributes)
+    });
+  }
+
+  async span(name, fn, attributes) {
+    const start = nowNanos();
+    try {
+      return await fn();
+    } finally {
+      this.record(name, start, attributes);
+    }
+  }
+
+  spanSync(name, fn, attributes) {
+    const start = nowNanos();
+    try {
+      return fn();
+    } finally {
+      this.record(name, start, attributes);
+    }
+  }
+
+  end(attributes = {}) {
+    const root = {
+      traceId: this.traceId,
+      spanId: this.rootId,
+      name: this.name,
+      kind: 2,
+      startTimeUnixNano: String(this.start),
+      endTimeUnixNano: String(nowNanos()),
+      attributes: toAttributes({ 'request.id': this.requestId, ...attributes })
+    };
+    if (this.parentSpanId) root.parentSpanId = this.parentSpanId;
+    enqueue([root, ...this.spans]);
+  }
+}
+
+const enqueue = (spans) => {
+  if (pending.length < MAX_PENDING) pending.push(spans);
+};
+
+// Append buffered spans without blocking request handling
+const flush = () => {
+  if (flushing || pending.length === 0) return;
+  const batch = pending;
+  pending = [];
+  flushing = true;
+  const line = JSON.stringify({
+    resourceSpans: [{
+      resource: { attributes: toAttributes({ 'service.name': SERVICE_NAME }) },
+      scopeSpans: [{ scope: { name: 'fir-assist' }, spans: batch.flat() }]
+    }]
+  });
+  fs.mkdir(path.dirname(TRACE_FILE), { recursive: true }, () => {
+    fs.appendFile(TRACE_FILE, `${line}\n`, (error) => {
+      flushing = false;
+      if (error) console.error('Trace export error:', error.message);
+    });
+  });
+};
+setInterval(flush, FLUSH_INTERVAL_MS).unref();
+
+// Express middleware: attach req.trace, continuing the caller's W3C trace
+// context when one is sent and echoing the request ID
+const middleware = (req, res, next) => {
+  const requestId = req.get('X-Request-ID') || randomId(16);
+  res.set('X-Request-ID', requestId);
+
+  const parent = TRACEPARENT.exec(req.get('traceparent') || '');
+  const sampled = parent ? (parseInt(parent[3], 16) & 1) === 1 : Math.random() < SAMPLE_RATE;
+  if (!sampled) {
+    req.trace = noopTrace;
+    return next();
+  }
+
+  const trace = new Trace(parent ? parent[1] : randomId(16), parent && parent[2], requestId,
+    `${req.method} ${req.baseUrl}${req.path}`);
+  req.trace = trace;
+  res.on('finish', () => trace.end({ 'http.status_code': res.statusCode }));
+  next();
+};
+
+module.exports = {
+  middleware,
+  noopTrace,
+  flush
+};
@@ -1,16 +1,20 @@
-import React, { useState } from 'react';
+import React, { useRef, useState } from 'react';
 import axios from 'axios';
 import { MicrophoneIcon, StopIcon } from '@heroicons/react/24/solid';
 
+// Voice input is offered only when a transcription service is configured
+const TRANSCRIBE_URL = process.env.REACT_APP_TRANSCRIBE_URL;
+
 function App() {
   const [narrative, setNarrative] = useState('');
   const [isRecording, setIsRecording] = useState(false);
   const [recommendations, setRecommendations] = useState([]);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
+  const recorder = useRef(null);
 
-  const handleAnalyze = async () => {
-    if (!narrative.trim()) {
+  const handleAnalyze = async (text = narrative) => {
+    if (!text.trim()) {
       setError('Please enter an incident narrative');
       return;
     }
@@ -20,7 +24,7 @@ function App() {
 
     try {
       const response = await axios.post('http://localhost:5000/api/analyze', {
-        narrative
+        narrative: text
       });
       setRecommendations(response.data.recommendations);
     } catch (err) {
@@ -31,9 +35,78 @@ function App() {
     }
   };
 
-  const toggleRecording = () => {
-    setIsRecording(!isRecording);
-    // TODO: Implement voice recording functionality
+  const startRecording = async () => {
+    const stream = await navigator.mediaDevices.getUserMedia({ audio: true });
+    let context;
+    try {
+      context = new AudioContext();
+      const { data } = await axios.post(
+        `${TRANSCRIBE_URL}/transcribe/sessions?sample_rate=${context.sampleRate}`
+      );
+      const source = context.createMediaStreamSource(stream);
+      const processor = context.createScriptProcessor(4096, 1, 1);
+      const prefix = narrative.trim() ? `${narrative.trimEnd()} ` : '';
+      const state = { stream, context, source, processor, id: data.id, prefix, pending: Promise.resolve() };
+
+      processor.onaudioprocess = (event) => {
+        const samples = event.inputBuffer.getChannelData(0);
+        const pcm = new Int16Array(samples.length);
+        for (let i = 0; i < samples.length; i++) {
+          const sample = Math.max(-1, Math.min(1, samples[i]));
+          pcm[i] = sample < 0 ? sample * 0x8000 : sample * 0x7fff;
+        }
+        // Chunks must arrive in order; each reply carries the text so far
+        state.pending = state.pending
+          .then(() => axios.post(`${TRANSCRIBE_URL}/transcribe/sessions/${state.id}/audio`, pcm.buffer, {
+            headers: { 'Content-Type': 'application/octet-stream' }
+          }))
+          .then((response) => setNarrative(prefix + response.data.text))
+          .catch((err) => console.error('Transcription error:', err));
+      };
+      source.connect(processor);
+      processor.connect(context.destination);
+      recorder.current = state;
+    } catch (err) {
+      // Release the microphone if the session or audio graph could not be set up
+      stream.getTracks().forEach((track) => track.stop());
+      if (context) {
+        context.close();
+      }
+      throw err;
+    }
+  };
+
+  const stopRecording = async () => {
+    const state = recorder.current;
+    recorder.current = null;
+    state.processor.onaudioprocess = null;
+    state.source.disconnect();
+    state.processor.disconnect();
+    state.stream.getTracks().forEach((track) => track.stop());
+    await state.context.close();
+    await state.pending;
+
+    const { data } = await axios.post(`${TRANSCRIBE_URL}/transcribe/sessions/${state.id}/finish`);
+    const text = state.prefix + data.text;
+    setNarrative(text);
+    handleAnalyze(text);
+  };
+
+  const toggleRecording = async () => {
+    setError(null);
+    try {
+      if (isRecording) {
+        setIsRecording(false);
+        await stopRecording();
+      } else {
+        await startRecording();
+        setIsRecording(true);
+      }
+    } catch (err) {
+      setIsRecording(false);
+      setError('Voice input is unavailable. Please type the narrative instead.');
+      console.error('Recording error:', err);
+    }
   };
 
   return (
@@ -55,20 +128,22 @@ function App() {
                     value={narrative}
                     onChange={(e) => setNarrative(e.target.value)}
                   />
-                  <button
-                    onClick={toggleRecording}
-                    className="absolute right-2 bottom-2 p-2 rounded-full hover:bg-gray-100"
-                  >
-                    {isRecording ? (
-                      <StopIcon className="h-6 w-6 text-red-500" />
-                    ) : (
-                      <MicrophoneIcon className="h-6 w-6 text-primary-500" />
-                    )}
-                  </button>
+                  {TRANSCRIBE_URL && (
+                    <button
+                      onClick={toggleRecording}
+                      className="absolute right-2 bottom-2 p-2 rounded-full hover:bg-gray-100"
+                    >
+                      {isRecording ? (
+                        <StopIcon className="h-6 w-6 text-red-500" />
+                      ) : (
+                        <MicrophoneIcon className="h-6 w-6 text-primary-500" />
+                      )}
+                    </button>
+                  )}
                 </div>
 
                 <button
-                  onClick={handleAnalyze}
+                  onClick={() => handleAnalyze()}
                   disabled={loading}
                   className="w-full mt-4 px-4 py-2 bg-primary-600 text-white rounded-md hover:bg-primary-700 focus:outline-none focus:ring-2 focus:ring-primary-500 focus:ring-offset-2 disabled:opacity-50"
                 >
@@ -1,14 +1,26 @@
 import streamlit as st
 import requests
 import json
-import subprocess
+import hashlib
 import os
 import time
-import docker
 from datetime import datetime
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+
+# Start of this script run, so traces can attribute Streamlit's rerun overhead
+RERUN_STARTED_NS = time.time_ns()
+
+from fir_assist.analytics import AnalyticsStore
+from fir_assist.batch import count_narratives, load_finished_ids, make_api_analyzer, run_batch
+from fir_assist.cache import ResultCache
+from fir_assist.client import ApiClient
+from fir_assist.deploy import DeploymentManager
+from fir_assist.health import HealthMonitor
+from fir_assist.scoring import ScoringEngine
+from fir_assist.tracing import Tracer
+
+# Heavy dependencies (docker, pandas, plotly, numpy/scipy) are imported inside
+# the pages that use them, since Streamlit re-runs this script on every
+# interaction. Check with: python -m fir_assist.startup_check
 
 # Page configuration
 st.set_page_config(
@@ -66,108 +78,369 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Initialize session state
-if 'docker_client' not in st.session_state:
-    try:
-        st.session_state.docker_client = docker.from_env()
-    except:
-        st.session_state.docker_client = None
-
 if 'services_status' not in st.session_state:
     st.session_state.services_status = {}
 
 # Constants
-API_BASE_URL = "http://localhost:5000"
+API_BASE_URL = os.environ.get("FIR_ASSIST_API_URL", "http://localhost:5000")
 FRONTEND_URL = "http://localhost:3000"
+MONGODB_URI = os.environ.get("MONGODB_URI", "mongodb://localhost:27017/fir-assist")
+HEALTH_CHECK_TTL = 10
+DATA_VERSION_TTL = 30
+RESULT_CACHE_TTL = 24 * 60 * 60
+RESULT_CACHE_MEMORY_MB = 32
+JOB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "job")
+COMPOSE_PROJECT = os.environ.get("COMPOSE_PROJECT_NAME", os.path.basename(JOB_DIR))
+DATA_DIR = os.environ.get("FIR_ASSIST_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".fir_assist"))
+LEGAL_BERT_MODEL_DIR = os.environ.get("LEGAL_BERT_MODEL_DIR", os.path.join(DATA_DIR, "models", "legal-bert-base-uncased"))
+LEGAL_BERT_THREADS = int(os.environ.get("LEGAL_BERT_THREADS", "0")) or None
+SEMANTIC_BLEND = 0.5
+CONFIDENCE_THRESHOLD = 0.7
+VOSK_MODEL_DIR = os.environ.get("VOSK_MODEL_DIR", os.path.join(DATA_DIR, "models", "vosk-model-small-en-in-0.4"))
+CATALOG_PATH = os.path.join(DATA_DIR, "catalog.bin")
+TRACE_DIR = os.environ.get("FIR_ASSIST_TRACE_DIR", os.path.join(JOB_DIR, "traces"))
+TRACE_SAMPLE_RATE = float(os.environ.get("FIR_ASSIST_TRACE_SAMPLE_RATE", "0"))
 
-def check_service_status():
-    """Check the status of all services"""
-    status = {}
-    
-    # Check backend API
+# Set on the Settings page; also read by the fuzzy engine
+if 'confidence_threshold' not in st.session_state:
+    st.session_state.confidence_threshold = CONFIDENCE_THRESHOLD
+
+@st.cache_resource
+def get_api_client():
+    """Pooled keep-alive client to the backend, shared by all sessions"""
+    return ApiClient(API_BASE_URL)
+
+@st.cache_resource
+def get_docker_client():
+    """Docker client shared by all sessions, or None if Docker is unavailable"""
     try:
-        response = requests.get(f"{API_BASE_URL}/health", timeout=5)
-        status['backend'] = "Running" if response.status_code == 200 else "Error"
-    except:
-        status['backend'] = "Stopped"
-    
-    # Check frontend
+        import docker
+        return docker.from_env()
+    except Exception:
+        return None
+
+@st.cache_resource
+def get_stats_collector():
+    """Docker stats collector for the compose services, or None without Docker"""
+    docker_client = get_docker_client()
+    if docker_client is None:
+        return None
+    from fir_assist.telemetry import ContainerStatsCollector
+    return ContainerStatsCollector(docker_client, project=COMPOSE_PROJECT)
+
+@st.cache_resource
+def get_shared_store():
+    """Key-value store shared by every Streamlit worker process on this host"""
+    from fir_assist.shared_state import SharedStore
+    return SharedStore(os.path.join(DATA_DIR, "shared_state.sqlite3"))
+
+@st.cache_resource
+def get_health_monitor():
+    """Health monitor whose status is shared by all sessions and worker processes"""
+    return HealthMonitor(get_api_client(), FRONTEND_URL, MONGODB_URI, ttl=HEALTH_CHECK_TTL,
+                         shared=get_shared_store())
+
+def get_scoring_engine():
+    """In-process keyword scoring engine for the backend's current data version"""
+    return load_scoring_engine(get_data_version())
+
+@st.cache_resource(max_entries=1)
+def load_scoring_engine(data_version):
+    """Scoring engine built from the catalog snapshot, MongoDB or the seed data
+
+    Keyed on the data version, so an import rebuilds it instead of leaving
+    stale results to be cached under the new version.
+    """
+    if os.path.exists(CATALOG_PATH):
+        from fir_assist.catalog import Catalog
+        try:
+            catalog = Catalog.load(CATALOG_PATH)
+        except (OSError, ValueError):
+            catalog = None
+        # A snapshot older than the backend's data is skipped in favour of MongoDB
+        if catalog is not None and data_version in (None, catalog.data_version):
+            return ScoringEngine.from_catalog(catalog)
     try:
-        response = requests.get(FRONTEND_URL, timeout=5)
-        status['frontend'] = "Running" if response.status_code == 200 else "Error"
-    except:
-        status['frontend'] = "Stopped"
-    
-    # Check MongoDB
+        return ScoringEngine.from_mongo(MONGODB_URI)
+    except Exception:
+        return ScoringEngine.from_seed()
+
+def get_semantic_scorer():
+    """Legal-BERT section retrieval over the current sections, or None without a checkpoint"""
+    return load_semantic_scorer(get_data_version())
+
+@st.cache_resource(max_entries=1)
+def load_semantic_scorer(data_version):
+    """Legal-BERT section retrieval, loaded and warmed up once per process and data version"""
+    if not os.path.isdir(LEGAL_BERT_MODEL_DIR):
+        return None
+    from fir_assist.semantic import SemanticScorer
+    return SemanticScorer.from_model_dir(
+        load_scoring_engine(data_version),
+        LEGAL_BERT_MODEL_DIR,
+        os.path.join(DATA_DIR, "semantic"),
+        num_threads=LEGAL_BERT_THREADS,
+        blend=SEMANTIC_BLEND,
+    )
+
+@st.cache_resource(max_entries=3)
+def get_fuzzy_matcher(max_distance, data_version):
+    """Fuzzy keyword and transliteration matcher, compiled once per edit distance and data version"""
+    from fir_assist.fuzzy import FuzzyMatcher
+    return FuzzyMatcher.from_engine(load_scoring_engine(data_version), max_distance=max_distance)
+
+def get_fuzzy_scorer(threshold):
+    """Fuzzy scorer whose edit distance and edit weight follow the confidence threshold"""
+    from fir_assist.fuzzy import FuzzyScorer, settings_for_threshold
+    max_distance, fuzzy_weight = settings_for_threshold(threshold)
+    data_version = get_data_version()
+    return FuzzyScorer(load_scoring_engine(data_version), get_fuzzy_matcher(max_distance, data_version), fuzzy_weight)
+
+@st.cache_resource
+def get_speech_model():
+    """Vosk speech model shared by all sessions, or None without a local model"""
+    if not os.path.isdir(VOSK_MODEL_DIR):
+        return None
+    from fir_assist.transcribe import SpeechModel
+    return SpeechModel(VOSK_MODEL_DIR)
+
+@st.cache_resource
+def get_result_cache():
+    """Narrative result cache; the disk tier is shared by all worker processes"""
+    return ResultCache(
+        memory_budget=RESULT_CACHE_MEMORY_MB * 1024 * 1024,
+        ttl=RESULT_CACHE_TTL,
+        disk_path=os.path.join(DATA_DIR, "result_cache.sqlite3"),
+        shared=get_shared_store(),
+    )
+
+def get_data_version():
+    """Section/judgment data version reported by the backend, polled once per TTL per host"""
+    shared = get_shared_store()
+    version = shared.get("data_version")
+    if version is not None:
+        return version
     try:
-        response = requests.get(f"{API_BASE_URL}/health", timeout=5)
-        status['mongodb'] = "Running" if response.status_code == 200 else "Error"
-    except:
-        status['mongodb'] = "Stopped"
-    
-    return status
+        response = get_api_client().get("/api/version", timeout=5)
+        if response.status_code == 200:
+            version = response.json().get("version", "")
+            shared.set("data_version", version, ttl=DATA_VERSION_TTL)
+            return version
+    except requests.exceptions.RequestException:
+        pass
+    return None
+
+@st.cache_resource
+def get_tracer():
+    """Request tracer; sampled traces go to the collector file in TRACE_DIR"""
+    return Tracer(TRACE_DIR, TRACE_SAMPLE_RATE)
+
+@st.cache_resource
+def get_analytics_store():
+    """Append-only analysis log with incrementally updated rollups"""
+    return AnalyticsStore(os.path.join(DATA_DIR, "analytics.sqlite3"))
+
+def check_service_status(force=False):
+    """Check the status of all services"""
+    return get_health_monitor().status(force=force)
+
+@st.cache_resource
+def get_deployment_manager():
+    """Background docker-compose runner shared by all sessions"""
+    return DeploymentManager(JOB_DIR, lock_path=os.path.join(DATA_DIR, "deploy.lock"))
 
 def deploy_services():
-    """Deploy the FIR Assist services using Docker Compose"""
-    try:
-        # Change to the job directory
-        os.chdir("job")
-        
-        # Run docker-compose up
-        result = subprocess.run(
-            ["docker-compose", "up", "-d", "--build"],
-            capture_output=True,
-            text=True,
-            timeout=300
-        )
-        
-        if result.returncode == 0:
-            return True, "Services deployed successfully!"
-        else:
-            return False, f"Deployment failed: {result.stderr}"
-    
-    except subprocess.TimeoutExpired:
-        return False, "Deployment timed out"
-    except Exception as e:
-        return False, f"Deployment error: {str(e)}"
+    """Start deploying the FIR Assist services with Docker Compose in the background"""
+    job, message = get_deployment_manager().start('deploy')
+    return job is not None, message
 
 def stop_services():
-    """Stop the FIR Assist services"""
-    try:
-        os.chdir("job")
-        result = subprocess.run(
-            ["docker-compose", "down"],
-            capture_output=True,
-            text=True,
-            timeout=60
-        )
-        
-        if result.returncode == 0:
-            return True, "Services stopped successfully!"
-        else:
-            return False, f"Stop failed: {result.stderr}"
+    """Start stopping the FIR Assist services in the background"""
+    job, message = get_deployment_manager().start('stop')
+    return job is not None, message
+
+def render_deployment_job(job):
+    """Show the status and recent output of a deployment job"""
+    if job.running:
+        st.info(f"⏳ {job.summary()} ({job.elapsed:.0f}s)")
+    elif job.status == 'succeeded':
+        st.success(job.summary())
+    else:
+        st.error(job.summary())
+    
+    st.code("\n".join(job.tail(200)) or "Waiting for output...", language="text")
+
+@st.fragment(run_every=2)
+def show_live_deployment_job():
+    """Poll the running job without re-running the whole page"""
+    job = get_deployment_manager().current
+    render_deployment_job(job)
+    
+    if job.running:
+        if st.button("✖️ Cancel", key=f"cancel_job_{job.id}"):
+            job.cancel()
+    else:
+        # Finished: refresh service status and stop polling
+        st.session_state.services_status = check_service_status(force=True)
+        st.rerun()
+
+def show_deployment_job():
+    """Show the current or most recent deployment job, if any"""
+    job = get_deployment_manager().current
+    if job is None:
+        return
     
-    except subprocess.TimeoutExpired:
-        return False, "Stop operation timed out"
-    except Exception as e:
-        return False, f"Stop error: {str(e)}"
+    st.markdown(f"**{job.action.title()} job #{job.id}** — `{' '.join(job.command)}`")
+    if job.running:
+        show_live_deployment_job()
+    else:
+        with st.expander("Last deployment output", expanded=False):
+            render_deployment_job(job)
+
+def analyze_fir_narrative(narrative, local=False, semantic=False, fuzzy=False):
+    """Analyze FIR narrative using the backend API, the local scoring engine, fuzzy matching or Legal-BERT retrieval"""
+    namespace = "semantic" if semantic else "fuzzy" if fuzzy else "local" if local else "api"
+    trace = get_tracer().start("analyze_fir_narrative")
+    trace.add_span("streamlit.rerun", RERUN_STARTED_NS, trace.start_ns)
+    success, result = _analyze_traced(narrative, namespace, trace)
+    trace.end(engine=namespace, success=success, **{"narrative.length": len(narrative)})
+    return success, result
 
-def analyze_fir_narrative(narrative):
-    """Analyze FIR narrative using the backend API"""
+def _analyze_traced(narrative, namespace, trace):
+    cache = get_result_cache()
+    data_version = get_data_version()
+    if data_version is not None:
+        cache.set_data_version(data_version)
+    # Fuzzy results depend on the confidence threshold, so each value gets its own entries
+    threshold = st.session_state.confidence_threshold
+    cache_namespace = f"fuzzy@{threshold:.2f}" if namespace == "fuzzy" else namespace
+    
+    start = time.perf_counter()
+    with trace.span("cache.lookup"):
+        cached = cache.get(narrative, cache_namespace)
+    if cached is not None:
+        record_analysis(narrative, cached, start, namespace, cached=True)
+        return True, cached
+    
+    if namespace == "fuzzy":
+        with trace.span("fuzzy.analyze", threshold=threshold):
+            result = get_fuzzy_scorer(threshold).analyze(narrative)
+        cache.put(narrative, result, cache_namespace)
+        record_analysis(narrative, result, start, namespace)
+        return True, result
+    
+    if namespace == "semantic":
+        scorer = get_semantic_scorer()
+        if scorer is None:
+            return False, f"No Legal-BERT checkpoint found at {LEGAL_BERT_MODEL_DIR}"
+        with trace.span("semantic.analyze"):
+            result = scorer.analyze(narrative)
+        cache.put(narrative, result, namespace)
+        record_analysis(narrative, result, start, namespace)
+        return True, result
+    
+    if namespace == "local":
+        with trace.span("local.analyze"):
+            result = get_scoring_engine().analyze(narrative)
+        cache.put(narrative, result, namespace)
+        record_analysis(narrative, result, start, namespace)
+        return True, result
+    
     try:
-        response = requests.post(
-            f"{API_BASE_URL}/api/analyze",
-            json={"narrative": narrative},
-            timeout=30
-        )
+        with trace.span("http POST /api/analyze"):
+            response = get_api_client().post(
+                "/api/analyze",
+                json={"narrative": narrative},
+                headers=trace.headers()
+            )
         
         if response.status_code == 200:
-            return True, response.json()
+            result = response.json()
+            cache.put(narrative, result, namespace)
+            record_analysis(narrative, result, start, namespace)
+            return True, result
         else:
             return False, f"API Error: {response.status_code} - {response.text}"
     
     except requests.exceptions.RequestException as e:
         return False, f"Request failed: {str(e)}"
 
+def record_analysis(narrative, result, start, engine, cached=False):
+    """Log a completed analysis for the Analytics page"""
+    get_analytics_store().record(
+        result.get('recommendations', []),
+        (time.perf_counter() - start) * 1000,
+        len(narrative),
+        engine=engine,
+        cached=cached,
+    )
+
+def analyze_fir_narrative_stream(narrative):
+    """Yield analysis events from the backend's NDJSON stream
+    
+    Events are dicts with a ``type`` of ``recommendation``, ``judgments``,
+    ``done`` or ``error``. Cached results and backends without the streaming
+    route are replayed as the same events.
+    """
+    cache = get_result_cache()
+    data_version = get_data_version()
+    if data_version is not None:
+        cache.set_data_version(data_version)
+    
+    start = time.perf_counter()
+    result = cache.get(narrative, "api")
+    if result is not None:
+        record_analysis(narrative, result, start, "api", cached=True)
+    else:
+        trace = get_tracer().start("analyze_fir_narrative_stream")
+        success = False
+        try:
+            events = get_api_client().stream_ndjson("/api/analyze/stream", json={"narrative": narrative},
+                                                    headers=trace.headers())
+            response = next(events)
+            if response.status_code == 200:
+                recommendations = {}
+                for event in events:
+                    if event['type'] == 'recommendation':
+                        rec = dict(event['recommendation'], judgments=[])
+                        recommendations[rec['code']] = rec
+                    elif event['type'] == 'judgments' and event['code'] in recommendations:
+                        recommendations[event['code']]['judgments'] = event['judgments']
+                    elif event['type'] == 'done':
+                        result = {"success": True, "recommendations": list(recommendations.values())}
+                        cache.put(narrative, result, "api")
+                        record_analysis(narrative, result, start, "api")
+                        trace.end(engine="api", success=True, **{"narrative.length": len(narrative)})
+                        success = True
+                    yield event
+                return
+            error = f"API Error: {response.status_code} - {response.text}"
+            events.close()
+            if response.status_code != 404:
+                yield {"type": "error", "error": error}
+                return
+        except requests.exceptions.RequestException as e:
+            yield {"type": "error", "error": f"Request failed: {str(e)}"}
+            return
+        finally:
+            # Error events, non-200 responses (the 404 fallback below traces
+            # itself), exceptions and abandoned streams still end the trace
+            if not success:
+                trace.end(engine="api", success=False, **{"narrative.length": len(narrative)})
+        
+        # Older backends have no streaming route
+        success, result = analyze_fir_narrative(narrative)
+        if not success:
+            yield {"type": "error", "error": result}
+            return
+    
+    recommendations = result.get('recommendations', [])
+    for rec in recommendations:
+        yield {"type": "recommendation", "recommendation": rec}
+    for rec in recommendations:
+        yield {"type": "judgments", "code": rec['code'], "judgments": rec.get('judgments', [])}
+    yield {"type": "done", "count": len(recommendations)}
+
 def main():
     # Header
     st.markdown('<h1 class="main-header">🚔 FIR Assist - AI-Powered FIR Analysis</h1>', unsafe_allow_html=True)
@@ -176,7 +449,7 @@ def main():
     st.sidebar.title("Navigation")
     page = st.sidebar.selectbox(
         "Choose a page",
-        ["🏠 Dashboard", "🚀 Deploy Services", "📝 FIR Analysis", "📊 Analytics", "⚙️ Settings"]
+        ["🏠 Dashboard", "🚀 Deploy Services", "📝 FIR Analysis", "📦 Batch Analysis", "📊 Analytics", "⏱️ Performance", "⚙️ Settings"]
     )
     
     if page == "🏠 Dashboard":
@@ -185,8 +458,12 @@ def main():
         show_deployment()
     elif page == "📝 FIR Analysis":
         show_fir_analysis()
+    elif page == "📦 Batch Analysis":
+        show_batch_analysis()
     elif page == "📊 Analytics":
         show_analytics()
+    elif page == "⏱️ Performance":
+        show_performance()
     elif page == "⚙️ Settings":
         show_settings()
 
@@ -198,6 +475,10 @@ def show_dashboard():
     if st.button("🔄 Refresh Status"):
         st.session_state.services_status = check_service_status()
     
+    checked_at = get_health_monitor().checked_at
+    if checked_at:
+        st.caption(f"Last checked: {datetime.fromtimestamp(checked_at).strftime('%H:%M:%S')}")
+    
     # Display service status
     col1, col2, col3 = st.columns(3)
     
@@ -241,26 +522,22 @@ def show_dashboard():
     
     with col1:
         if st.button("🚀 Deploy All Services"):
-            with st.spinner("Deploying services..."):
-                success, message = deploy_services()
-                if success:
-                    st.success(message)
-                else:
-                    st.error(message)
+            success, message = deploy_services()
+            if not success:
+                st.error(message)
     
     with col2:
         if st.button("⏹️ Stop All Services"):
-            with st.spinner("Stopping services..."):
-                success, message = stop_services()
-                if success:
-                    st.success(message)
-                else:
-                    st.error(message)
+            success, message = stop_services()
+            if not success:
+                st.error(message)
     
     with col3:
         if st.button("🌐 Open Frontend"):
             st.markdown(f"[Open FIR Assist Frontend]({FRONTEND_URL})")
     
+    show_deployment_job()
+    
     # System information
     st.markdown('<h3>System Information</h3>', unsafe_allow_html=True)
     
@@ -282,6 +559,15 @@ def show_dashboard():
         - **Backend API:** http://localhost:5000
         - **MongoDB:** localhost:27017
         """)
+    
+    # Backend request latency
+    st.markdown('<h3>Backend Request Latency</h3>', unsafe_allow_html=True)
+    
+    latency_rows = get_api_client().stats.snapshot()
+    if latency_rows:
+        st.dataframe(latency_rows, use_container_width=True)
+    else:
+        st.info("No backend requests have been made by this server yet.")
 
 def show_deployment():
     """Show deployment management page"""
@@ -315,13 +601,9 @@ def show_deployment():
         """)
         
         if st.button("🚀 Deploy All Services", type="primary"):
-            with st.spinner("Deploying FIR Assist services..."):
-                success, message = deploy_services()
-                if success:
-                    st.success(message)
-                    st.session_state.services_status = check_service_status()
-                else:
-                    st.error(message)
+            success, message = deploy_services()
+            if not success:
+                st.error(message)
     
     with col2:
         st.markdown("**Stop Services**")
@@ -333,13 +615,11 @@ def show_deployment():
         """)
         
         if st.button("⏹️ Stop All Services", type="secondary"):
-            with st.spinner("Stopping services..."):
-                success, message = stop_services()
-                if success:
-                    st.success(message)
-                    st.session_state.services_status = check_service_status()
-                else:
-                    st.error(message)
+            success, message = stop_services()
+            if not success:
+                st.error(message)
+    
+    show_deployment_job()
     
     # Docker Compose configuration
     st.markdown('<h3>Docker Configuration</h3>', unsafe_allow_html=True)
@@ -353,6 +633,7 @@ services:
       - "3000:3000"
     environment:
       - REACT_APP_API_URL=http://localhost:5000
+      - REACT_APP_TRANSCRIBE_URL=http://localhost:5002
     depends_on:
       - backend
 
@@ -364,6 +645,7 @@ services:
       - MONGODB_URI=mongodb://mongodb:27017/fir-assist
       - PORT=5000
       - NODE_ENV=production
+      - JUDGMENT_CACHE=true
     depends_on:
       - mongodb
 
@@ -382,20 +664,44 @@ def show_fir_analysis():
     """Show FIR analysis interface"""
     st.markdown('<h2 class="sub-header">📝 FIR Analysis</h2>', unsafe_allow_html=True)
     
+    engine = st.radio(
+        "Analysis engine",
+        ["Backend API", "Local engine", "Fuzzy (typos & Hinglish)", "Semantic (Legal-BERT)"],
+        horizontal=True,
+        help="The local engine scores narratives in-process with the same keyword matching as the backend. "
+             "Fuzzy also credits misspelled keywords and transliterated Hindi terms, as strictly as the "
+             "confidence threshold in Settings allows. "
+             "Semantic ranks sections by Legal-BERT embedding similarity blended with the keyword score."
+    )
+    use_semantic = engine == "Semantic (Legal-BERT)"
+    use_fuzzy = engine == "Fuzzy (typos & Hinglish)"
+    use_local = engine == "Local engine" or use_semantic or use_fuzzy
+    stream_results = not use_local and st.checkbox(
+        "⚡ Stream results",
+        value=True,
+        help="Show each recommended section as soon as it is scored, before its judgments are resolved."
+    )
+    
     # Check if services are running
-    if st.session_state.services_status.get('backend') != 'Running':
+    if not use_local and st.session_state.services_status.get('backend') != 'Running':
         st.warning("⚠️ Backend service is not running. Please deploy services first.")
         return
     
     # Input section
     st.markdown('<h3>Enter Incident Narrative</h3>', unsafe_allow_html=True)
     
+    # Voice input
+    transcript = show_voice_input()
+    
     # Text input
     narrative = st.text_area(
         "Describe the incident in detail:",
+        value=transcript or "",
         height=200,
         placeholder="Enter a detailed description of the incident, including what happened, who was involved, when and where it occurred, and any relevant details that could help identify applicable IPC sections..."
     )
+    if st.toggle("Live suggestions", value=True, help="Update likely sections as the narrative is edited."):
+        show_live_suggestions(narrative)
     
     # Example narratives
     with st.expander("📋 Example Narratives"):
@@ -415,74 +721,292 @@ def show_fir_analysis():
     # Analysis button
     if st.button("🔍 Analyze Incident", type="primary", disabled=not narrative.strip()):
         if narrative.strip():
-            with st.spinner("Analyzing incident narrative..."):
-                success, result = analyze_fir_narrative(narrative)
-                
-                if success:
-                    st.success("✅ Analysis completed successfully!")
-                    
-                    # Display recommendations
-                    st.markdown('<h3>📋 Recommended IPC Sections</h3>', unsafe_allow_html=True)
-                    
-                    recommendations = result.get('recommendations', [])
-                    
-                    if recommendations:
-                        for i, rec in enumerate(recommendations, 1):
-                            with st.expander(f"🏛️ {rec['code']} - {rec['title']} (Confidence: {rec['score']:.1%})"):
-                                st.markdown(f"**Description:** {rec['description']}")
-                                
-                                if rec.get('judgments'):
-                                    st.markdown("**Related Landmark Judgments:**")
-                                    for judgment in rec['judgments']:
-                                        st.markdown(f"- **{judgment['caseName']}:** {judgment['synopsis']}")
-                                else:
-                                    st.info("No related judgments found for this section.")
-                    else:
-                        st.info("No specific IPC sections were identified for this narrative.")
-                    
-                    # Summary statistics
-                    if recommendations:
-                        st.markdown('<h3>📊 Analysis Summary</h3>', unsafe_allow_html=True)
-                        
-                        col1, col2, col3 = st.columns(3)
-                        
-                        with col1:
-                            st.metric("Sections Identified", len(recommendations))
-                        
-                        with col2:
-                            avg_confidence = sum(r['score'] for r in recommendations) / len(recommendations)
-                            st.metric("Average Confidence", f"{avg_confidence:.1%}")
-                        
-                        with col3:
-                            total_judgments = sum(len(r.get('judgments', [])) for r in recommendations)
-                            st.metric("Related Judgments", total_judgments)
-                
-                else:
-                    st.error(f"❌ Analysis failed: {result}")
+            if stream_results:
+                show_streamed_analysis(narrative)
+            else:
+                show_analysis(narrative, local=use_local, semantic=use_semantic, fuzzy=use_fuzzy)
+    elif transcript and st.session_state.get('analyzed_transcript') != transcript:
+        # A new recording goes straight to analysis
+        st.session_state.analyzed_transcript = transcript
+        if stream_results:
+            show_streamed_analysis(transcript)
+        else:
+            show_analysis(transcript, local=use_local, semantic=use_semantic, fuzzy=use_fuzzy)
+
+def show_analysis(narrative, local=False, semantic=False, fuzzy=False):
+    """Analyze a narrative and show its recommendations"""
+    with st.spinner("Analyzing incident narrative..."):
+        success, result = analyze_fir_narrative(narrative, local=local, semantic=semantic, fuzzy=fuzzy)
+    
+    if success:
+        st.success("✅ Analysis completed successfully!")
+        
+        # Display recommendations
+        st.markdown('<h3>📋 Recommended IPC Sections</h3>', unsafe_allow_html=True)
+        
+        recommendations = result.get('recommendations', [])
+        
+        if recommendations:
+            for rec in recommendations:
+                render_recommendation(rec)
+        else:
+            st.info("No specific IPC sections were identified for this narrative.")
+        
+        show_analysis_summary(recommendations)
+    
+    else:
+        st.error(f"❌ Analysis failed: {result}")
+
+def show_live_suggestions(narrative):
+    """Show the top sections for the narrative, re-scoring only the edited text"""
+    from fir_assist.incremental import IncrementalScorer
+    
+    engine = get_scoring_engine()
+    scorer = st.session_state.get('live_scorer')
+    if scorer is None or scorer.engine is not engine:
+        scorer = st.session_state.live_scorer = IncrementalScorer(engine)
+    
+    start = time.perf_counter()
+    scorer.update(narrative)
+    top = scorer.top_sections()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    
+    if top:
+        suggestions = " · ".join(
+            f"**{engine.sections[index]['code']}** {engine.sections[index]['title']} "
+            f"({engine.normalized_score(index, raw_score):.0%})"
+            for index, raw_score in top
+        )
+        st.caption(f"Likely sections: {suggestions} — updated in {elapsed_ms:.1f}ms")
+    elif narrative.strip():
+        st.caption("No matching sections yet.")
+
+def show_voice_input():
+    """Record a narrative and transcribe it offline; return the latest transcript"""
+    model = get_speech_model()
+    if model is None:
+        st.caption(f"🎙️ Voice input needs a Vosk model in `{VOSK_MODEL_DIR}` (or set VOSK_MODEL_DIR).")
+        return None
+    
+    audio = st.audio_input("🎙️ Record the narrative")
+    if audio is None:
+        return None
+    
+    # Transcribe each recording once; reruns reuse the stored transcript
+    digest = hashlib.sha1(audio.getvalue()).hexdigest()
+    if st.session_state.get('transcript_digest') != digest:
+        from fir_assist.transcribe import transcribe_clip
+        placeholder = st.empty()
+        try:
+            session = transcribe_clip(model, audio, on_partial=lambda text: placeholder.markdown(f"*{text}*"))
+        except Exception as e:
+            placeholder.error(f"❌ Transcription failed: {e}")
+            return None
+        placeholder.empty()
+        st.session_state.transcript_digest = digest
+        st.session_state.transcript = session.text
+        st.session_state.transcript_stats = (session.audio_seconds, session.rtf)
+    
+    audio_seconds, rtf = st.session_state.transcript_stats
+    st.caption(f"Transcribed {audio_seconds:.1f}s of audio (real-time factor {rtf:.2f})")
+    return st.session_state.transcript
+
+def render_recommendation(rec, judgments_pending=False):
+    """Render one recommended section with its judgments"""
+    with st.expander(f"🏛️ {rec['code']} - {rec['title']} (Confidence: {rec['score']:.1%})"):
+        st.markdown(f"**Description:** {rec['description']}")
+        
+        if judgments_pending:
+            st.caption("⏳ Resolving related judgments...")
+        elif rec.get('judgments'):
+            st.markdown("**Related Landmark Judgments:**")
+            for judgment in rec['judgments']:
+                st.markdown(f"- **{judgment['caseName']}:** {judgment['synopsis']}")
+        else:
+            st.info("No related judgments found for this section.")
+
+def show_analysis_summary(recommendations):
+    """Show summary statistics for a completed analysis"""
+    if not recommendations:
+        return
+    
+    st.markdown('<h3>📊 Analysis Summary</h3>', unsafe_allow_html=True)
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.metric("Sections Identified", len(recommendations))
+    
+    with col2:
+        avg_confidence = sum(r['score'] for r in recommendations) / len(recommendations)
+        st.metric("Average Confidence", f"{avg_confidence:.1%}")
+    
+    with col3:
+        total_judgments = sum(len(r.get('judgments', [])) for r in recommendations)
+        st.metric("Related Judgments", total_judgments)
+
+def show_streamed_analysis(narrative):
+    """Render recommendations as the backend streams them"""
+    st.markdown('<h3>📋 Recommended IPC Sections</h3>', unsafe_allow_html=True)
+    
+    status = st.empty()
+    status.info("⏳ Analyzing incident narrative...")
+    placeholders = {}
+    recommendations = {}
+    start = time.perf_counter()
+    first_result_ms = None
+    
+    for event in analyze_fir_narrative_stream(narrative):
+        if event['type'] == 'recommendation':
+            if first_result_ms is None:
+                first_result_ms = (time.perf_counter() - start) * 1000
+            rec = event['recommendation']
+            recommendations[rec['code']] = rec
+            placeholders[rec['code']] = st.empty()
+            with placeholders[rec['code']].container():
+                render_recommendation(rec, judgments_pending=True)
+        elif event['type'] == 'judgments' and event['code'] in placeholders:
+            rec = recommendations[event['code']]
+            rec['judgments'] = event['judgments']
+            with placeholders[event['code']].container():
+                render_recommendation(rec)
+        elif event['type'] == 'error':
+            status.error(f"❌ Analysis failed: {event['error']}")
+            return
+    
+    total_ms = (time.perf_counter() - start) * 1000
+    status.success("✅ Analysis completed successfully!")
+    if not recommendations:
+        st.info("No specific IPC sections were identified for this narrative.")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("Time to First Result", f"{first_result_ms:.0f} ms" if first_result_ms is not None else "—")
+    with col2:
+        st.metric("Total Time", f"{total_ms:.0f} ms")
+    
+    show_analysis_summary(list(recommendations.values()))
+
+def show_batch_analysis():
+    """Show batch analysis of historical FIR narratives"""
+    st.markdown('<h2 class="sub-header">📦 Batch Analysis</h2>', unsafe_allow_html=True)
+    
+    engine = st.radio(
+        "Analysis engine",
+        ["Backend API", "Local engine (vectorized)"],
+        horizontal=True,
+        help="The local engine scores whole chunks of narratives in-process with sparse matrix products."
+    )
+    use_local = engine != "Backend API"
+    
+    # Check if services are running
+    if not use_local and st.session_state.services_status.get('backend') != 'Running':
+        st.warning("⚠️ Backend service is not running. Please deploy services first.")
+        return
+    
+    st.markdown("""
+    Upload a CSV with a `narrative` column (and optional `id`) or a JSONL file with
+    one `{"id": ..., "narrative": ...}` object per line. Results are written as they
+    complete, and re-running the same file resumes an interrupted run.
+    """)
+    
+    uploaded = st.file_uploader("Narratives file", type=["csv", "jsonl", "ndjson"])
+    
+    if not use_local:
+        col1, col2 = st.columns(2)
+        with col1:
+            concurrency = st.slider("Concurrent requests", 1, 32, 8)
+        with col2:
+            rate_limit = st.number_input("Max narratives per second (0 = unlimited)", min_value=0.0, value=0.0, step=1.0)
+    
+    if uploaded is None:
+        return
+    
+    # Name run files after the upload's content so a re-upload resumes it
+    content = uploaded.getvalue()
+    run_id = hashlib.sha1(content).hexdigest()[:16]
+    extension = os.path.splitext(uploaded.name)[1].lower() or ".csv"
+    batch_dir = os.path.join(DATA_DIR, "batch")
+    os.makedirs(batch_dir, exist_ok=True)
+    input_path = os.path.join(batch_dir, f"{run_id}{extension}")
+    output_path = os.path.join(batch_dir, f"{run_id}.results.jsonl")
+    if not os.path.exists(input_path):
+        with open(input_path, "wb") as f:
+            f.write(content)
+    
+    total = count_narratives(input_path)
+    already_done = len(load_finished_ids(output_path))
+    st.write(f"**Rows:** {total} — **already analyzed:** {already_done}")
+    
+    if st.button("▶️ Start Batch", type="primary", disabled=already_done >= total):
+        progress_bar = st.progress(min(already_done / total, 1.0) if total else 0.0)
+        metrics = st.empty()
+        
+        def on_progress(progress):
+            done = progress.skipped + progress.completed + progress.failed
+            progress_bar.progress(min(done / total, 1.0) if total else 1.0)
+            metrics.markdown(
+                f"**Analyzed:** {progress.completed} — **Failed:** {progress.failed} — "
+                f"**Skipped:** {progress.skipped} — **Throughput:** {progress.throughput:.1f} narratives/s"
+            )
+        
+        if use_local:
+            def on_chunk(rows_done, rows_per_second):
+                progress_bar.progress(min((already_done + rows_done) / total, 1.0) if total else 1.0)
+                metrics.markdown(f"**Analyzed:** {rows_done} — **Throughput:** {rows_per_second:,.0f} narratives/s")
+            
+            from fir_assist.bulk import score_file
+            score_file(input_path, output_path, get_scoring_engine(), on_progress=on_chunk)
+        else:
+            progress = run_batch(
+                input_path,
+                output_path,
+                make_api_analyzer(get_api_client()),
+                concurrency=concurrency,
+                rate_limit=rate_limit or None,
+                on_progress=on_progress,
+            )
+        if not use_local and progress.failed:
+            st.warning(f"Batch finished with {progress.failed} failed rows. Start the batch again to retry them.")
+        else:
+            st.success("✅ Batch analysis completed!")
+    
+    if os.path.exists(output_path):
+        with open(output_path, "rb") as f:
+            st.download_button(
+                "📥 Download Results (JSONL)",
+                f.read(),
+                file_name=f"{os.path.splitext(uploaded.name)[0]}.results.jsonl",
+                mime="application/x-ndjson",
+            )
 
 def show_analytics():
     """Show analytics and insights"""
     st.markdown('<h2 class="sub-header">📊 Analytics & Insights</h2>', unsafe_allow_html=True)
     
-    # Check if services are running
-    if st.session_state.services_status.get('backend') != 'Running':
-        st.warning("⚠️ Backend service is not running. Please deploy services first.")
+    store = get_analytics_store()
+    daily = store.daily_volume(days=30)
+    
+    if not daily:
+        st.info("No analyses have been logged yet. Results appear here as narratives are analyzed.")
         return
     
-    # Mock analytics data (in a real app, this would come from the database)
-    st.markdown('<h3>📈 Usage Statistics</h3>', unsafe_allow_html=True)
+    import pandas as pd
+    import plotly.express as px
     
-    # Sample data for demonstration
-    analysis_data = {
-        'Date': ['2024-01-01', '2024-01-02', '2024-01-03', '2024-01-04', '2024-01-05'],
-        'Analyses': [15, 23, 18, 31, 27],
-        'Sections_Identified': [45, 67, 52, 89, 73],
-        'Avg_Confidence': [0.78, 0.82, 0.75, 0.85, 0.79]
-    }
+    st.markdown('<h3>📈 Usage Statistics</h3>', unsafe_allow_html=True)
     
-    df = pd.DataFrame(analysis_data)
+    df = pd.DataFrame(daily)
     df['Date'] = pd.to_datetime(df['Date'])
     
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Analyses (30 days)", int(df['Analyses'].sum()))
+    with col2:
+        st.metric("Average Latency", f"{(df['Avg_Latency_ms'] * df['Analyses']).sum() / df['Analyses'].sum():.0f} ms")
+    with col3:
+        st.metric("Peak Latency", f"{df['Max_Latency_ms'].max():.0f} ms")
+    
     # Charts
     col1, col2 = st.columns(2)
     
@@ -497,28 +1021,127 @@ def show_analytics():
     # Confidence distribution
     st.markdown('<h3>🎯 Confidence Score Distribution</h3>', unsafe_allow_html=True)
     
-    confidence_data = [0.65, 0.72, 0.78, 0.82, 0.85, 0.88, 0.91, 0.94, 0.97]
-    fig3 = px.histogram(x=confidence_data, nbins=10, title='Distribution of Confidence Scores')
+    histogram = pd.DataFrame(store.confidence_histogram(), columns=['Confidence', 'Count'])
+    fig3 = px.bar(histogram, x='Confidence', y='Count', title='Distribution of Confidence Scores')
+    fig3.update_xaxes(tickformat='.0%')
     st.plotly_chart(fig3, use_container_width=True)
     
     # Top IPC sections
     st.markdown('<h3>🏛️ Most Frequently Identified IPC Sections</h3>', unsafe_allow_html=True)
     
-    top_sections = {
-        'IPC Section': ['IPC 379', 'IPC 323', 'IPC 354', 'IPC 420', 'IPC 506'],
-        'Count': [45, 38, 32, 28, 25],
-        'Description': [
-            'Theft',
-            'Voluntarily causing hurt',
-            'Assault or criminal force to woman with intent to outrage her modesty',
-            'Cheating and dishonestly inducing delivery of property',
-            'Criminal intimidation'
-        ]
-    }
-    
-    top_df = pd.DataFrame(top_sections)
+    top_df = pd.DataFrame(store.top_sections(limit=10))
     st.dataframe(top_df, use_container_width=True)
 
+def show_performance():
+    """Show per-stage latency from sampled request traces"""
+    from fir_assist.tracing import load_spans, stage_stats, summarize_traces
+
+    st.markdown('<h2 class="sub-header">⏱️ Performance</h2>', unsafe_allow_html=True)
+    st.caption(
+        f"Sampling {TRACE_SAMPLE_RATE:.0%} of analyses here (FIR_ASSIST_TRACE_SAMPLE_RATE); "
+        f"the backend samples with TRACE_SAMPLE_RATE or follows the caller. Traces are read from `{TRACE_DIR}`."
+    )
+
+    traces = summarize_traces(load_spans(TRACE_DIR))
+    if not traces:
+        st.info("No traces recorded yet. Set a sample rate above 0 and analyze a few narratives.")
+        return
+
+    import pandas as pd
+    import plotly.express as px
+
+    col1, col2, col3 = st.columns(3)
+    totals = sorted(trace['total_ms'] for trace in traces)
+    with col1:
+        st.metric("Traced Requests", len(traces))
+    with col2:
+        st.metric("p50 Latency", f"{totals[len(totals) // 2]:.0f} ms")
+    with col3:
+        st.metric("p95 Latency", f"{totals[min(int(len(totals) * 0.95), len(totals) - 1)]:.0f} ms")
+
+    # Per-stage breakdown
+    st.markdown('<h3>🧩 Latency by Stage</h3>', unsafe_allow_html=True)
+
+    stats = stage_stats(traces)
+    stage_df = pd.DataFrame([
+        {'Stage': stage, 'Count': s['count'], 'p50 (ms)': s['p50_ms'], 'p95 (ms)': s['p95_ms'], 'Mean (ms)': s['mean_ms']}
+        for stage, s in sorted(stats.items(), key=lambda item: -item[1]['mean_ms'])
+    ])
+    fig = px.bar(stage_df, x='Mean (ms)', y='Stage', orientation='h', title='Mean Time per Stage')
+    st.plotly_chart(fig, use_container_width=True)
+    st.dataframe(stage_df.round(2), use_container_width=True)
+
+    # Slowest requests
+    st.markdown('<h3>🐢 Slowest Recent Requests</h3>', unsafe_allow_html=True)
+
+    recent = traces[-500:]
+    slowest = sorted(recent, key=lambda trace: -trace['total_ms'])[:10]
+    st.dataframe(pd.DataFrame([
+        {
+            'Request ID': trace['request_id'],
+            'Started': datetime.fromtimestamp(trace['start_ns'] / 1e9).strftime('%Y-%m-%d %H:%M:%S'),
+            'Total (ms)': round(trace['total_ms'], 1),
+            'Slowest Stage': max(trace['stages'], key=trace['stages'].get) if trace['stages'] else '',
+            'Stages': ', '.join(f"{name} {ms:.1f}" for name, ms in trace['stages'].items()),
+        }
+        for trace in slowest
+    ]), use_container_width=True)
+
+TELEMETRY_METRICS = {
+    "CPU (%)": ("cpu_percent", 1),
+    "Memory (MB)": ("memory_bytes", 1024 * 1024),
+    "Network RX (KB/s)": ("net_rx_per_s", 1024),
+    "Network TX (KB/s)": ("net_tx_per_s", 1024),
+    "Block Read (KB/s)": ("block_read_per_s", 1024),
+    "Block Write (KB/s)": ("block_write_per_s", 1024),
+}
+
+@st.fragment(run_every=5)
+def show_container_telemetry():
+    """Rolling CPU, memory, network and block-I/O charts for the compose services"""
+    st.markdown('<h3>📈 Container Telemetry</h3>', unsafe_allow_html=True)
+    
+    collector = get_stats_collector()
+    if collector is None:
+        st.info("Docker is not available on this host.")
+        return
+    
+    if not collector.running:
+        if st.button("▶️ Start Telemetry"):
+            collector.start()
+            st.rerun(scope="fragment")
+        return
+    
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        window = st.select_slider("Window", options=[60, 300, 900, 3600], value=300,
+                                  format_func=lambda seconds: f"{seconds // 60} min" if seconds >= 60 else f"{seconds} s")
+    with col2:
+        if st.button("⏹️ Stop Telemetry"):
+            collector.stop()
+            st.rerun(scope="fragment")
+    
+    series = collector.series(window=window, max_points=200)
+    if not series:
+        st.caption("Collecting samples...")
+        return
+    
+    import pandas as pd
+    
+    chart_cols = st.columns(2)
+    for i, (label, (metric, scale)) in enumerate(TELEMETRY_METRICS.items()):
+        frame = pd.DataFrame({
+            name: pd.Series(values[metric] / scale, index=pd.to_datetime(timestamps, unit='s'))
+            for name, (timestamps, values) in series.items()
+        })
+        with chart_cols[i % 2]:
+            st.markdown(f"**{label}**")
+            st.line_chart(frame, height=200)
+
+def save_confidence_threshold():
+    """Keep the slider's value once the Settings page is left"""
+    st.session_state.confidence_threshold = st.session_state.confidence_threshold_slider
+
 def show_settings():
     """Show application settings"""
     st.markdown('<h2 class="sub-header">⚙️ Settings</h2>', unsafe_allow_html=True)
@@ -533,12 +1156,33 @@ def show_settings():
     
     # Database settings
     st.markdown("**Database Configuration**")
-    mongodb_uri = st.text_input("MongoDB URI", value="mongodb://localhost:27017/fir-assist", type="password")
+    mongodb_uri = st.text_input("MongoDB URI", value=MONGODB_URI, type="password")
     
     # AI Model settings
     st.markdown("**AI Model Configuration**")
     model_name = st.selectbox("Legal-BERT Model", ["nlpaueb/legal-bert-base-uncased"])
-    confidence_threshold = st.slider("Confidence Threshold", 0.0, 1.0, 0.7, 0.05)
+    if os.path.isdir(LEGAL_BERT_MODEL_DIR):
+        quantized = os.path.exists(os.path.join(LEGAL_BERT_MODEL_DIR, "model.int8.onnx"))
+        st.caption(
+            f"Semantic engine loads {model_name} from `{LEGAL_BERT_MODEL_DIR}` "
+            f"({'int8 ONNX' if quantized else 'PyTorch fp32'}, CPU, no downloads)."
+        )
+    else:
+        st.caption(f"Download {model_name} to `{LEGAL_BERT_MODEL_DIR}` (or set LEGAL_BERT_MODEL_DIR) to enable the semantic engine.")
+    confidence_threshold = st.slider(
+        "Confidence Threshold", 0.0, 1.0, st.session_state.confidence_threshold, 0.05,
+        key="confidence_threshold_slider",
+        on_change=save_confidence_threshold,
+        help="How strictly the fuzzy engine matches: higher values allow fewer edits per keyword and give them less weight."
+    )
+    from fir_assist.fuzzy import settings_for_threshold
+    max_distance, fuzzy_weight = settings_for_threshold(confidence_threshold)
+    st.caption(
+        f"Fuzzy engine: transliterated terms always match; "
+        + (f"keywords may be up to {max_distance} edit{'s' if max_distance > 1 else ''} off, "
+           f"each edit keeping {fuzzy_weight:.0%} of the keyword's weight." if max_distance
+           else "misspelled keywords are not matched.")
+    )
     
     # Save settings
     if st.button("💾 Save Settings"):
@@ -550,9 +1194,10 @@ def show_settings():
     st.markdown('<h3>🖥️ System Information</h3>', unsafe_allow_html=True)
     
     # Docker information
-    if st.session_state.docker_client:
+    docker_client = get_docker_client()
+    if docker_client:
         try:
-            containers = st.session_state.docker_client.containers.list()
+            containers = docker_client.containers.list()
             st.markdown(f"**Running Containers:** {len(containers)}")
             
             if containers:
@@ -564,9 +1209,39 @@ def show_settings():
                         'Image': container.image.tags[0] if container.image.tags else container.image.id[:12]
                     })
                 
-                st.dataframe(pd.DataFrame(container_info))
+                st.dataframe(container_info)
         except Exception as e:
             st.error(f"Error accessing Docker: {str(e)}")
+        
+        show_container_telemetry()
+    
+    # Result cache
+    st.markdown('<h3>🗃️ Result Cache</h3>', unsafe_allow_html=True)
+    
+    cache_stats = get_result_cache().stats()
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Hit Rate", f"{cache_stats['hit_rate']:.1%}")
+    with col2:
+        st.metric("Hits (memory / disk)", f"{cache_stats['hits']} / {cache_stats['disk_hits']}")
+    with col3:
+        st.metric("Misses", cache_stats['misses'])
+    with col4:
+        st.metric("Evictions", cache_stats['evictions'] + cache_stats['expirations'])
+    st.caption(
+        f"{cache_stats['entries']} entries in memory ({cache_stats['memory_bytes'] / 1024:.0f} KB of "
+        f"{RESULT_CACHE_MEMORY_MB} MB), {cache_stats.get('disk_entries', 0)} on disk, "
+        f"{cache_stats['invalidations']} invalidated by data changes"
+    )
+    if 'host' in cache_stats:
+        host = cache_stats['host']
+        st.caption(
+            f"All workers on this host: {host['hit_rate']:.1%} hit rate, "
+            f"{host.get('hits', 0) + host.get('disk_hits', 0)} hits, {host.get('misses', 0)} misses"
+        )
+    if st.button("🧹 Clear Result Cache"):
+        get_result_cache().clear()
+        st.success("Result cache cleared.")
     
     # Application logs
     st.markdown('<h3>📋 Application Logs</h3>', unsafe_allow_html=True)
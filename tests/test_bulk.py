@@ -0,0 +1,54 @@
+"""``BulkScorer`` must rank and score exactly like ``ScoringEngine``"""
+import json
+
+import pytest
+
+pytest.importorskip('scipy')
+
+from fir_assist.benchmarks.corpus import synthetic_narratives, synthetic_sections
+from fir_assist.bulk import BulkScorer, score_file
+from fir_assist.scoring import ScoringEngine, parity_corpus
+
+
+def _bulk_top_sections(scorer, narratives, chunk_size):
+    top = []
+    for _, (indices, raw, _) in scorer.iter_scores(narratives, chunk_size):
+        top.extend([(int(i), int(r)) for i, r in zip(row_i, row_r) if i >= 0] for row_i, row_r in zip(indices, raw))
+    return top
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 10000])
+def test_bulk_matches_engine_on_seed_corpus(chunk_size):
+    engine = ScoringEngine.from_seed()
+    narratives = parity_corpus(engine.sections) + synthetic_narratives(engine.sections, 500, seed=1)
+    expected = [engine.top_sections(narrative) for narrative in narratives]
+    assert _bulk_top_sections(BulkScorer(engine), narratives, chunk_size) == expected
+
+
+def test_bulk_matches_engine_on_synthetic_sections():
+    engine = ScoringEngine(synthetic_sections(300, seed=2))
+    narratives = synthetic_narratives(engine.sections, 500, seed=2)
+    expected = [engine.top_sections(narrative) for narrative in narratives]
+    assert _bulk_top_sections(BulkScorer(engine), narratives, 64) == expected
+
+
+def test_score_file_matches_analyze(tmp_path):
+    engine = ScoringEngine.from_seed()
+    narratives = parity_corpus(engine.sections)
+    input_path = tmp_path / 'narratives.jsonl'
+    input_path.write_text(''.join(json.dumps({'id': str(i), 'narrative': n}) + '\n'
+                                  for i, n in enumerate(narratives)), encoding='utf-8')
+    output_path = tmp_path / 'results.jsonl'
+    score_file(str(input_path), str(output_path), engine, chunk_size=16)
+
+    records = {}
+    for line in output_path.read_text(encoding='utf-8').splitlines():
+        record = json.loads(line)
+        records[record['id']] = record
+    assert len(records) == len(narratives)
+    for i, narrative in enumerate(narratives):
+        record = records[str(i)]
+        if not narrative.strip():
+            assert record['status'] == 'skipped'
+        else:
+            assert record['recommendations'] == engine.analyze(narrative)['recommendations']
@@ -0,0 +1,35 @@
+"""An engine built from a catalog snapshot must answer like one built from documents"""
+import pytest
+
+pytest.importorskip('numpy')
+
+from fir_assist.benchmarks.catalog import synthetic_judgments
+from fir_assist.benchmarks.corpus import synthetic_narratives, synthetic_sections
+from fir_assist.catalog import Catalog, write_snapshot
+from fir_assist.scoring import ScoringEngine, parity_corpus
+from fir_assist.seed import load_seed_data
+
+
+def _assert_same_analyses(tmp_path, sections, judgments, narratives):
+    path = str(tmp_path / 'catalog.bin')
+    write_snapshot(path, sections, judgments, data_version='test')
+    catalog = Catalog.load(path)
+    try:
+        assert catalog.data_version == 'test'
+        expected = ScoringEngine(sections, judgments)
+        actual = ScoringEngine.from_catalog(catalog)
+        for narrative in narratives:
+            assert actual.analyze(narrative) == expected.analyze(narrative), narrative
+    finally:
+        catalog.close()
+
+
+def test_catalog_engine_matches_seed_engine(tmp_path):
+    sections, judgments = load_seed_data()
+    _assert_same_analyses(tmp_path, sections, judgments, parity_corpus(sections))
+
+
+def test_catalog_engine_matches_synthetic_engine(tmp_path):
+    sections = synthetic_sections(200, seed=3)
+    judgments = synthetic_judgments(sections, 2000, seed=3)
+    _assert_same_analyses(tmp_path, sections, judgments, synthetic_narratives(sections, 300, seed=3))
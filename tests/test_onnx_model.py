@@ -0,0 +1,55 @@
+"""The exported ONNX encoders must retrieve the same sections as the PyTorch model
+
+Needs torch, transformers and onnxruntime, and a local Legal-BERT checkpoint
+in ``LEGAL_BERT_MODEL_DIR``; skipped otherwise.
+"""
+import os
+
+import pytest
+
+pytest.importorskip('torch')
+pytest.importorskip('transformers')
+pytest.importorskip('onnxruntime')
+
+from fir_assist.onnx_model import FP32_FILE, OnnxEmbedder, export, parity
+from fir_assist.scoring import parity_corpus
+from fir_assist.seed import load_seed_data
+from fir_assist.semantic import INT8_FILE, Embedder
+
+MODEL_DIR = os.environ.get('LEGAL_BERT_MODEL_DIR', os.path.join('.fir_assist', 'models', 'legal-bert-base-uncased'))
+# Same bar as ``python -m fir_assist.onnx_model report``
+MIN_INT8_TOP1 = 0.95
+
+pytestmark = pytest.mark.skipif(not os.path.isdir(MODEL_DIR), reason="no local Legal-BERT checkpoint")
+
+
+@pytest.fixture(scope='module')
+def onnx_dir(tmp_path_factory):
+    out_dir = str(tmp_path_factory.mktemp('onnx'))
+    export(MODEL_DIR, out_dir)
+    return out_dir
+
+
+@pytest.fixture(scope='module')
+def corpus():
+    sections, _ = load_seed_data()
+    return sections, parity_corpus(sections)
+
+
+@pytest.fixture(scope='module')
+def reference():
+    return Embedder(MODEL_DIR)
+
+
+def test_fp32_export_matches_pytorch(onnx_dir, corpus, reference):
+    sections, narratives = corpus
+    result = parity(reference, OnnxEmbedder(onnx_dir, FP32_FILE), sections, narratives)
+    assert result['section_cosine_min'] > 0.9999
+    assert result['top1_agreement'] == 1.0
+    assert result['top5_overlap'] == 1.0
+
+
+def test_int8_export_agrees_with_pytorch(onnx_dir, corpus, reference):
+    sections, narratives = corpus
+    result = parity(reference, OnnxEmbedder(onnx_dir, INT8_FILE), sections, narratives)
+    assert result['top1_agreement'] >= MIN_INT8_TOP1
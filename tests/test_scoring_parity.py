@@ -0,0 +1,58 @@
+"""Scoring parity between ``fir_assist.scoring`` and the backend controller
+
+The first test compares the engine with the Python port of the controller's
+loop. The others compare it with the ``natural`` package itself: through a
+fixture recorded with ``python -m fir_assist.scoring --write-natural-fixture``,
+and live when node can load ``natural`` from the backend. Set
+``FIR_ASSIST_REQUIRE_NATURAL=1`` where npm is available to make a missing
+fixture or package fail instead of skip.
+"""
+import json
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from fir_assist.scoring import BACKEND_DIR, ScoringEngine, check_natural, check_parity, natural_reference, parity_corpus
+
+NATURAL_FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'natural_parity.json')
+REQUIRE_NATURAL = os.environ.get('FIR_ASSIST_REQUIRE_NATURAL') == '1'
+
+
+@pytest.fixture(scope='module')
+def sections():
+    return ScoringEngine.from_seed().sections
+
+
+def _natural_available():
+    if not shutil.which('node'):
+        return False
+    result = subprocess.run(['node', '-e', "require.resolve('natural')"], cwd=BACKEND_DIR, capture_output=True)
+    return result.returncode == 0
+
+
+def _skip_or_fail(reason):
+    if REQUIRE_NATURAL:
+        pytest.fail(reason)
+    pytest.skip(reason)
+
+
+def test_engine_matches_reference_port(sections):
+    assert check_parity(sections, parity_corpus(sections)) == []
+
+
+def test_engine_matches_natural_fixture(sections):
+    if not os.path.exists(NATURAL_FIXTURE):
+        _skip_or_fail("natural fixture has not been recorded; see --write-natural-fixture")
+    with open(NATURAL_FIXTURE, encoding='utf-8') as f:
+        reference = json.load(f)
+    assert len(reference['cases']) == len(parity_corpus(sections))
+    assert check_natural(sections, reference) == []
+
+
+def test_engine_matches_natural_live(sections):
+    if not _natural_available():
+        _skip_or_fail("run npm install in job/backend to compare with natural")
+    reference = natural_reference(sections, parity_corpus(sections))
+    assert check_natural(sections, reference) == []